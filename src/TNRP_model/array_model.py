@@ -0,0 +1,303 @@
+"""
+Array-backed TNRP model, storing depot locations, supply values and distances in NumPy arrays
+"""
+from collections.abc import Mapping
+from math import sqrt
+from typing import Dict, Iterator, List
+import numpy as np
+from TNRP_model.depot import Depot
+from TNRP_model.neighbours import nearest_opposite
+
+
+def create_dist_rows(x: np.ndarray, y: np.ndarray, start: int, end: int) -> np.ndarray:
+    """
+    Calculates the euclidean distances from the depots start to end-1 to every depot
+
+    params:
+        x - The x coordinates of the depots
+        y - The y coordinates of the depots
+        start - The first depot (row) calculated
+        end - The depot after the last depot (row) calculated
+
+    returns:
+        An ((end - start) x n) array of distances
+    """
+    # Squared differences are calculated on integers so they are exact before the square root
+    dx = x[start:end, None] - x[None, :]
+    dy = y[start:end, None] - y[None, :]
+    return np.sqrt((dx * dx + dy * dy).astype(np.float64))
+
+
+def create_dist_array(x: np.ndarray, y: np.ndarray, dtype=np.float64, block_size=1024,
+                      out: np.ndarray = None) -> np.ndarray:
+    """
+    Calculates the euclidean distances between every pair of depots as a contiguous matrix
+
+    params:
+        x - The x coordinates of the depots
+        y - The y coordinates of the depots
+        dtype - The float type used to store the distances (default=np.float64)
+        block_size - The number of rows calculated at once to limit temporary memory (default=1024)
+        out - An (n x n) array, such as a memory-mapped file, to write the distances into (default=a new array)
+
+    returns:
+        An (n x n) array where dist[i, j] is the distance on edge i-j
+    """
+    n = len(x)
+    dist = np.empty((n, n), dtype=dtype) if out is None else out
+
+    # Calculate the distances a block of rows at a time
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        dist[start:end] = create_dist_rows(x=x, y=y, start=start, end=end)
+
+    return dist
+
+
+class DistanceRow(Mapping):
+    """
+    A read-only view of one row of the distance matrix, used in place of a depot's connections dictionary
+    """
+
+    def __init__(self, model: 'TNRPModel', name: int) -> None:
+        """
+        Create the view
+
+        params
+            model - The model the distances are read from
+            name - The depot the distances are from
+        """
+        self.model = model
+        self.name = name
+
+    def __getitem__(self, key: int) -> float:
+        """Distance from the depot to the depot 'key'"""
+        if key not in self.model:
+            raise KeyError(key)
+        return self.model.distance(self.name, key)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the names of the connected depots"""
+        return iter(self.model)
+
+    def __len__(self) -> int:
+        """Number of connected depots"""
+        return len(self.model)
+
+
+class ModelDepot(Depot):
+    """
+    A view of one depot of a TNRPModel, exposing the Depot API over the model's arrays
+    """
+
+    def __init__(self, model: 'TNRPModel', name: int) -> None:
+        """
+        Create the view. No data is copied, all reads and writes go to the model's arrays
+
+        params
+            model - The model the depot belongs to
+            name - number used to identify the depot
+        """
+        self.model = model
+        self.name = name
+
+    @property
+    def s(self) -> int:
+        """The supply value of the depot, stored in the model's supply array"""
+        return int(self.model.s[self.name])
+
+    @s.setter
+    def s(self, s: int):
+        self.model.s[self.name] = s
+
+    @property
+    def x(self) -> int:
+        """The location of the depot in the x axis"""
+        return int(self.model.x[self.name])
+
+    @property
+    def y(self) -> int:
+        """The location of the depot in the y axis"""
+        return int(self.model.y[self.name])
+
+    @property
+    def connections(self) -> DistanceRow:
+        """The distances to every other depot, as a view of the model's distance matrix"""
+        return DistanceRow(model=self.model, name=self.name)
+
+    def add_connection(self, dep: 'Depot') -> None:
+        """
+        Connections of a TNRPModel are derived from the depot coordinates,
+        so every depot is already connected and nothing needs to be added
+
+        params
+            dep - the other depot object to connect with
+        """
+
+
+class TNRPModel(Mapping):
+    """
+    A TNRP stored as arrays of coordinates, supply values and a contiguous distance matrix.
+    Behaves as a dictionary of depot name: Depot object so existing searches can use it unchanged.
+
+    In sparse mode (k_nearest is given) no distance matrix is created. Instead each depot keeps a
+    list of its k nearest opposite-sign depots and any other distance is calculated when needed
+    """
+
+    def __init__(self, x: List[int], y: List[int], s: List[int], dist: np.ndarray = None,
+                 dtype=np.float64, k_nearest: int = None) -> None:
+        """
+        Create the model. Depot names are the positions in the arrays (0 to n-1)
+
+        params
+            x - The x coordinates of the depots
+            y - The y coordinates of the depots
+            s - The supply values of the depots
+            dist - A precalculated distance matrix, calculated from the coordinates if not given
+            dtype - The float type used to store the distance matrix (default=np.float64)
+            k_nearest - If given, the model is sparse and keeps the k nearest opposite-sign depots
+                        of each depot instead of a distance matrix (default=None)
+        """
+        self.x = np.ascontiguousarray(x, dtype=np.int64)
+        self.y = np.ascontiguousarray(y, dtype=np.int64)
+        # The supply values are copied as they are changed when journeys are performed
+        self.s = np.array(s, dtype=np.int64)
+
+        if not len(self.x) == len(self.y) == len(self.s):
+            raise ValueError("x, y and s must all be the same length")
+
+        self.dtype = dtype
+        self.k_nearest = k_nearest
+        # The distance matrix and neighbour lists are only calculated when they are first needed.
+        # The cache is shared with copies of the model so they are only ever calculated once.
+        # The neighbour lists depend on the sign of each supply value, so they are calculated from a
+        # read-only copy of the initial supply values rather than the supply values as they are changed
+        initial_s = self.s.copy()
+        initial_s.flags.writeable = False
+        self._cache = {'dist': dist, 'neighbours': None, 'initial_s': initial_s}
+
+    @property
+    def dist(self) -> np.ndarray:
+        """The (n x n) distance matrix, where dist[i, j] is the distance on edge i-j"""
+        if self.is_sparse():
+            raise ValueError("A sparse model has no distance matrix, use distance or distances")
+        if self._cache['dist'] is None:
+            dist = create_dist_array(x=self.x, y=self.y, dtype=self.dtype)
+            # The distances are shared between copies of the model so must not be changed
+            dist.flags.writeable = False
+            self._cache['dist'] = dist
+        return self._cache['dist']
+
+    def is_sparse(self) -> bool:
+        """
+        returns
+            Whether the model keeps neighbour lists instead of a distance matrix
+        """
+        return self.k_nearest is not None
+
+    @property
+    def neighbours(self) -> np.ndarray:
+        """
+        The (n x k) names of the k nearest opposite-sign depots of each depot, nearest first.
+        Rows are padded with -1 where a depot has fewer than k opposite-sign depots
+        """
+        return self._neighbour_lists()[0]
+
+    @property
+    def neighbour_dists(self) -> np.ndarray:
+        """The (n x k) distances to the depots in neighbours"""
+        return self._neighbour_lists()[1]
+
+    def _neighbour_lists(self):
+        """Calculates and caches the neighbour lists of a sparse model from its initial supply values"""
+        if not self.is_sparse():
+            raise ValueError("Only a sparse model (k_nearest given) has neighbour lists")
+        if self._cache['neighbours'] is None:
+            self._cache['neighbours'] = nearest_opposite(
+                x=self.x, y=self.y, s=self._cache['initial_s'], k=self.k_nearest)
+        return self._cache['neighbours']
+
+    @classmethod
+    def from_depots(cls, model: Dict[int, Depot]) -> 'TNRPModel':
+        """
+        Converts a dictionary of depot name: Depot object into a TNRPModel
+
+        params
+            model - The TNRP as a dictionary of depot name: Depot object, with names 0 to n-1
+
+        returns
+            The equivalent TNRPModel
+        """
+        if isinstance(model, TNRPModel):
+            return model
+
+        n = len(model)
+        x = [model[i].get_long() for i in range(n)]
+        y = [model[i].get_lat() for i in range(n)]
+        s = [model[i].get_s() for i in range(n)]
+        return cls(x=x, y=y, s=s)
+
+    def distance(self, i: int, j: int) -> float:
+        """
+        Getter for the distance on edge i-j
+
+        returns
+            The euclidean distance between depot i and depot j
+        """
+        if self._cache['dist'] is not None:
+            return float(self._cache['dist'][i, j])
+        if not self.is_sparse():
+            return float(self.dist[i, j])
+        # Sparse models calculate the distance from the coordinates
+        dx = int(self.x[i]) - int(self.x[j])
+        dy = int(self.y[i]) - int(self.y[j])
+        return sqrt(dx * dx + dy * dy)
+
+    def distances(self, froms: List[int], tos: List[int]) -> np.ndarray:
+        """
+        Getter for the distances of many edges at once
+
+        params
+            froms - The depots each edge is from
+            tos - The depots each edge is to
+
+        returns
+            Array of the euclidean distance of each edge
+        """
+        if not self.is_sparse():
+            return self.dist[froms, tos]
+        # Sparse models calculate the distances from the coordinates
+        froms = np.asarray(froms, dtype=np.int64)
+        tos = np.asarray(tos, dtype=np.int64)
+        dx = self.x[froms] - self.x[tos]
+        dy = self.y[froms] - self.y[tos]
+        return np.sqrt((dx * dx + dy * dy).astype(np.float64))
+
+    def __getitem__(self, name: int) -> ModelDepot:
+        """Returns a view of the depot with the name passed in"""
+        if name not in self:
+            raise KeyError(name)
+        return ModelDepot(model=self, name=int(name))
+
+    def __contains__(self, name: object) -> bool:
+        """Checks a depot with the name is in the model"""
+        return isinstance(name, (int, np.integer)) and 0 <= name < len(self.s)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the depot names"""
+        return iter(range(len(self.s)))
+
+    def __len__(self) -> int:
+        """Number of depots in the model"""
+        return len(self.s)
+
+    def __deepcopy__(self, memo: dict) -> 'TNRPModel':
+        """
+        Copies the model. Only the supply values can change, so the coordinates
+        and distance matrix are shared with the copy rather than duplicated
+        """
+        model_copy = TNRPModel(x=self.x, y=self.y, s=self.s, dtype=self.dtype,
+                               k_nearest=self.k_nearest)
+        model_copy._cache = self._cache
+        memo[id(self)] = model_copy
+        return model_copy
@@ -0,0 +1,219 @@
+"""
+Reads and writes TNRP instances, in the text format and a binary, memory-mapped format.
+
+The binary format is a single file made up of:
+    - 8 magic bytes identifying the file
+    - The length of the header as a little-endian 64-bit integer
+    - A JSON header listing the dtype, shape and offset of each array
+    - The arrays, each starting on a 64-byte boundary
+
+The x, y and s arrays are always stored. The distance and heuristic matrices are optional.
+Loading memory-maps every array, so repeated runs and parallel workers reading the same file
+share one copy of the pages instead of reparsing the text and recalculating the distances
+"""
+import glob
+import json
+import os
+from typing import Dict
+import numpy as np
+from TNRP_model.array_model import TNRPModel, create_dist_array, create_dist_rows
+
+# Identifies a binary TNRP file and the version of the format
+MAGIC = b'TNRPBIN1'
+
+# Each array starts at a multiple of this many bytes
+ALIGNMENT = 64
+
+
+def read_text_model(filepath: str) -> TNRPModel:
+    """
+    Reads a TNRP from a text file where each line is of the form 'Depot N, (x,y): (x,y), S: s'
+
+    params:
+        filepath - The path of the text file
+
+    returns:
+        The TNRP model as a TNRPModel
+    """
+    # Store the locations and supply values of the depots by name
+    depots = {}
+    # Open the text file
+    with open(filepath, 'r') as f:
+        # For each of the lines (depots)
+        for line in f:
+            # Split the line by spaces
+            parts = line.split(' ')
+            # Obtain the name of the depot
+            id = int(parts[1].strip(','))
+            # Obtain the coordinates of the depot
+            coords = parts[3]
+            x, y, _ = coords.split(',')
+            x = int(x.strip('('))
+            y = int(y.strip(')'))
+            # Obtain the initial supply value of the depot
+            s = int(parts[-1].strip())
+            # Store the depot's values
+            depots[id] = (x, y, s)
+
+    # Create the model, ordered by depot name. All depots are connected by the model's distance matrix
+    names = sorted(depots)
+    return TNRPModel(x=[depots[i][0] for i in names], y=[depots[i][1] for i in names],
+                     s=[depots[i][2] for i in names])
+
+
+def _align(offset: int) -> int:
+    """Rounds an offset up to the next multiple of ALIGNMENT"""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_binary_model(filepath: str, model: TNRPModel, store_dist=True, store_heur=True,
+                       dist_dtype=np.float64, heur_dtype=np.float64, block_size=1024):
+    """
+    Writes a TNRP to a binary file.
+    The matrices are calculated a block of rows at a time straight into the file
+
+    params:
+        filepath - The path of the binary file to write to
+        model - The TNRP model
+        store_dist - Whether the distance matrix is stored (default=True)
+        store_heur - Whether the heuristic matrix, rounded 1/distance, is stored (default=True)
+        dist_dtype - The float type used to store the distance matrix (default=np.float64)
+        heur_dtype - The float type used to store the heuristic matrix (default=np.float64)
+        block_size - The number of matrix rows calculated at once (default=1024)
+    """
+    model = TNRPModel.from_depots(model)
+    n = len(model)
+
+    # List the arrays to be stored with their dtypes and shapes
+    arrays = [('x', np.dtype(np.int64), (n,)), ('y', np.dtype(np.int64), (n,)),
+              ('s', np.dtype(np.int64), (n,))]
+    if store_dist:
+        arrays.append(('dist', np.dtype(dist_dtype), (n, n)))
+    if store_heur:
+        arrays.append(('heur', np.dtype(heur_dtype), (n, n)))
+
+    # Calculate where each array is stored, relative to the start of the data
+    entries = {}
+    offset = 0
+    for name, dtype, shape in arrays:
+        entries[name] = {'dtype': dtype.str, 'shape': shape, 'offset': offset}
+        offset = _align(offset + dtype.itemsize * int(np.prod(shape)))
+    header = json.dumps({'n': n, 'arrays': entries}).encode('utf-8')
+
+    # The data starts after the magic bytes, header length and header
+    data_start = _align(len(MAGIC) + 8 + len(header))
+    total_size = data_start + offset
+
+    # Write the header and the depot arrays, then extend the file to its full size
+    with open(filepath, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for name in ['x', 'y', 's']:
+            f.seek(data_start + entries[name]['offset'])
+            f.write(getattr(model, name).astype(np.int64).tobytes())
+        f.truncate(total_size)
+
+    # Calculate the matrices straight into the file
+    if store_dist:
+        dist = np.memmap(filepath, dtype=dist_dtype, mode='r+', shape=(n, n),
+                         offset=data_start + entries['dist']['offset'])
+        create_dist_array(x=model.x, y=model.y, block_size=block_size, out=dist)
+        dist.flush()
+        del dist
+
+    if store_heur:
+        heur = np.memmap(filepath, dtype=heur_dtype, mode='r+', shape=(n, n),
+                         offset=data_start + entries['heur']['offset'])
+        for start in range(0, n, block_size):
+            end = min(start + block_size, n)
+            dist_block = create_dist_rows(x=model.x, y=model.y, start=start, end=end)
+            # Use 1/distance, leaving 0 where the distance is 0 (the diagonal)
+            heur_block = np.zeros(dist_block.shape)
+            np.divide(1, dist_block, out=heur_block, where=dist_block != 0)
+            heur[start:end] = np.round(heur_block, 4)
+        heur.flush()
+        del heur
+
+
+def read_binary_arrays(filepath: str) -> Dict[str, np.ndarray]:
+    """
+    Memory-maps every array stored in a binary TNRP file
+
+    params:
+        filepath - The path of the binary file
+
+    returns:
+        Dictionary of array name: read-only memory-mapped array
+    """
+    with open(filepath, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{filepath} is not a binary TNRP file")
+        header_len = int.from_bytes(f.read(8), 'little')
+        header = json.loads(f.read(header_len).decode('utf-8'))
+
+    data_start = _align(len(MAGIC) + 8 + header_len)
+
+    arrays = {}
+    for name, entry in header['arrays'].items():
+        shape = tuple(entry['shape'])
+        # np.memmap can't map an empty array so create it directly
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=entry['dtype'])
+            continue
+        arrays[name] = np.memmap(filepath, dtype=entry['dtype'], mode='r', shape=shape,
+                                 offset=data_start + entry['offset'])
+    return arrays
+
+
+def load_binary_model(filepath: str) -> TNRPModel:
+    """
+    Loads a TNRP from a binary file. The coordinates and any stored distance matrix are
+    memory-mapped, only the supply values are copied into memory as they can be changed
+
+    params:
+        filepath - The path of the binary file
+
+    returns:
+        The TNRP model as a TNRPModel
+    """
+    arrays = read_binary_arrays(filepath=filepath)
+    dist = arrays.get('dist')
+    dtype = dist.dtype if dist is not None else np.float64
+    return TNRPModel(x=arrays['x'], y=arrays['y'], s=arrays['s'], dist=dist, dtype=dtype)
+
+
+def load_heur_matrix(filepath: str) -> np.ndarray:
+    """
+    Loads the heuristic matrix from a binary file
+
+    params:
+        filepath - The path of the binary file
+
+    returns:
+        The memory-mapped heuristic matrix, or None if it was not stored
+    """
+    return read_binary_arrays(filepath=filepath).get('heur')
+
+
+def convert_text_models(directory: str, store_dist=True, store_heur=True):
+    """
+    Converts every '<n>.txt' TNRP in a directory into a binary '<n>.tnrp' file next to it
+
+    params:
+        directory - The directory containing the text files, such as ./TNRP_examples
+        store_dist - Whether the distance matrices are stored (default=True)
+        store_heur - Whether the heuristic matrices are stored (default=True)
+    """
+    for text_path in sorted(glob.glob(os.path.join(directory, '*.txt'))):
+        binary_path = os.path.splitext(text_path)[0] + '.tnrp'
+        model = read_text_model(filepath=text_path)
+        write_binary_model(filepath=binary_path, model=model,
+                           store_dist=store_dist, store_heur=store_heur)
+        print(f"Converted {text_path} to {binary_path}")
+
+
+if __name__ == "__main__":
+    # Convert the example TNRPs, run from the base src/ directory using:
+    # python -m TNRP_model.instance_io
+    convert_text_models(directory='./TNRP_examples')
@@ -0,0 +1,139 @@
+"""
+Finds the k nearest opposite-sign depots of every depot using a spatial grid
+"""
+from math import sqrt
+from typing import Tuple
+import numpy as np
+
+
+def grid_knn(qx: np.ndarray, qy: np.ndarray, tx: np.ndarray, ty: np.ndarray,
+             k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the k nearest target points of every query point.
+
+    The targets are bucketed into a uniform grid, with cells sized to hold about k/2 targets.
+    The queries in each cell compare against the targets in a growing block of cells around it
+    until the k-th nearest target is closer than the edge of the block
+
+    params:
+        qx - The x coordinates of the query points
+        qy - The y coordinates of the query points
+        tx - The x coordinates of the target points
+        ty - The y coordinates of the target points
+        k - The number of nearest targets to find, at most the number of targets
+
+    returns:
+        Tuple of (queries x k) arrays of the target positions, nearest first, and their distances
+    """
+    num_queries = len(qx)
+    num_targets = len(tx)
+    neighbours = np.empty((num_queries, k), dtype=np.int64)
+    dists = np.empty((num_queries, k), dtype=np.float64)
+
+    # Calculate the bounds of the points
+    min_x = min(qx.min(), tx.min())
+    min_y = min(qy.min(), ty.min())
+    width = max(qx.max(), tx.max()) - min_x + 1
+    height = max(qy.max(), ty.max()) - min_y + 1
+
+    # Size the cells so that each holds about k/2 targets on average
+    cell = max(1.0, sqrt(width * height * k / (2 * num_targets)))
+    num_cols = int(width // cell) + 1
+    num_rows = int(height // cell) + 1
+
+    # Bucket the targets by cell. Cells in the same column are next to each other in the order
+    t_cells = ((tx - min_x) // cell).astype(np.int64) * num_rows + \
+        ((ty - min_y) // cell).astype(np.int64)
+    t_order = np.argsort(t_cells, kind='stable')
+    t_starts = np.concatenate(
+        ([0], np.cumsum(np.bincount(t_cells, minlength=num_cols * num_rows))))
+
+    # Group the queries by cell
+    q_cols = ((qx - min_x) // cell).astype(np.int64)
+    q_rows = ((qy - min_y) // cell).astype(np.int64)
+    q_cells = q_cols * num_rows + q_rows
+    q_order = np.argsort(q_cells, kind='stable')
+    q_bounds = np.flatnonzero(np.diff(q_cells[q_order])) + 1
+    q_groups = np.split(q_order, q_bounds)
+
+    for group in q_groups:
+        col = int(q_cols[group[0]])
+        row = int(q_rows[group[0]])
+        pending = group
+        radius = 1
+
+        while len(pending) > 0:
+            # Gather the targets in the block of cells within radius of the query cell
+            col_lo, col_hi = max(col - radius, 0), min(col + radius, num_cols - 1)
+            row_lo, row_hi = max(row - radius, 0), min(row + radius, num_rows - 1)
+            slices = [t_order[t_starts[c * num_rows + row_lo]:t_starts[c * num_rows + row_hi + 1]]
+                      for c in range(col_lo, col_hi + 1)]
+            block = np.concatenate(slices)
+            covers_grid = col_lo == 0 and row_lo == 0 and \
+                col_hi == num_cols - 1 and row_hi == num_rows - 1
+
+            if len(block) >= k:
+                # Calculate the distances from each pending query to every target in the block
+                dx = qx[pending, None] - tx[None, block]
+                dy = qy[pending, None] - ty[None, block]
+                block_dists = np.sqrt((dx * dx + dy * dy).astype(np.float64))
+
+                # Keep the k nearest targets of each query, ordered by distance
+                if len(block) > k:
+                    nearest = np.argpartition(block_dists, k - 1, axis=1)[:, :k]
+                else:
+                    nearest = np.broadcast_to(np.arange(k), (len(pending), k))
+                nearest_dists = np.take_along_axis(block_dists, nearest, axis=1)
+                order = np.argsort(nearest_dists, axis=1, kind='stable')
+                nearest = np.take_along_axis(nearest, order, axis=1)
+                nearest_dists = np.take_along_axis(nearest_dists, order, axis=1)
+
+                # Any target outside the block is at least radius * cell from the query cell
+                # so the result is exact if the k-th nearest target is within that distance
+                found = (nearest_dists[:, -1] <= radius * cell) | covers_grid
+                neighbours[pending[found]] = block[nearest[found]]
+                dists[pending[found]] = nearest_dists[found]
+                pending = pending[~found]
+
+            radius += 1
+
+    return neighbours, dists
+
+
+def nearest_opposite(x: np.ndarray, y: np.ndarray, s: np.ndarray,
+                     k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the k nearest depots of the opposite sign for every depot,
+    so surplus depots are given their nearest deficit depots and deficit depots their nearest surplus depots
+
+    params:
+        x - The x coordinates of the depots
+        y - The y coordinates of the depots
+        s - The supply values of the depots
+        k - The number of nearest depots to find
+
+    returns:
+        Tuple of (n x k) arrays of the nearest depot names, nearest first, and their distances.
+        Rows are padded with -1 and inf where fewer than k opposite-sign depots exist
+    """
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+    s = np.asarray(s)
+
+    neighbours = np.full((len(s), k), -1, dtype=np.int64)
+    dists = np.full((len(s), k), np.inf)
+
+    for sign in [1, -1]:
+        # Find the neighbours of the depots of one sign among the depots of the other
+        queries = np.flatnonzero(s * sign > 0)
+        targets = np.flatnonzero(s * sign < 0)
+        if len(queries) == 0 or len(targets) == 0:
+            continue
+
+        k_found = min(k, len(targets))
+        nearest, nearest_dists = grid_knn(qx=x[queries], qy=y[queries], tx=x[targets],
+                                          ty=y[targets], k=k_found)
+        neighbours[queries, :k_found] = targets[nearest]
+        dists[queries, :k_found] = nearest_dists
+
+    return neighbours, dists
@@ -0,0 +1,178 @@
+"""
+Mutable supply values over a shared, read-only TNRP model
+"""
+from collections.abc import Mapping
+from typing import Dict, Iterator
+import numpy as np
+from TNRP_model.depot import Depot
+from TNRP_model.array_model import TNRPModel
+
+
+class StateDepot(Depot):
+    """
+    A view of one depot of a SupplyState. The supply value is read from the state,
+    everything else is read from the depot in the underlying model
+    """
+
+    def __init__(self, state: 'SupplyState', name: int) -> None:
+        """
+        Create the view
+
+        params
+            state - The supply state the depot belongs to
+            name - number used to identify the depot
+        """
+        self.state = state
+        self.name = name
+
+    @property
+    def s(self) -> int:
+        """The supply value of the depot, stored in the state's supply vector"""
+        return int(self.state.s[self.name])
+
+    @s.setter
+    def s(self, s: int):
+        self.state.s[self.name] = s
+
+    @property
+    def x(self) -> int:
+        """The location of the depot in the x axis"""
+        return self.state.model[self.name].get_long()
+
+    @property
+    def y(self) -> int:
+        """The location of the depot in the y axis"""
+        return self.state.model[self.name].get_lat()
+
+    @property
+    def connections(self) -> Dict[int, float]:
+        """The distances to connected depots, read from the underlying model"""
+        return self.state.model[self.name].get_connections()
+
+    def add_connection(self, dep: 'Depot') -> None:
+        """
+        The underlying model is shared and read-only, so connections can't be added through a state
+
+        params
+            dep - the other depot object to connect with
+        """
+        raise TypeError("Connections can't be added to a SupplyState")
+
+
+class SupplyState(Mapping):
+    """
+    An integer supply vector over a shared, read-only model.
+    Behaves as a dictionary of depot name: Depot object, so journeys can be performed on it
+    in place of a deep copy of the model. It can be reset to its initial supply values, or to
+    a snapshot, in O(n) time without copying any of the model's connections
+    """
+
+    def __init__(self, model: Dict[int, Depot]) -> None:
+        """
+        Create the state using the current supply values of the model
+
+        params
+            model - The model as a dictionary of depot name: Depot object (or a TNRPModel)
+        """
+        self.model = model
+
+        if isinstance(model, TNRPModel):
+            self.s = model.s.copy()
+        else:
+            # Names are used as positions in the supply vector
+            # Any position without a depot is treated as being in equilibrium
+            size = max(model) + 1 if len(model) > 0 else 0
+            self.s = np.zeros(size, dtype=np.int64)
+            for name in model:
+                self.s[name] = model[name].get_s()
+
+        # Store the initial supply values so the state can be reset
+        self.initial = self.s.copy()
+        self.initial.flags.writeable = False
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Takes a copy of the current supply values
+
+        returns
+            The supply vector, which can be passed to reset to return to this state
+        """
+        return self.s.copy()
+
+    def reset(self, snapshot: np.ndarray = None):
+        """
+        Resets the supply values in place
+
+        params
+            snapshot - The supply values to reset to, from snapshot (default=initial supply values)
+        """
+        if snapshot is None:
+            snapshot = self.initial
+        self.s[:] = snapshot
+
+    def get_s(self, name: int) -> int:
+        """
+        Getter for the supply value of one depot
+
+        returns
+            Integer representing supply needed to resolve surplus / deficit of depot
+        """
+        return int(self.s[name])
+
+    def move_s(self, start: int, end: int, s: int):
+        """
+        Moves s quantity from the 'start' depot to the 'end' depot
+        """
+        self.s[start] -= s
+        self.s[end] += s
+
+    def apply_journeys(self, froms: np.ndarray, tos: np.ndarray, s: np.ndarray):
+        """
+        Applies many journeys at once
+
+        params
+            froms - The depots each journey is from
+            tos - The depots each journey is to
+            s - The quantity moved by each journey
+        """
+        np.subtract.at(self.s, froms, s)
+        np.add.at(self.s, tos, s)
+
+    def surplus_deps(self) -> np.ndarray:
+        """
+        returns
+            The names of the depots with a surplus
+        """
+        return np.flatnonzero(self.s > 0)
+
+    def deficit_deps(self) -> np.ndarray:
+        """
+        returns
+            The names of the depots with a deficit
+        """
+        return np.flatnonzero(self.s < 0)
+
+    def is_resolved(self) -> bool:
+        """
+        returns
+            Boolean value representing whether every depot is in equilibrium
+        """
+        return not self.s.any()
+
+    def __getitem__(self, name: int) -> StateDepot:
+        """Returns a view of the depot with the name passed in"""
+        if name not in self.model:
+            raise KeyError(name)
+        return StateDepot(state=self, name=int(name))
+
+    def __contains__(self, name: object) -> bool:
+        """Checks a depot with the name is in the model"""
+        return name in self.model
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the depot names"""
+        return iter(self.model)
+
+    def __len__(self) -> int:
+        """Number of depots in the model"""
+        return len(self.model)
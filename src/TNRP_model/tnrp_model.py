@@ -1,7 +1,8 @@
 """Creates a TNRP"""
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import random
-from TNRP_model.depot import Depot
+import numpy as np
+from TNRP_model.array_model import TNRPModel
 
 
 def create_empty_matrix(n: int, alpha: int) -> List[List[int]]:
@@ -126,7 +127,198 @@ def generate_s_vals(n: int, max_def: int, max_sur: int) -> List[int]:
     return s_vals
 
 
-def create_model(n: int, alpha=2, max_def=-100, max_sur=100) -> Dict[int, Depot]:
+def sample_locations(n: int, alpha: float, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Samples n unique integer locations on an (alpha * n) * (alpha * n) grid.
+    The grid is never created, instead n unique positions are sampled from its (alpha * n)^2 cells
+
+    params:
+        n - The number of depots
+        alpha - A constant to scale the grid by
+        rng - The random number generator used for sampling
+
+    returns:
+        Tuple of arrays of the longitude (x) and latitude (y) of each depot
+    """
+    # Need to ensure alpha > 1 so all depots can be created in unique locations
+    if alpha < 1:
+        raise ValueError("alpha must be greater than 1")
+
+    width = int(alpha * n)
+    # Sample n different cells of the grid and convert each into its coordinates
+    cells = rng.choice(width * width, size=n, replace=False)
+    return cells % width, cells // width
+
+
+def sample_s_vals(n: int, max_def: int, max_sur: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Samples n non-zero depot supply values between the maximum deficit and maximum surplus
+    that sum to 0.
+
+    All values are drawn at once and the total is then cancelled out by moving randomly
+    chosen depots towards the bound opposite to the total, so a depot may change sign.
+    Any depot left on exactly 0 is moved one step further, and the change to the total
+    is cancelled out on the next pass.
+
+    params:
+        n - The number of depots
+        max_def - Maximum deficit value of each depot
+        max_sur - Maximum surplus value of each depot
+        rng - The random number generator used for sampling
+
+    returns:
+        An array of n integer supply values, within the bounds of the TNRP
+    """
+    if n < 2:
+        raise ValueError("n must be at least 2 for supply values to sum to 0")
+    if max_def >= 0 or max_sur <= 0:
+        raise ValueError("max_def must be negative and max_sur must be positive")
+
+    # The values can only sum to 0 if, for some number k of deficit depots, the range of totals
+    # of the surplus depots overlaps the range of totals of the deficit depots
+    k = np.arange(1, n, dtype=np.int64)
+    if not np.any(np.maximum(n - k, k) <= np.minimum((n - k) * max_sur, -k * max_def)):
+        raise ValueError(f"No {n} non-zero supply values between {max_def} and {max_sur} sum to 0")
+
+    # Draw values between max_def and max_sur - 1 and shift the non-negative ones up by 1
+    # This gives values uniformly spread over the non-zero values between max_def and max_sur
+    s_vals = rng.integers(max_def, max_sur, size=n, dtype=np.int64)
+    s_vals[s_vals >= 0] += 1
+
+    # Repeat until the supply values sum to 0
+    total_s = int(s_vals.sum())
+    while total_s != 0:
+        # Calculate the direction depots need to move in and how far each one can move
+        if total_s > 0:
+            direction = -1
+            capacity = s_vals - max_def
+        else:
+            direction = 1
+            capacity = max_sur - s_vals
+
+        # Move depots in a random order until the total is cancelled out
+        order = rng.permutation(n)
+        cum_capacity = np.cumsum(capacity[order])
+        last = int(np.searchsorted(cum_capacity, abs(total_s)))
+        # The final depot is only moved as far as needed
+        moves = capacity[order[:last + 1]]
+        moves[-1] -= cum_capacity[last] - abs(total_s)
+        s_vals[order[:last + 1]] += direction * moves
+
+        # No depot can have a supply value of 0 so move any that do one step further
+        # Moving them changes the total, which is cancelled in the next iteration
+        s_vals[s_vals == 0] = direction
+        total_s = int(s_vals.sum())
+
+    return s_vals
+
+
+def generate_model(n: int, alpha=2, max_def=-100, max_sur=100,
+                   rng: np.random.Generator = None, k_nearest: int = None) -> TNRPModel:
+    """
+    Generates a model with n depots using NumPy sampling, so large instances can be created
+
+    params:
+        n - The number of depots in the model
+        alpha - A constant to scale the grid by (default=2)
+        max_def - The maximum supply deficit value of each depot (default=-100)
+        max_sur - The maximum supply surplus value of each depot (default=100)
+        rng - The random number generator used (default=a new unseeded generator)
+        k_nearest - If given, a sparse model keeping the k nearest opposite-sign depots
+                    of each depot is created instead of one with a distance matrix (default=None)
+
+    returns:
+        The model as a TNRPModel
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    x, y = sample_locations(n=n, alpha=alpha, rng=rng)
+    s_vals = sample_s_vals(n=n, max_def=max_def, max_sur=max_sur, rng=rng)
+    return TNRPModel(x=x, y=y, s=s_vals, k_nearest=k_nearest)
+
+
+def chunk_sizes(n: int, chunk_size: int) -> List[int]:
+    """
+    Splits n depots into chunks of chunk_size, adding a final chunk of a single depot to the one before it,
+    as supply values can only sum to 0 over at least 2 depots
+
+    params:
+        n - The number of depots
+        chunk_size - The number of depots in each chunk
+
+    returns:
+        The number of depots in each chunk
+    """
+    if n < 2:
+        raise ValueError("n must be at least 2 for supply values to sum to 0")
+    chunk_size = max(chunk_size, 2)
+    sizes = [chunk_size] * (n // chunk_size)
+    if n % chunk_size == 1:
+        sizes[-1] += 1
+    elif n % chunk_size > 1:
+        sizes.append(n % chunk_size)
+    return sizes
+
+
+def write_generated_model(filepath: str, n: int, alpha=2, max_def=-100, max_sur=100,
+                          rng: np.random.Generator = None, chunk_size=100000):
+    """
+    Generates a model with n depots and writes it straight to a text file, in the format
+    read by instance_io.read_text_model, without creating any Depot objects or distances.
+
+    The depots are generated and written chunk_size at a time, so memory use depends on chunk_size
+    rather than n. The grid is split into one band of cells for each chunk, the number of depots in
+    each band is drawn from a multinomial distribution, and each band's depots are sampled from its
+    own cells, so every depot has a unique location. The supply values of each chunk of depots sum to 0
+
+    params:
+        filepath - The path of the text file to write to
+        n - The number of depots in the model
+        alpha - A constant to scale the grid by (default=2)
+        max_def - The maximum supply deficit value of each depot (default=-100)
+        max_sur - The maximum supply surplus value of each depot (default=100)
+        rng - The random number generator used (default=a new unseeded generator)
+        chunk_size - The number of depots generated and written at a time (default=100000)
+    """
+    # Need to ensure alpha > 1 so all depots can be created in unique locations
+    if alpha < 1:
+        raise ValueError("alpha must be greater than 1")
+    if rng is None:
+        rng = np.random.default_rng()
+
+    sizes = chunk_sizes(n=n, chunk_size=chunk_size)
+
+    # Split the cells of the grid into a band for each chunk, and the depots between the bands
+    width = int(alpha * n)
+    edges = np.arange(len(sizes) + 1, dtype=np.int64) * (width * width // len(sizes))
+    edges[-1] = width * width
+    # Each band has at least 2n cells, as there are at most n / 2 bands, so always has room for its depots
+    band_counts = rng.multinomial(n, np.diff(edges) / (width * width))
+
+    # The supply values are drawn a chunk at a time, and taken for each band as it is written
+    supply_chunks = (sample_s_vals(n=size, max_def=max_def, max_sur=max_sur, rng=rng) for size in sizes)
+    s_vals = np.empty(0, dtype=np.int64)
+
+    depot = 0
+    with open(filepath, 'w') as f:
+        for band, count in enumerate(band_counts.tolist()):
+            # Sample unique cells of the band and convert each into its coordinates
+            cells = edges[band] + rng.choice(int(edges[band + 1] - edges[band]), size=count, replace=False)
+            x, y = cells % width, cells // width
+
+            # Take the band's supply values, drawing the next chunks when needed
+            while len(s_vals) < count:
+                s_vals = np.concatenate([s_vals, next(supply_chunks)])
+            band_s, s_vals = s_vals[:count], s_vals[count:]
+
+            # Write the band's depots as lines of the form 'Depot N, (x,y): (x,y), S: s'
+            f.writelines(f'Depot {depot + i}, (x,y): ({x[i]},{y[i]}), S: {band_s[i]}\n' for i in range(count))
+            depot += count
+
+
+def create_model(n: int, alpha=2, max_def=-100, max_sur=100,
+                 rng: np.random.Generator = None) -> TNRPModel:
     """
     Create a model with n depots at randomly generated locations.
     Each depot has a supply value (S) between max deficit and max surplus
@@ -136,34 +328,17 @@ def create_model(n: int, alpha=2, max_def=-100, max_sur=100) -> Dict[int, Depot]
         alpha - A constant to scale the matrix by (default=2)
         max_def - The maximum supply deficit value of each depot (default=-100)
         max_sur - The maximum supply surplus value of each depot (default=100)
+        rng - The random number generator used (default=a generator seeded from the random module)
 
     returns:
-        A dictionary of the depot names to the depot objects: {depot_name: DepotObj}
+        The model as a TNRPModel, which behaves as a dictionary of depot name: Depot object
     """
     # Need to ensure alpha > 1 so all depots can be created in unique locations
     if alpha < 1:
         raise ValueError("alpha must be greater than 1")
 
-    # Generate the location of the depots
-    dep_locs = create_locations(n=n, alpha=alpha)
-
-    # Generate the n supply values
-    s_vals = generate_s_vals(n=n, max_def=max_def, max_sur=max_sur)
-
-    # Create the depots as Depot objects
-    deps: Dict[int, Depot] = {}
-    for i in range(len(dep_locs)):
-        # Assign the corresponding names, locations and supply values to each depot
-        new_dep = Depot(name=dep_locs[i]['name'], s=s_vals[i],
-                        x=dep_locs[i]['long'], y=dep_locs[i]['lat'])
-        # Add the depot to the dictionary
-        deps[new_dep.get_name()] = new_dep
-
-    # Calculate the distances between depots
-    for i in range(len(deps)):  # For each of the depots
-        # Only calculate new connections as the add_connection method adds to both connections dicts
-        for j in range(i, len(deps)):
-            # Add the connection to both depotss
-            deps[i].add_connection(deps[j])
-
-    return deps
+    # Seed the generator from the random module so random.seed still makes models reproducible
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+
+    return generate_model(n=n, alpha=alpha, max_def=max_def, max_sur=max_sur, rng=rng)
@@ -0,0 +1,70 @@
+"""
+File for comparing the convergence of the ACS and AS algorithms on the TNRP examples
+"""
+import copy
+import os
+import time
+from searches.aco.ACS import ACS
+from searches.aco.AS import AS
+from searches.aco.create_matrices import BipartiteIndex, create_dist_matrix, create_bipartite_heur_matrix, \
+    create_bipartite_pher_matrix
+from TNRP_model.instance_io import load_binary_model, read_text_model
+from visualise import plot_convergence, show_best
+
+
+if __name__ == "__main__":
+    # Set the problem sizes to perform the experiment on
+    prob_sizes = [30, 100]
+    max_j_size = 20
+
+    # Select the number of fitness evaluations
+    iters = 2000
+
+    # Set the algorithm hyperparameters, with the same population size for both algorithms
+    m = 10
+    e = 0.2
+    Q = 100
+    alpha = 1
+    beta = 3
+    # ACS hyperparameters
+    q0 = 0.9
+    phi = 0.1
+
+    for n in prob_sizes:
+        print(f"N={n}")
+
+        # Read the model, memory-mapping the binary file if the example has been converted
+        binary_path = f'./TNRP_examples/{n}.tnrp'
+        if os.path.exists(binary_path):
+            model = load_binary_model(filepath=binary_path)
+        else:
+            model = read_text_model(filepath=f'./TNRP_examples/{n}.txt')
+
+        # Create the matrices for the algorithms
+        d = create_dist_matrix(model=model)
+        index = BipartiteIndex.from_model(model=model)
+        h = create_bipartite_heur_matrix(dist_matrix=d, index=index)
+
+        # Execute the AS algorithm using the hyperparameters
+        p = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+        as_start_time = time.time()
+        as_vals, _ = AS(model=copy.deepcopy(model), m=m, e=e, Q=Q, d=d, p=p, h=h, n=iters,
+                        max_journey_size=max_j_size, alpha=alpha, beta=beta)
+        as_time = time.time() - as_start_time
+
+        # Execute the ACS algorithm using the hyperparameters
+        p = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+        acs_start_time = time.time()
+        acs_vals, _ = ACS(model=copy.deepcopy(model), m=m, e=e, Q=Q, d=d, p=p, h=h, n=iters,
+                          max_journey_size=max_j_size, alpha=alpha, beta=beta, q0=q0, phi=phi)
+        acs_time = time.time() - acs_start_time
+
+        # Output the best fitness and computation time of each algorithm
+        print(f"AS: best fitness {min(as_vals)} in {as_time:.2f}s")
+        print(f"ACS: best fitness {min(acs_vals)} in {acs_time:.2f}s")
+
+    # Show the best fitness at each iteration of ACS on the largest problem
+    show_best(acs_vals)
+
+    # Plot the fitness of the algorithm
+    plot_convergence(fitness_vals=acs_vals, algo="ACS")
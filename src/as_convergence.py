@@ -3,7 +3,8 @@ File for testing the convergence pattern of the AS algorithm
 """
 from visualise import plot_convergence, read_model, show_best
 from searches.aco.AS import AS
-from searches.aco.create_matrices import create_dist_matrix, create_heur_matrix, create_pher_matrix
+from searches.aco.create_matrices import BipartiteIndex, create_dist_matrix, create_bipartite_heur_matrix, \
+    create_bipartite_pher_matrix
 
 
 if __name__ == "__main__":
@@ -17,8 +18,9 @@ if __name__ == "__main__":
 
     # Create the matrices for the AS algorithm
     d = create_dist_matrix(model=model)
-    p = create_pher_matrix(model=model, dist_matrix=d, p_min=1, p_max=1)
-    h = create_heur_matrix(dist_matrix=d)
+    index = BipartiteIndex.from_model(model=model)
+    p = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+    h = create_bipartite_heur_matrix(dist_matrix=d, index=index)
 
     # Set the algorithm hyperparameters
     m = 1
@@ -2,14 +2,18 @@
 Performs the comparison of algorithms on the TNRP
 """
 import copy
+import os
 import numpy as np
 import time
 from searches.aco.AS import AS
-from searches.aco.create_matrices import create_dist_matrix, create_heur_matrix, create_pher_matrix
+from searches.aco.create_matrices import BipartiteIndex, create_dist_matrix, create_bipartite_heur_matrix, \
+    create_bipartite_pher_matrix
 from searches.ga.ga import ga
 from searches.sa.sa import sa
-from searches.random_search import random_search
-from searches.utils import fitness
+from searches.random_search import random_solution
+from searches.utils import fitness_batch, pack_solutions
+from TNRP_model.supply_state import SupplyState
+from TNRP_model.instance_io import load_binary_model, load_heur_matrix
 from visualise import read_model, show_best, plot_convergence_comparison, plot_time_comparison, plot_fitness_comparison
 
 if __name__ == "__main__":
@@ -37,8 +41,16 @@ if __name__ == "__main__":
         # alpha value used to scale average distance between depots in the model
         alpha = 2
 
-        # Read the model from the text file
-        model = read_model(filename=str(n))
+        # Read the model, memory-mapping the binary file if the example has been converted
+        # The binary files are created using: python -m TNRP_model.instance_io
+        binary_path = f'./TNRP_examples/{n}.tnrp'
+        stored_h = None
+        if os.path.exists(binary_path):
+            model = load_binary_model(filepath=binary_path)
+            stored_h = load_heur_matrix(filepath=binary_path)
+        else:
+            # Read the model from the text file
+            model = read_model(filename=str(n))
 
         # Create empty lists for storing fitness values, best convergence paths and computation times
         aco_vals = []
@@ -72,10 +84,13 @@ if __name__ == "__main__":
             print("Starting ACO")
             # Create the distance, pheromone and heuristic matrices
             d = create_dist_matrix(model=model)
+            # The pheromone and heuristic matrices only hold the surplus -> deficit edges
+            index = BipartiteIndex.from_model(model=model)
             # Pheromone matrix values initialised between 1 and 1
-            p = create_pher_matrix(
-                model=model, dist_matrix=d, p_min=1, p_max=1)
-            h = create_heur_matrix(dist_matrix=d)
+            p = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+            # Use the stored heuristic matrix if there is one
+            h = index.restrict(matrix=stored_h) if stored_h is not None else \
+                create_bipartite_heur_matrix(dist_matrix=d, index=index)
 
             # Store the start time of the AS algorithm
             aco_start_time = time.time()
@@ -157,14 +172,18 @@ if __name__ == "__main__":
             print("Starting Random Search")
             # Store the start time of the random search
             rs_start_time = time.time()
-            # Store the value for each of the iteration runs
-            rs_run = []
+            # Create a supply state for the random searches to be performed on
+            rs_state = SupplyState(model=model)
             # Perform the random search up to the number of fitness evaluations
+            rs_solutions = []
             for _ in range(iters):
-                solution = random_search(
-                    model=copy.deepcopy(model), max_journey_size=20)
-                # Add the fitness of solution to the random search run
-                rs_run.append(fitness(path=solution, model=model))
+                # Return the supply values to the initial state of the model
+                rs_state.reset()
+                rs_solutions.append(random_solution(
+                    model=rs_state, max_journey_size=20))
+            # Calculate the fitness of every solution of the random search run at once
+            froms, tos, offsets = pack_solutions(solutions=rs_solutions)
+            rs_run = fitness_batch(froms=froms, tos=tos, model=model, offsets=offsets).tolist()
             # Calculate length of time for random search to execute
             rs_time_dif = time.time() - rs_start_time
             rs_times.append(rs_time_dif)
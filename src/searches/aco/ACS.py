@@ -0,0 +1,95 @@
+"""
+Executes the main body of the Ant Colony System (ACS) algorithm
+"""
+from math import inf
+from typing import List, Dict, Tuple
+from TNRP_model.depot import Depot
+from searches.aco.colony import Colony
+from searches.aco.pheromone import PheromoneMatrix
+from searches.utils import fitness_batch
+from searches.solution import Solution
+
+
+def ACS(model: Dict[int, Depot], m: int, e: float, Q: int, d: List[List[float]],
+        p: List[List[float]], h: List[List[float]], n: int, max_journey_size: int,
+        alpha=1, beta=2, q0=0.9, phi=0.1, k: int = None) -> Tuple[List[float], List[Dict[str, int]]]:
+    """
+    Performs the ACS algorithm on the TNRP.
+
+    Each ant moves to the most attractive deficit depot with probability q0, and otherwise picks one with
+    the roulette wheel of AS. After each ant the edges it used decay towards the initial pheromone tau0, so
+    the next ants explore other edges, and after each population only the best path so far deposits pheromone.
+    tau0 is Q divided by the fitness of a greedy path (q0 = 1), which is the first fitness evaluation
+
+    params:
+    model - The model as dictionary of depot_name: Depot object
+    m - population size
+    e - evaporation rate of the global update on the best path's edges
+    Q - constant for fitness normalisation
+    d - distance matrix
+    p - pheromone matrix, either full or bipartite. Every edge is set to tau0, and it is updated with the
+        final pheromone
+    h - heuristic matrix, either full or bipartite
+    n - Termination condition - number of fitness evals before termination
+    max_journey_size - The maximum size of each journey
+    alpha - The exponent used to scale the pheromone matrix in transition probabilities (default=1)
+    beta - The exponent used to scale the heuristic matrix in transition probabilities (default=2)
+    q0 - The probability of moving to the most attractive deficit depot (default=0.9)
+    phi - The decay rate of the local update of the edges used by each ant (default=0.1)
+    k - If given, each surplus depot only moves to its k nearest deficit depots, until they are all resolved
+        (default=None, every deficit depot)
+
+    returns:
+        A tuple of the fitness of each evaluation and the best path as a list of Dictionaries of {from, to, s}
+    """
+    colony = Colony(model=model, d=d, p=p, h=h, max_journey_size=max_journey_size, alpha=alpha, beta=beta,
+                    k=k)
+
+    # Empty array to store results of all fitness evals
+    all_fitnesses = []
+
+    # Store the best path so far
+    best_path = Solution(capacity=1)
+    best_fitness = inf
+
+    pheromone = PheromoneMatrix(p=colony.p, h=colony.h, alpha=alpha, beta=beta, index=colony.index)
+
+    def path_fitness(path: Solution) -> float:
+        """Calculates the fitness of a path"""
+        return float(fitness_batch(froms=path.froms, tos=path.tos, model=model, offsets=[0, len(path)])[0])
+
+    # Set every edge to tau0 from a greedy path, which is the first fitness evaluation
+    tau0 = None
+    if n > 0:
+        best_path = colony.construct_ant(pheromone=pheromone, q0=1)
+        best_fitness = path_fitness(path=best_path)
+        all_fitnesses.append(best_fitness)
+        tau0 = Q / best_fitness if best_fitness > 0 else 1.0
+        pheromone.reset(value=tau0)
+
+    # Repeat until termination criterion is met
+    while len(all_fitnesses) < n:
+        # Create a population of m ants, stopping if the termination condition would be broken
+        for _ in range(min(m, n - len(all_fitnesses))):
+            path = colony.construct_ant(pheromone=pheromone, q0=q0)
+
+            # Decay the edges used by the ant towards tau0 so the next ants are less likely to use them
+            pheromone.blend(froms=path.froms, tos=path.tos, rate=phi, target=tau0)
+
+            # Add the fitness evaluation to the fitnesses list
+            ant_fitness = path_fitness(path=path)
+            all_fitnesses.append(ant_fitness)
+
+            # If the ant has the best so far fitness then store its path
+            if ant_fitness < best_fitness:
+                best_path = path
+                best_fitness = ant_fitness
+
+        # Only the edges of the best path so far evaporate and receive pheromone
+        pheromone.blend(froms=best_path.froms, tos=best_path.tos, rate=e,
+                        target=Q / best_fitness if best_fitness > 0 else tau0)
+
+    # Write the final pheromone back into the matrix passed in
+    pheromone.write_back(p=p)
+
+    return all_fitnesses, best_path.to_dicts()
@@ -2,16 +2,21 @@
 Executes the main body of the AS algorithm
 """
 from math import inf
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import numpy as np
 from TNRP_model.depot import Depot
-from searches.aco.path_generation import generate_path
-from searches.aco.pheromone import update_pheromone
-from searches.utils import fitness
+from searches.aco.colony import Colony
+from searches.aco.local_search import descent
+from searches.aco.pheromone import PheromoneMatrix, update_pheromone
+from searches.aco.warm_start import save_pheromone, warm_start_pher_matrix
+from searches.utils import fitness_batch, pack_solutions
+from searches.solution import Solution
 
 
 def AS(model: Dict[int, Depot], m: int, e: float, Q: int, d: List[List[float]],
        p: List[List[float]], h: List[List[float]], n: int, max_journey_size: int,
-       alpha=1, beta=2) -> int:
+       alpha=1, beta=2, k: int = None, batch_min=8, workers=1, warm_start_dir: str = None,
+       warm_start_weight=0.5, local_search_steps=0) -> Tuple[List[float], List[Dict[str, int]]]:
     """
     Performs the AS algorithm on the TNRP
 
@@ -21,65 +26,99 @@ def AS(model: Dict[int, Depot], m: int, e: float, Q: int, d: List[List[float]],
     e - evaporation rate
     Q - constant for fitness normalisation
     d - distance matrix
-    p - pheromone matrix
+    p - pheromone matrix, either full or bipartite with a row for each surplus and a column for each deficit depot.
+        It is updated with the final pheromone
+    h - heuristic matrix, either full or bipartite
     n - Termination condition - number of fitness evals before termination
     max_journey_size - The maximum size of each journey
     alpha - The exponent used to scale the pheromone matrix in transition probabilities (default=1)
     beta - The exponent used to scale the heuristic matrix in transition probabilities (default=2)
+    k - If given, each surplus depot only moves to its k nearest deficit depots, until they are all resolved
+        (default=None, every deficit depot)
+    batch_min - Populations of at least this many ants are constructed together in lock-step (default=8)
+    workers - The number of processes constructing the ants of each population. Above 1 the attractiveness
+              matrix is shared with worker processes, whose random numbers are seeded from the random module
+              (default=1, ants are constructed in this process)
+    warm_start_dir - If given, the pheromone saved in this directory for the same depot layout is blended into p,
+                     and the final pheromone is saved there (default=None, no warm start)
+    warm_start_weight - The weight of the saved pheromone in the blend (default=0.5)
+    local_search_steps - If above 0, the best ant of each population is improved by a descent trying this many
+                         deficit swaps before the pheromone is deposited with its improved fitness. Each swap
+                         tried counts as a fitness evaluation, after the ant's own evaluation, so runs with the
+                         same n have the same budget (default=0, no local search)
 
     returns:
-        List of fitnesses at each evaluation
+        A tuple of the fitness of each evaluation and the best path as a list of Dictionaries of {from, to, s}
     """
-    # Split depots into surplus and deficit depots
-    surplus_deps = {dep: model[dep] for dep in model if model[dep].get_s() > 0}
-    deficit_deps = {dep: model[dep] for dep in model if model[dep].get_s() < 0}
+    colony = Colony(model=model, d=d, p=p, h=h, max_journey_size=max_journey_size, alpha=alpha, beta=beta,
+                    k=k, batch_min=batch_min)
+
+    # Start from the pheromone of previous runs on the same depot layout
+    bipartite_p = colony.p
+    if warm_start_dir is not None:
+        bipartite_p = warm_start_pher_matrix(directory=warm_start_dir, model=model, p=bipartite_p,
+                                             index=colony.index, weight=warm_start_weight)
 
     # Empty array to store results of all fitness evals
     all_fitnesses = []
 
     # Store the best path so far
-    best_path = []
+    best_path = Solution(capacity=1)
     best_fitness = inf
 
     # Variable for number of fitness evaluations so far
     fitness_evals = 0
 
-    # Repeat until termination criterion is met
-    while fitness_evals < n:
-        # Store the paths and fitnesses of the population
-        paths = []
-        fitnesses = []
-
-        # Create a population of m ants:
-        for _ in range(m):
-
-            # Check if the termination condition is broken part-way through creation of population
-            if fitness_evals == n:
-                # If so end creation of population
-                break
-
-            # Generate a path using heuristic and pheromone information
-            path = generate_path(
-                sur_deps=surplus_deps, def_deps=deficit_deps, d=d, h=h, p=p,
-                max_journey_size=max_journey_size, alpha=alpha, beta=beta)
-
-            # Calculate the fitness of the solution
-            ant_fitness = fitness(path=path, model=model)
-            # Increment the number of fitness evaluations
-            fitness_evals += 1
-            # Add the fitness evaluation to the fitnesses list
-            all_fitnesses.append(ant_fitness)
-
-            # If the ant has the best so far fitness then store its path
-            if ant_fitness < best_fitness:
-                best_path = path
-                best_fitness = ant_fitness
-
-            # Add paths and fitnesses to population paths and fitnesses
-            paths.append(path)
-            fitnesses.append(ant_fitness)
-
-        # Update the pheromone using the population
-        update_pheromone(p=p, paths=paths, fitnesses=fitnesses, e=e, Q=Q)
-
-    return all_fitnesses, best_path
+    # Keep the pheromone with a global scale, so evaporation doesn't touch every edge, and keep the
+    # attractiveness of every edge up to date with each deposit
+    pheromone = PheromoneMatrix(p=bipartite_p, h=colony.h, alpha=alpha, beta=beta, index=colony.index)
+
+    # Construct the ants in worker processes reading a shared attractiveness matrix, which the
+    # pheromone then updates in place
+    colony.start_workers(pheromone=pheromone, workers=workers)
+
+    with colony:
+        # Repeat until termination criterion is met
+        while fitness_evals < n:
+            # Create a population of m ants, stopping if the termination condition would be broken
+            paths = colony.construct(m=min(m, n - fitness_evals), pheromone=pheromone)
+
+            # Calculate the fitness of every ant in the population at once
+            froms, tos, offsets = pack_solutions(solutions=paths)
+            fitnesses = fitness_batch(froms=froms, tos=tos, model=model, offsets=offsets).tolist()
+
+            for path, ant_fitness in zip(paths, fitnesses):
+                # Increment the number of fitness evaluations
+                fitness_evals += 1
+                # Add the fitness evaluation to the fitnesses list
+                all_fitnesses.append(ant_fitness)
+
+                # If the ant has the best so far fitness then store its path
+                if ant_fitness < best_fitness:
+                    best_path = path
+                    best_fitness = ant_fitness
+
+            # Polish the best ant of the population with a descent, where each swap tried is a fitness evaluation
+            steps = min(local_search_steps, n - fitness_evals)
+            if steps > 0:
+                pop_best = int(np.argmin(fitnesses))
+                paths[pop_best], fitnesses[pop_best], energies = descent(
+                    solution=paths[pop_best], model=model, max_journey_size=max_journey_size,
+                    steps=steps, candidates=colony.candidates)
+                fitness_evals += len(energies)
+                all_fitnesses.extend(energies)
+
+                # Store the polished ant if it is the best so far
+                if fitnesses[pop_best] < best_fitness:
+                    best_path = paths[pop_best]
+                    best_fitness = fitnesses[pop_best]
+
+            # Update the pheromone using the population
+            update_pheromone(p=pheromone, paths=paths, fitnesses=fitnesses, e=e, Q=Q)
+
+    # Write the final pheromone back into the matrix passed in
+    final_p = pheromone.write_back(p=p)
+    if warm_start_dir is not None:
+        save_pheromone(directory=warm_start_dir, model=model, p=final_p, index=colony.index)
+
+    return all_fitnesses, best_path.to_dicts()
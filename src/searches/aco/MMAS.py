@@ -0,0 +1,151 @@
+"""
+Executes the main body of the MAX-MIN Ant System (MMAS) algorithm
+"""
+from math import inf
+from typing import List, Dict, Tuple
+import numpy as np
+from TNRP_model.depot import Depot
+from searches.aco.colony import Colony
+from searches.aco.pheromone import PheromoneMatrix, update_pheromone
+from searches.utils import fitness_batch, pack_solutions
+from searches.solution import Solution
+
+
+def pheromone_bounds(best_fitness: float, e: float, Q: int, num_choices: int, p_best=0.05) -> Tuple[float, float]:
+    """
+    Calculates the pheromone bounds of MMAS from the best fitness so far
+
+    params
+        best_fitness - The best fitness found so far
+        e - evaporation rate
+        Q - constant for fitness normalisation
+        num_choices - The number of deficit depots an ant can choose from
+        p_best - The probability an ant constructs the best path once the pheromone has converged (default=0.05)
+
+    returns
+        Tuple of the minimum and maximum pheromone
+    """
+    # The pheromone an edge converges to if it is on the best path in every population
+    p_max = Q / (e * best_fitness)
+
+    # The minimum gives the best path a probability of p_best once converged, with an ant making a choice
+    # for each deficit depot from half of them on average
+    root = p_best ** (1 / max(num_choices, 1))
+    avg_choices = max(num_choices / 2, 1)
+    p_min = p_max * (1 - root) / ((avg_choices - 1) * root) if avg_choices > 1 else p_max
+    return min(p_min, p_max), p_max
+
+
+def MMAS(model: Dict[int, Depot], m: int, e: float, Q: int, d: List[List[float]],
+         p: List[List[float]], h: List[List[float]], n: int, max_journey_size: int,
+         alpha=1, beta=2, k: int = None, batch_min=8, workers=1, p_best=0.05, global_best_every=5,
+         restart_branching=2, restart_after=20, lam=0.05) -> Tuple[List[float], List[Dict[str, int]]]:
+    """
+    Performs the MMAS algorithm on the TNRP.
+
+    Only the best path of each population, or the best path so far, deposits pheromone, and the pheromone is
+    kept within bounds so no edge's probability reaches 0. When the branching factor of the pheromone shows it
+    has stagnated it is reinitialised to the maximum
+
+    params:
+    model - The model as dictionary of depot_name: Depot object
+    m - population size
+    e - evaporation rate
+    Q - constant for fitness normalisation
+    d - distance matrix
+    p - pheromone matrix, either full or bipartite. It is updated with the final pheromone
+    h - heuristic matrix, either full or bipartite
+    n - Termination condition - number of fitness evals before termination
+    max_journey_size - The maximum size of each journey
+    alpha - The exponent used to scale the pheromone matrix in transition probabilities (default=1)
+    beta - The exponent used to scale the heuristic matrix in transition probabilities (default=2)
+    k - If given, each surplus depot only moves to its k nearest deficit depots, until they are all resolved
+        (default=None, every deficit depot)
+    batch_min - Populations of at least this many ants are constructed together in lock-step (default=8)
+    workers - The number of processes constructing the ants of each population (default=1)
+    p_best - The probability of constructing the best path once the pheromone has converged, which sets the
+             minimum pheromone (default=0.05)
+    global_best_every - Every this many populations the best path so far deposits pheromone instead of the
+                        population's best path (default=5, 0 to only use the population's best path)
+    restart_branching - The pheromone is reinitialised when the mean branching factor falls to this multiple of
+                        the number of edges from each surplus depot in the best path so far (default=2)
+    restart_after - The pheromone is only reinitialised after this many populations without an improvement
+                    (default=20)
+    lam - The lambda of the branching factor (default=0.05)
+
+    returns:
+        A tuple of the fitness of each evaluation and the best path as a list of Dictionaries of {from, to, s}
+    """
+    colony = Colony(model=model, d=d, p=p, h=h, max_journey_size=max_journey_size, alpha=alpha, beta=beta,
+                    k=k, batch_min=batch_min)
+
+    # The number of deficit depots an ant can choose from
+    num_choices = len(colony.def_deps) if k is None else min(k, len(colony.def_deps))
+
+    # Empty array to store results of all fitness evals
+    all_fitnesses = []
+
+    # Store the best path so far
+    best_path = Solution(capacity=1)
+    best_fitness = inf
+
+    # Variable for number of fitness evaluations so far
+    fitness_evals = 0
+    populations = 0
+    last_improvement = 0
+
+    # The pheromone bounds, which are set once the first population has a best path
+    p_min, p_max = None, None
+
+    pheromone = PheromoneMatrix(p=colony.p, h=colony.h, alpha=alpha, beta=beta, index=colony.index)
+
+    # Construct the ants in worker processes reading a shared attractiveness matrix
+    colony.start_workers(pheromone=pheromone, workers=workers)
+
+    with colony:
+        # Repeat until termination criterion is met
+        while fitness_evals < n:
+            # Create a population of m ants, stopping if the termination condition would be broken
+            paths = colony.construct(m=min(m, n - fitness_evals), pheromone=pheromone)
+
+            # Calculate the fitness of every ant in the population at once
+            froms, tos, offsets = pack_solutions(solutions=paths)
+            fitnesses = fitness_batch(froms=froms, tos=tos, model=model, offsets=offsets).tolist()
+            populations += 1
+
+            # Store every fitness evaluation and the best path of the population
+            all_fitnesses.extend(fitnesses)
+            fitness_evals += len(fitnesses)
+            pop_best = int(np.argmin(fitnesses))
+            if fitnesses[pop_best] < best_fitness:
+                last_improvement = populations
+                best_path = paths[pop_best]
+                best_fitness = fitnesses[pop_best]
+                # The bounds depend on the best fitness so far
+                first_bounds = p_max is None
+                p_min, p_max = pheromone_bounds(best_fitness=best_fitness, e=e, Q=Q, num_choices=num_choices,
+                                                p_best=p_best)
+                # Start from the maximum pheromone once it is known
+                if first_bounds:
+                    pheromone.reset(value=p_max)
+
+            # Only the best path of the population, or periodically the best so far, deposits pheromone
+            if global_best_every > 0 and populations % global_best_every == 0:
+                update_pheromone(p=pheromone, paths=[best_path], fitnesses=[best_fitness], e=e, Q=Q)
+            else:
+                update_pheromone(p=pheromone, paths=[paths[pop_best]], fitnesses=[fitnesses[pop_best]], e=e, Q=Q)
+            pheromone.clamp(p_min=p_min, p_max=p_max)
+
+            # Reinitialise the pheromone if it has stagnated, when the best path hasn't improved for a while and
+            # the branching factor is close to that of the pheromone only being high on the best path's edges
+            if populations - last_improvement >= restart_after:
+                best_edges = set(zip(best_path.froms.tolist(), best_path.tos.tolist()))
+                best_branching = len(best_edges) / len(colony.sur_deps)
+                if pheromone.branching_factor(lam=lam) <= restart_branching * best_branching:
+                    pheromone.reset(value=p_max)
+                    last_improvement = populations
+
+    # Write the final pheromone back into the matrix passed in
+    pheromone.write_back(p=p)
+
+    return all_fitnesses, best_path.to_dicts()
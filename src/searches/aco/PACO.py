@@ -0,0 +1,194 @@
+"""
+Executes the main body of the Population-based ACO (P-ACO) algorithm
+"""
+from collections import deque
+from math import inf
+from typing import List, Dict, Tuple
+import numpy as np
+from TNRP_model.depot import Depot
+from searches.aco.colony import Colony
+from searches.aco.create_matrices import BipartiteIndex
+from searches.aco.pheromone import PheromoneMatrix
+from searches.utils import fitness_batch, pack_solutions
+from searches.solution import Solution
+
+
+class PathArchive:
+    """
+    A fixed-size archive of good paths, which defines the pheromone of P-ACO.
+
+    With the 'fifo' policy every path added enters the archive and the oldest path leaves once it is full.
+    With the 'quality' policy a path only enters a full archive if it is better than the worst path,
+    which leaves. The archive can be kept and passed to later runs on the same depot layout as a warm start
+    """
+
+    def __init__(self, size: int, policy='fifo') -> None:
+        """
+        Create an empty archive
+
+        params
+            size - The number of paths in a full archive
+            policy - 'fifo' or 'quality', how the path leaving a full archive is chosen (default='fifo')
+        """
+        if policy not in ('fifo', 'quality'):
+            raise ValueError(f"Unknown archive policy '{policy}', expected 'fifo' or 'quality'")
+        self.size = size
+        self.policy = policy
+        self.entries: deque = deque()
+
+    def add(self, path: Solution, path_fitness: float) -> Tuple[bool, Solution]:
+        """
+        Adds a path to the archive using its policy
+
+        params
+            path - The path to add
+            path_fitness - The fitness of the path
+
+        returns
+            Tuple of whether the path entered the archive and the path that left it, which is None if no path left
+        """
+        if len(self.entries) < self.size:
+            self.entries.append((path, path_fitness))
+            return True, None
+
+        if self.policy == 'fifo':
+            removed, _ = self.entries.popleft()
+            self.entries.append((path, path_fitness))
+            return True, removed
+
+        # Replace the worst path if the new path is better
+        worst = max(range(len(self.entries)), key=lambda i: self.entries[i][1])
+        if path_fitness >= self.entries[worst][1]:
+            return False, None
+        removed, _ = self.entries[worst]
+        del self.entries[worst]
+        self.entries.append((path, path_fitness))
+        return True, removed
+
+    def paths(self) -> List[Solution]:
+        """
+        returns
+            The paths in the archive, oldest first
+        """
+        return [path for path, _ in self.entries]
+
+    def __len__(self) -> int:
+        """The number of paths in the archive"""
+        return len(self.entries)
+
+
+def archive_edges(path: Solution, index: BipartiteIndex) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the distinct surplus -> deficit edges of a path, leaving out any whose depots are no longer
+    a surplus and a deficit depot of the model, as the path may come from a warm start
+
+    params
+        path - The path
+        index - The rows and columns of the depots in the bipartite matrices
+
+    returns
+        Tuple of the from depots and to depots of the edges
+    """
+    edges = np.unique(np.stack([path.froms, path.tos]), axis=1)
+    froms, tos = edges[0], edges[1]
+    valid = (froms < len(index.rows)) & (tos < len(index.cols))
+    froms, tos = froms[valid], tos[valid]
+    valid = (index.rows[froms] >= 0) & (index.cols[tos] >= 0)
+    return froms[valid], tos[valid]
+
+
+def PACO(model: Dict[int, Depot], m: int, d: List[List[float]], p: List[List[float]], h: List[List[float]],
+         n: int, max_journey_size: int, alpha=1, beta=2, archive_size=5, policy='fifo', p_max: float = None,
+         archive: PathArchive = None, k: int = None, batch_min=8) -> Tuple[List[float], List[Dict[str, int]]]:
+    """
+    Performs the P-ACO algorithm on the TNRP.
+
+    The pheromone is the initial pheromone plus (p_max - initial) / archive_size on each edge for every
+    path in the archive using it. The best path of each population is added to the archive, and only the
+    edges of the paths entering and leaving the archive are updated, so there is no evaporation of the
+    whole matrix
+
+    params:
+    model - The model as dictionary of depot_name: Depot object
+    m - population size
+    d - distance matrix
+    p - initial pheromone matrix, either full or bipartite. It is updated with the final pheromone
+    h - heuristic matrix, either full or bipartite
+    n - Termination condition - number of fitness evals before termination
+    max_journey_size - The maximum size of each journey
+    alpha - The exponent used to scale the pheromone matrix in transition probabilities (default=1)
+    beta - The exponent used to scale the heuristic matrix in transition probabilities (default=2)
+    archive_size - The number of paths in a full archive, unless an archive is given (default=5)
+    policy - 'fifo' or 'quality', how the path leaving a full archive is chosen, unless an archive is given
+             (default='fifo')
+    p_max - The pheromone of an edge used by every path in a full archive
+            (default=None, the mean initial pheromone times the number of deficit depots)
+    archive - An archive from a previous run on the same depot layout, which is used and updated
+              (default=None, a new empty archive)
+    k - If given, each surplus depot only moves to its k nearest deficit depots, until they are all resolved
+        (default=None, every deficit depot)
+    batch_min - Populations of at least this many ants are constructed together in lock-step (default=8)
+
+    returns:
+        A tuple of the fitness of each evaluation and the best path as a list of Dictionaries of {from, to, s}
+    """
+    colony = Colony(model=model, d=d, p=p, h=h, max_journey_size=max_journey_size, alpha=alpha, beta=beta,
+                    k=k, batch_min=batch_min)
+    index = colony.index
+
+    pheromone = PheromoneMatrix(p=colony.p, h=colony.h, alpha=alpha, beta=beta, index=index)
+
+    if archive is None:
+        archive = PathArchive(size=archive_size, policy=policy)
+
+    # The pheromone each archived path adds to its edges
+    p_init = float(np.mean(pheromone.values)) if pheromone.values.size > 0 else 0.0
+    if p_max is None:
+        p_max = p_init * len(colony.def_deps)
+    delta = (p_max - p_init) / archive.size
+
+    # Add the pheromone of the paths already in the archive
+    for path in archive.paths():
+        froms, tos = archive_edges(path=path, index=index)
+        pheromone.deposit(froms=froms, tos=tos, amounts=np.full(len(froms), delta))
+
+    # Empty array to store results of all fitness evals
+    all_fitnesses = []
+
+    # Store the best path so far
+    best_path = Solution(capacity=1)
+    best_fitness = inf
+
+    # Variable for number of fitness evaluations so far
+    fitness_evals = 0
+
+    # Repeat until termination criterion is met
+    while fitness_evals < n:
+        # Create a population of m ants, stopping if the termination condition would be broken
+        paths = colony.construct(m=min(m, n - fitness_evals), pheromone=pheromone)
+
+        # Calculate the fitness of every ant in the population at once
+        froms, tos, offsets = pack_solutions(solutions=paths)
+        fitnesses = fitness_batch(froms=froms, tos=tos, model=model, offsets=offsets).tolist()
+
+        # Store every fitness evaluation and the best path so far
+        all_fitnesses.extend(fitnesses)
+        fitness_evals += len(fitnesses)
+        pop_best = int(np.argmin(fitnesses))
+        if fitnesses[pop_best] < best_fitness:
+            best_path = paths[pop_best]
+            best_fitness = fitnesses[pop_best]
+
+        # Add the population's best path to the archive, only updating the edges of the paths that enter and leave
+        entered, removed = archive.add(path=paths[pop_best], path_fitness=fitnesses[pop_best])
+        if entered:
+            froms, tos = archive_edges(path=paths[pop_best], index=index)
+            pheromone.deposit(froms=froms, tos=tos, amounts=np.full(len(froms), delta))
+        if removed is not None:
+            froms, tos = archive_edges(path=removed, index=index)
+            pheromone.deposit(froms=froms, tos=tos, amounts=np.full(len(froms), -delta))
+
+    # Write the final pheromone back into the matrix passed in
+    pheromone.write_back(p=p)
+
+    return all_fitnesses, best_path.to_dicts()
@@ -0,0 +1,139 @@
+"""
+The depots, matrices and ant construction shared by the ACO algorithms
+"""
+from typing import List, Dict
+import numpy as np
+from TNRP_model.depot import Depot
+from searches.aco.create_matrices import BipartiteIndex, create_candidate_lists
+from searches.aco.parallel import ParallelColony
+from searches.aco.path_generation import generate_colony, generate_solution
+from searches.aco.pheromone import PheromoneMatrix
+from searches.solution import Solution
+
+
+class Colony:
+    """
+    The surplus and deficit depots and bipartite matrices of an ACO run, which constructs the ants of
+    each population.
+
+    Only the surplus -> deficit edges are used, so full pheromone and heuristic matrices are restricted to
+    bipartite float32 matrices of those edges. Populations of at least batch_min ants are constructed together
+    in lock-step, or in worker processes once start_workers is called, and smaller populations one ant at a time
+    """
+
+    def __init__(self, model: Dict[int, Depot], d: List[List[float]], p: List[List[float]],
+                 h: List[List[float]], max_journey_size: int, alpha=1, beta=2, k: int = None,
+                 batch_min=8) -> None:
+        """
+        Split the depots and restrict the matrices
+
+        params
+            model - The model as dictionary of depot_name: Depot object
+            d - distance matrix
+            p - pheromone matrix, either full or bipartite
+            h - heuristic matrix, either full or bipartite
+            max_journey_size - The maximum size of each journey
+            alpha - The exponent used to scale the pheromone matrix in transition probabilities (default=1)
+            beta - The exponent used to scale the heuristic matrix in transition probabilities (default=2)
+            k - If given, each surplus depot only moves to its k nearest deficit depots, until they are all
+                resolved (default=None, every deficit depot)
+            batch_min - Populations of at least this many ants are constructed together in lock-step (default=8)
+        """
+        # Split depots into surplus and deficit depots
+        self.sur_deps = {dep: model[dep] for dep in model if model[dep].get_s() > 0}
+        self.def_deps = {dep: model[dep] for dep in model if model[dep].get_s() < 0}
+
+        self.index = BipartiteIndex.from_model(model=model)
+        self.p = p if self.index.is_bipartite(matrix=p) else self.index.restrict(matrix=p)
+        self.h = h if self.index.is_bipartite(matrix=h) else self.index.restrict(matrix=h)
+
+        # Restrict each surplus depot to the k nearest deficit depots if k is given
+        self.candidates = None
+        if k is not None:
+            self.candidates = create_candidate_lists(dist_matrix=d, index=self.index, k=k)
+
+        self.d = d
+        self.max_journey_size = max_journey_size
+        self.alpha = alpha
+        self.beta = beta
+        self.batch_min = batch_min
+
+        # The worker processes and the pheromone whose attractiveness they share, once started
+        self.workers: ParallelColony = None
+        self.pheromone: PheromoneMatrix = None
+
+    def start_workers(self, pheromone: PheromoneMatrix, workers: int):
+        """
+        Constructs the ants in worker processes reading a shared attractiveness matrix, which the pheromone
+        then updates in place. Nothing is started for a single worker
+
+        params
+            pheromone - The pheromone whose attractiveness the ants use
+            workers - The number of worker processes
+        """
+        if workers <= 1:
+            return
+        self.workers = ParallelColony(sur_deps=self.sur_deps, def_deps=self.def_deps,
+                                      attractiveness=pheromone.attractiveness, index=self.index,
+                                      max_journey_size=self.max_journey_size, workers=workers,
+                                      candidates=self.candidates, batch_min=self.batch_min)
+        pheromone.attractiveness = self.workers.attractiveness
+        self.pheromone = pheromone
+
+    def construct(self, m: int, pheromone: PheromoneMatrix) -> List[Solution]:
+        """
+        Constructs a population of ants
+
+        params
+            m - The number of ants
+            pheromone - The pheromone whose attractiveness the ants use
+
+        returns
+            The path of each ant
+        """
+        paths = []
+        if self.workers is not None:
+            # Generate the paths in the worker processes
+            paths = self.workers.generate(m=m)
+        elif m >= self.batch_min:
+            # Generate every path at once using heuristic and pheromone information
+            paths = generate_colony(
+                sur_deps=self.sur_deps, def_deps=self.def_deps, m=m, attractiveness=pheromone.attractiveness,
+                max_journey_size=self.max_journey_size, index=self.index, candidates=self.candidates)
+        for _ in range(m - len(paths)):
+            paths.append(self.construct_ant(pheromone=pheromone))
+        return paths
+
+    def construct_ant(self, pheromone: PheromoneMatrix, q0=0) -> Solution:
+        """
+        Constructs one ant in this process
+
+        params
+            pheromone - The pheromone whose attractiveness the ant uses
+            q0 - The probability of moving to the most attractive deficit depot, as in ACS (default=0)
+
+        returns
+            The path of the ant
+        """
+        # Generate a path using heuristic and pheromone information
+        return generate_solution(
+            sur_deps=self.sur_deps, def_deps=self.def_deps, d=self.d, h=self.h, p=pheromone,
+            max_journey_size=self.max_journey_size, alpha=self.alpha, beta=self.beta,
+            attractiveness=pheromone.attractiveness, index=self.index, candidates=self.candidates, q0=q0)
+
+    def close(self):
+        """
+        Stops any worker processes, copying the attractiveness out of shared memory before it is freed
+        """
+        if self.workers is not None:
+            self.pheromone.attractiveness = np.array(self.pheromone.attractiveness)
+            self.workers.close()
+            self.workers = None
+
+    def __enter__(self) -> 'Colony':
+        """Use the colony as a context manager"""
+        return self
+
+    def __exit__(self, *args):
+        """Close the colony at the end of a with block"""
+        self.close()
@@ -2,8 +2,10 @@
 Creates distance and pheromone matrices for the problem
 """
 import random
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import numpy as np
 from TNRP_model.depot import Depot
+from TNRP_model.array_model import TNRPModel
 
 
 def create_dist_matrix(model: Dict[int, Depot]) -> List[List[float]]:
@@ -16,6 +18,9 @@ def create_dist_matrix(model: Dict[int, Depot]) -> List[List[float]]:
     Returns:
         List where dist_matrix[i][j] is the distance on edge i-j
     """
+    # An array-backed model already holds its distance matrix
+    if isinstance(model, TNRPModel):
+        return model.dist
 
     # Create a distance matrix with all values equalling 0 and of length and width len(model)
     dist_matrix = [[0] * len(model) for _ in range(len(model))]
@@ -82,6 +87,14 @@ def create_heur_matrix(dist_matrix: List[List[float]]) -> List[List[float]]:
     returns:
         A heuristic matrix containing inverse values to the distance matrix
     """
+    # Calculate the whole heuristic matrix at once if the distances are an array
+    if isinstance(dist_matrix, np.ndarray):
+        heur_matrix = np.zeros(dist_matrix.shape)
+        # Only divide where the distance is not 0 (the diagonal and any shared locations)
+        np.divide(1, dist_matrix, out=heur_matrix, where=dist_matrix != 0)
+        np.fill_diagonal(heur_matrix, 0)
+        return np.round(heur_matrix, 4)
+
     # Get the size of the distance matrix
     size = len(dist_matrix)
 
@@ -90,3 +103,171 @@ def create_heur_matrix(dist_matrix: List[List[float]]) -> List[List[float]]:
                     for j in range(size)] for i in range(size)]
 
     return heur_matrix
+
+
+class BipartiteIndex:
+    """
+    The rows and columns of the surplus -> deficit edges in a bipartite matrix.
+
+    Only edges from a surplus depot to a deficit depot are used by AS, so the bipartite pheromone and
+    heuristic matrices have a row for each surplus depot and a column for each deficit depot
+    """
+
+    def __init__(self, sur_names: List[int], def_names: List[int], size: int = None) -> None:
+        """
+        Create the index from the names of the surplus and deficit depots
+
+        params
+            sur_names - The surplus depot of each row
+            def_names - The deficit depot of each column
+            size - The number of depot names (default=None, one more than the largest name)
+        """
+        self.sur_names = np.asarray(sur_names, dtype=np.int64)
+        self.def_names = np.asarray(def_names, dtype=np.int64)
+        if size is None:
+            size = int(max(self.sur_names.max(initial=-1), self.def_names.max(initial=-1))) + 1
+
+        # The row and column of each depot name, which is -1 if the depot has none
+        self.rows = np.full(size, -1, dtype=np.int64)
+        self.rows[self.sur_names] = np.arange(len(self.sur_names))
+        self.cols = np.full(size, -1, dtype=np.int64)
+        self.cols[self.def_names] = np.arange(len(self.def_names))
+
+    @classmethod
+    def from_model(cls, model: Dict[int, Depot]) -> 'BipartiteIndex':
+        """
+        Creates the index of the surplus and deficit depots of a model
+
+        params
+            model - The TNRP model as a dictionary of depot name: DepotObj
+
+        returns
+            The bipartite index
+        """
+        if isinstance(model, TNRPModel):
+            return cls(sur_names=np.flatnonzero(model.s > 0), def_names=np.flatnonzero(model.s < 0),
+                       size=len(model))
+        return cls(sur_names=[dep for dep in model if model[dep].get_s() > 0],
+                   def_names=[dep for dep in model if model[dep].get_s() < 0])
+
+    def shape(self) -> Tuple[int, int]:
+        """
+        returns
+            The shape of a bipartite matrix, (number of surplus depots, number of deficit depots)
+        """
+        return len(self.sur_names), len(self.def_names)
+
+    def is_bipartite(self, matrix: List[List[float]]) -> bool:
+        """
+        Checks whether a matrix is bipartite rather than a full matrix of every depot
+
+        params
+            matrix - A bipartite or full matrix
+
+        returns
+            Boolean of whether the matrix has a row for each surplus and a column for each deficit depot
+        """
+        if len(matrix) != len(self.sur_names):
+            return False
+        return len(self.sur_names) == 0 or len(matrix[0]) == len(self.def_names)
+
+    def restrict(self, matrix: List[List[float]], dtype=np.float32) -> np.ndarray:
+        """
+        Takes the surplus -> deficit edges of a full matrix
+
+        params
+            matrix - A matrix where matrix[i][j] is the value of edge i-j
+            dtype - The float type of the bipartite matrix (default=np.float32)
+
+        returns
+            The bipartite matrix
+        """
+        return np.asarray(matrix)[np.ix_(self.sur_names, self.def_names)].astype(dtype)
+
+    def expand(self, bipartite: np.ndarray, matrix: List[List[float]]):
+        """
+        Writes a bipartite matrix into the surplus -> deficit edges of a full matrix
+
+        params
+            bipartite - The bipartite matrix
+            matrix - The full matrix, which is changed in place
+        """
+        if isinstance(matrix, np.ndarray):
+            matrix[np.ix_(self.sur_names, self.def_names)] = bipartite
+            return
+        def_names = self.def_names.tolist()
+        for row, sur_name in enumerate(self.sur_names.tolist()):
+            full_row = matrix[sur_name]
+            for def_name, value in zip(def_names, bipartite[row].tolist()):
+                full_row[def_name] = value
+
+
+def create_bipartite_pher_matrix(index: BipartiteIndex, p_min=0, p_max=1) -> np.ndarray:
+    """
+    Creates a pheromone matrix of the surplus -> deficit edges
+
+    Params:
+        index - The bipartite index of the model
+        p_min - the minimum level of pheromone created - defaults to 0
+        p_max - the maximum level of pheromone created - defaults to 1
+
+    Returns:
+        Pheromone matrix with a row for each surplus and a column for each deficit depot, in float32
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    # Generate random numbers between p_min and p_max rounded to 2dp
+    return np.round(rng.uniform(p_min, p_max, size=index.shape()), 2).astype(np.float32)
+
+
+def create_bipartite_heur_matrix(dist_matrix: List[List[float]], index: BipartiteIndex) -> np.ndarray:
+    """
+    Creates a heuristic matrix of the surplus -> deficit edges
+
+    Params:
+        dist_matrix - the full distance matrix
+        index - The bipartite index of the model
+
+    returns:
+        A heuristic matrix of inverse distances with a row for each surplus and a column for each deficit
+        depot, in float32
+    """
+    dists = np.asarray(dist_matrix)[np.ix_(index.sur_names, index.def_names)]
+    heur_matrix = np.zeros(dists.shape)
+    # Only divide where the distance is not 0 (depots at the same location)
+    np.divide(1, dists, out=heur_matrix, where=dists != 0)
+    return np.round(heur_matrix, 4).astype(np.float32)
+
+
+def create_candidate_lists(dist_matrix: List[List[float]], index: BipartiteIndex, k: int,
+                           block_size=1024) -> np.ndarray:
+    """
+    Creates the candidate list of each surplus depot, its k nearest deficit depots
+
+    Params:
+        dist_matrix - the full distance matrix
+        index - The bipartite index of the model
+        k - The number of deficit depots in each candidate list
+        block_size - The number of surplus depots whose distances are sorted at once (default=1024)
+
+    returns:
+        (n x k) array of the deficit depots nearest each surplus depot, nearest first.
+        The rows of depots that aren't surplus depots are -1
+    """
+    k = min(k, len(index.def_names))
+    candidates = np.full((len(index.rows), k), -1, dtype=np.int64)
+    if k == 0:
+        return candidates
+
+    dist_matrix = np.asarray(dist_matrix)
+    for start in range(0, len(index.sur_names), block_size):
+        sur_names = index.sur_names[start:start + block_size]
+        dists = dist_matrix[np.ix_(sur_names, index.def_names)]
+
+        # Find the k nearest deficit depots of each surplus depot, then sort them by distance
+        nearest = np.argpartition(dists, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(dists, nearest, axis=1), axis=1, kind='stable')
+        nearest = np.take_along_axis(nearest, order, axis=1)
+
+        candidates[sur_names] = index.def_names[nearest]
+
+    return candidates
@@ -0,0 +1,77 @@
+"""
+A Fenwick (binary indexed) tree of weights, for roulette wheel selection in O(log n) time
+"""
+import numpy as np
+
+
+class FenwickTree:
+    """
+    A Fenwick tree of non-negative weights. The weight of an item is changed and an item is
+    picked with probability proportional to its weight in O(log n) time
+    """
+
+    def __init__(self, weights: np.ndarray) -> None:
+        """
+        Create the tree from the weights of every item in O(n) time
+
+        params
+            weights - The weight of each item
+        """
+        self.weights = np.array(weights, dtype=np.float64)
+        self.size = len(self.weights)
+        self.tree: np.ndarray = None
+        self.total = 0.0
+        # The largest power of 2 no larger than the size, where a search starts
+        self.top = 1 << (self.size.bit_length() - 1) if self.size > 0 else 0
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Calculates the tree from the weights in O(n) time, removing any floating point errors
+        """
+        # tree[i] is the sum of the weights of the items (i - lowbit(i), i], using 1-based positions,
+        # which is the difference of two cumulative sums
+        cum_weights = np.zeros(self.size + 1, dtype=np.float64)
+        np.cumsum(self.weights, out=cum_weights[1:])
+        positions = np.arange(self.size + 1)
+        self.tree = cum_weights - cum_weights[positions - (positions & -positions)]
+        self.total = float(cum_weights[-1])
+
+    def set(self, idx: int, weight: float):
+        """
+        Sets the weight of an item
+
+        params
+            idx - The index of the item
+            weight - The new weight of the item
+        """
+        delta = weight - float(self.weights[idx])
+        self.weights[idx] = weight
+        self.total += delta
+        tree = self.tree
+        pos = idx + 1
+        while pos <= self.size:
+            tree[pos] += delta
+            pos += pos & -pos
+
+    def find(self, value: float) -> int:
+        """
+        Finds the first item where the sum of the weights up to and including it is more than value,
+        by descending the tree
+
+        params
+            value - A number between 0 and the total weight
+
+        returns
+            The index of the item, or the number of items if value is at least the total weight
+        """
+        tree = self.tree
+        pos = 0
+        step = self.top
+        while step > 0:
+            nxt = pos + step
+            if nxt <= self.size and tree[nxt] <= value:
+                pos = nxt
+                value -= tree[nxt]
+            step >>= 1
+        return pos
@@ -0,0 +1,51 @@
+"""
+Polishes the paths of ants with a descent over the deficit-swap neighbourhood of SA
+"""
+from typing import Dict, List, Tuple
+import numpy as np
+from TNRP_model.depot import Depot
+from searches.sa.edge_solution import EdgeSolution
+from searches.solution import Solution
+
+
+def descent(solution: Solution, model: Dict[int, Depot], max_journey_size: int, steps: int,
+            candidates: np.ndarray = None) -> Tuple[Solution, float, List[float]]:
+    """
+    Improves a solution by swapping the deficit depots of two journeys, keeping only the swaps that reduce
+    its fitness. The change in fitness of each swap is calculated from the few edges it changes, and a
+    rejected swap is undone in place
+
+    params
+        solution - The solution to improve, which is not changed
+        model - The model the solution is for
+        max_journey_size - The maximum size of a journey
+        steps - The number of swaps tried
+        candidates - Lists of the deficit depots each surplus depot may move to. If given, swaps that only
+                     create journeys to candidates are preferred (default=None, any swap)
+
+    returns
+        Tuple of the improved, compressed solution, its fitness, and the fitness of the current solution after
+        each swap tried, as each swap is a fitness evaluation as in SA
+    """
+    edge_solution = EdgeSolution(solution=solution, model=model, max_journey_size=max_journey_size)
+
+    # A swap needs two journeys with different surplus and deficit depots
+    froms = {edge[0] for edge in edge_solution.flows}
+    tos = {edge[1] for edge in edge_solution.flows}
+    if len(froms) < 2 or len(tos) < 2:
+        return edge_solution.to_solution(), edge_solution.energy, []
+
+    energies = []
+    for _ in range(steps):
+        slot_1, slot_2 = edge_solution.pick_swap(candidates=candidates)
+        # Keep the swap if it is an improvement, allowing for floating point errors in the change
+        if edge_solution.apply_swap(slot_1=slot_1, slot_2=slot_2) < -1e-9:
+            # Every kept swap is the best solution so far, which keeps the log of moves short
+            edge_solution.commit()
+            edge_solution.mark_best()
+        else:
+            edge_solution.undo()
+        energies.append(edge_solution.energy)
+
+    # Recalculate the fitness of the final solution to remove any floating point drift
+    return edge_solution.to_solution(), edge_solution.full_energy(), energies
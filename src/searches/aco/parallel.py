@@ -0,0 +1,160 @@
+"""
+Constructs the ants of an AS population in worker processes that share the attractiveness matrix
+"""
+import random
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+import numpy as np
+from TNRP_model.depot import Depot
+from searches.aco.create_matrices import BipartiteIndex
+from searches.aco.path_generation import generate_colony, generate_solution
+from searches.solution import Solution
+from searches.utils import pack_solutions
+
+# The state of a worker process, set once when the worker starts
+_worker = {}
+
+
+def init_worker(shm_name: str, shape: Tuple[int, int], sur_names: np.ndarray, sur_s: np.ndarray,
+                def_names: np.ndarray, def_s: np.ndarray, max_journey_size: int, candidates: np.ndarray,
+                batch_min: int):
+    """
+    Attaches a worker process to the shared attractiveness matrix and creates its depots
+
+    params
+        shm_name - The name of the shared memory holding the attractiveness matrix
+        shape - The shape of the bipartite attractiveness matrix
+        sur_names - The surplus depot of each row
+        sur_s - The supply of each surplus depot
+        def_names - The deficit depot of each column
+        def_s - The supply of each deficit depot
+        max_journey_size - Maximum journey size
+        candidates - Lists of the deficit depots each surplus depot may move to, or None
+        batch_min - The number of ants from which a worker constructs its ants in lock-step
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker['shm'] = shm
+    _worker['attractiveness'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _worker['index'] = BipartiteIndex(sur_names=sur_names, def_names=def_names)
+    # Depots only holding the supply values, as the matrices hold the distances
+    _worker['sur_deps'] = {name: Depot(name=name, s=s, x=0, y=0)
+                           for name, s in zip(sur_names.tolist(), sur_s.tolist())}
+    _worker['def_deps'] = {name: Depot(name=name, s=s, x=0, y=0)
+                           for name, s in zip(def_names.tolist(), def_s.tolist())}
+    _worker['max_journey_size'] = max_journey_size
+    _worker['candidates'] = candidates
+    _worker['batch_min'] = batch_min
+
+
+def construct_ants(task: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Constructs ants in a worker process, reading the shared attractiveness matrix
+
+    params
+        task - Tuple of the number of ants and the seed of the worker's random numbers
+
+    returns
+        Tuple of the from depots, to depots and quantities of every journey of every ant, and the offsets
+        where each ant's path starts in them
+    """
+    num_ants, seed = task
+    random.seed(seed)
+
+    if num_ants >= _worker['batch_min']:
+        paths = generate_colony(sur_deps=_worker['sur_deps'], def_deps=_worker['def_deps'], m=num_ants,
+                                attractiveness=_worker['attractiveness'],
+                                max_journey_size=_worker['max_journey_size'], index=_worker['index'],
+                                candidates=_worker['candidates'])
+    else:
+        paths = [generate_solution(sur_deps=_worker['sur_deps'], def_deps=_worker['def_deps'], d=None, h=None,
+                                   p=None, max_journey_size=_worker['max_journey_size'],
+                                   attractiveness=_worker['attractiveness'], index=_worker['index'],
+                                   candidates=_worker['candidates'])
+                 for _ in range(num_ants)]
+
+    froms, tos, offsets = pack_solutions(solutions=paths)
+    s = np.concatenate([path.s for path in paths]) if len(paths) > 0 else np.empty(0, dtype=np.int32)
+    return froms, tos, s, offsets
+
+
+class ParallelColony:
+    """
+    A pool of worker processes that construct the ants of each population.
+
+    The attractiveness matrix is held in shared memory, which the workers only read and the main process
+    updates between populations. Each worker's random numbers are seeded from the random module for
+    every population, so a run is reproducible with random.seed whatever the order the workers finish in
+    """
+
+    def __init__(self, sur_deps: Dict[int, Depot], def_deps: Dict[int, Depot], attractiveness: np.ndarray,
+                 index: BipartiteIndex, max_journey_size: int, workers: int, candidates: np.ndarray = None,
+                 batch_min=8) -> None:
+        """
+        Create the shared attractiveness matrix and start the workers
+
+        params
+            sur_deps - The surplus depots in the model
+            def_deps - The deficit depots in the model
+            attractiveness - The bipartite attractiveness matrix, which is copied into shared memory
+            index - The rows and columns of the depots in the bipartite matrices
+            max_journey_size - Maximum journey size
+            workers - The number of worker processes
+            candidates - Lists of the deficit depots each surplus depot may move to (default=None)
+            batch_min - The number of ants from which a worker constructs its ants in lock-step (default=8)
+        """
+        self.workers = workers
+
+        # Copy the attractiveness matrix into shared memory
+        self.shm = shared_memory.SharedMemory(create=True, size=max(attractiveness.nbytes, 1))
+        self.attractiveness = np.ndarray(attractiveness.shape, dtype=np.float64, buffer=self.shm.buf)
+        self.attractiveness[:] = attractiveness
+
+        # The workers use the rows and columns of the index and the supply of each depot
+        sur_names = index.sur_names
+        def_names = index.def_names
+        sur_s = np.array([sur_deps[name].get_s() for name in sur_names.tolist()], dtype=np.int64)
+        def_s = np.array([def_deps[name].get_s() for name in def_names.tolist()], dtype=np.int64)
+
+        self.pool = multiprocessing.Pool(
+            processes=workers, initializer=init_worker,
+            initargs=(self.shm.name, attractiveness.shape, sur_names, sur_s, def_names, def_s,
+                      max_journey_size, candidates, batch_min))
+
+    def generate(self, m: int) -> List[Solution]:
+        """
+        Constructs m ants, splitting them between the workers
+
+        params
+            m - The number of ants
+
+        returns
+            The path of each ant as a Solution
+        """
+        # Split the ants as evenly as possible, with a seed for each worker
+        sizes = [m // self.workers + (1 if worker < m % self.workers else 0) for worker in range(self.workers)]
+        tasks = [(size, random.getrandbits(64)) for size in sizes if size > 0]
+
+        paths = []
+        for froms, tos, s, offsets in self.pool.map(construct_ants, tasks):
+            for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+                paths.append(Solution.from_arrays(froms=froms[start:end], tos=tos[start:end], s=s[start:end]))
+        return paths
+
+    def close(self):
+        """
+        Stops the workers and frees the shared memory
+        """
+        self.pool.close()
+        self.pool.join()
+        self.attractiveness = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> 'ParallelColony':
+        """Use the colony as a context manager"""
+        return self
+
+    def __exit__(self, *args):
+        """Close the colony at the end of a with block"""
+        self.close()
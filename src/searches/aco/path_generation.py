@@ -2,9 +2,13 @@
 Generates a path for an ant
 """
 import random
-import copy
 from typing import List, Dict, Tuple
+import numpy as np
 from TNRP_model.depot import Depot
+from searches.aco.create_matrices import BipartiteIndex
+from searches.aco.fenwick import FenwickTree
+from searches.solution import Solution
+from searches.utils import perform_move
 
 
 def perform_journey(sur_dep: Depot, def_dep: Depot, max_journey_size: int) -> Tuple[Dict[str, int], List[int]]:
@@ -19,30 +23,77 @@ def perform_journey(sur_dep: Depot, def_dep: Depot, max_journey_size: int) -> Tu
     returns
         Tuple of journey as {from, to, s} and List of depots that have reach equilibrium as a result
     """
-    # Calculate the movement size as the minimum quantity to resolve a journey or breach maximum journey size
-    move_size = min(sur_dep.get_s(), abs(def_dep.get_s()), max_journey_size)
-
     # Perform the movement
-    Depot.move_s(start=sur_dep, end=def_dep, s=move_size)
+    move_size, equilibrium_deps = perform_move(
+        sur_dep=sur_dep, def_dep=def_dep, max_journey_size=max_journey_size)
 
     # Put the journey in a dictionary
     journey = {'from': sur_dep.get_name(), 'to': def_dep.get_name(),
                's': move_size}
 
-    # Check if any of the depots have reach equilibrium
-    equilibrium_deps = []
-    if sur_dep.get_s() == 0:
-        equilibrium_deps.append(sur_dep.get_name())
+    return journey, equilibrium_deps
 
-    if def_dep.get_s() == 0:
-        equilibrium_deps.append(def_dep.get_name())
 
-    return journey, equilibrium_deps
+def attractiveness_matrix(p: List[List[float]], h: List[List[float]], alpha=1, beta=2) -> np.ndarray:
+    """
+    Calculates the attractiveness pher^alpha * heur^beta of every edge
 
+    params
+        p - pheromone matrix
+        h - heuristic matrix
+        alpha - The exponent used to scale the pheromone matrix (default=1)
+        beta - The exponent used to scale the heuristic matrix (default=2)
 
-def generate_path(sur_deps: Dict[int, Depot], def_deps: Dict[int, Depot],
-                  d: List[List[float]], h: List[List[float]], p: List[List[float]], max_journey_size: int,
-                  alpha=1, beta=2) -> List[Dict[str, int]]:
+    returns
+        The attractiveness matrix as a NumPy array in float64, as the exponents may be out of the range of float32
+    """
+    return np.power(np.asarray(p, dtype=np.float64), alpha) * np.power(np.asarray(h, dtype=np.float64), beta)
+
+
+def pick_from_tree(tree: FenwickTree, open_cols: np.ndarray, max_stale=4) -> int:
+    """
+    Picks an unresolved deficit depot with probability proportional to its weight in a Fenwick tree.
+    Resolved deficit depots are only zeroed in the tree when they are picked, so they are picked again.
+    If more than max_stale resolved deficit depots are picked, every resolved deficit depot is zeroed at once
+    and the tree is rebuilt
+
+    params
+        tree - The Fenwick tree of the weight of each deficit depot's column
+        open_cols - Mask of the columns of the unresolved deficit depots
+        max_stale - The number of resolved deficit depots picked before the tree is rebuilt (default=4)
+
+    returns
+        The column of the picked deficit depot, or None if no unresolved deficit depot has any weight
+    """
+    stale = 0
+    while True:
+        total = tree.total
+        if total <= 0:
+            return None
+        col = tree.find(value=random.random() * total)
+
+        # Accept an unresolved deficit depot with weight
+        if col < tree.size and tree.weights[col] > 0:
+            if open_cols[col]:
+                return col
+            stale += 1
+            if stale > max_stale:
+                # Many deficit depots in the tree are resolved, so zero them all in one rebuild
+                tree.weights *= open_cols
+                tree.rebuild()
+                stale = 0
+            else:
+                # Zero the weight of a resolved deficit depot and pick again
+                tree.set(idx=col, weight=0)
+        else:
+            # Floating point errors in the sums picked an item without weight, so rebuild the tree exactly
+            tree.rebuild()
+
+
+def generate_solution(sur_deps: Dict[int, Depot], def_deps: Dict[int, Depot],
+                      d: List[List[float]], h: List[List[float]], p: List[List[float]], max_journey_size: int,
+                      alpha=1, beta=2, candidates: np.ndarray = None, attractiveness: np.ndarray = None,
+                      tree_journeys=2, index: BipartiteIndex = None, q0=0) -> Solution:
     """
     Generates a path from surplus to deficit depots using distance and pheromone matrices
 
@@ -50,100 +101,326 @@ def generate_path(sur_deps: Dict[int, Depot], def_deps: Dict[int, Depot],
         sur_deps - The surplus depots in the model
         def_deps - The deficit depots in the model
         d - distance matrix
-        h - heuristic matrix
-        p - pheromone matrix
+        h - heuristic matrix, either full or bipartite
+        p - pheromone matrix, either full or bipartite
         max_journey_size - Maximum journey size
         alpha - The exponent used to scale the pheromone matrix (default=1)
         beta - The exponent used to scale the heuristic matrix (default=2)
+        candidates - Lists of the deficit depots each surplus depot may move to, such as the
+                     neighbours of a sparse TNRPModel. Every deficit depot is considered once all of a
+                     surplus depot's candidates are resolved (default=None, every deficit depot)
+        attractiveness - The attractiveness matrix of p and h, so a colony only calculates it once
+                         (default=None, calculated from p and h)
+        tree_journeys - A surplus depot with more than this many journeys of max_journey_size left picks
+                        its deficit depots from a Fenwick tree, in O(log n) time after the tree is built.
+                        Other surplus depots pick from a cumulative sum of their row. Building a tree costs
+                        about two cumulative sums, so it pays off from the third pick (default=2)
+        index - The rows and columns of the depots in bipartite matrices (default=None, created
+                from sur_deps and def_deps)
+        q0 - The probability of moving to the most attractive deficit depot instead of picking one
+             with the roulette wheel, as in ACS (default=0, always use the roulette wheel)
 
     returns 
-        Path as list of journeys as dictionaries {from, to, s}
+        The path as a Solution
     """
-    # Make copies of the surplus and deficit depots so the rest of the algorithm isn't affected
-    sur_deps = copy.deepcopy(sur_deps)
-    def_deps = copy.deepcopy(def_deps)
+    if index is None:
+        index = BipartiteIndex(sur_names=list(sur_deps.keys()), def_names=list(def_deps.keys()))
+
+    # Take the surplus -> deficit edges of full matrices
+    if attractiveness is None:
+        if not index.is_bipartite(matrix=p):
+            p = index.restrict(matrix=p)
+            h = index.restrict(matrix=h)
+        attractiveness = attractiveness_matrix(p=p, h=h, alpha=alpha, beta=beta)
+    elif not index.is_bipartite(matrix=attractiveness):
+        attractiveness = index.restrict(matrix=attractiveness, dtype=np.float64)
+
+    # Perform the journeys on the supply of each row and column so the rest of the algorithm isn't affected
+    sur_names = index.sur_names.tolist()
+    def_names = index.def_names.tolist()
+    sur_s = [0] * len(sur_names)
+    def_s = [0] * len(def_names)
+    for dep in sur_deps:
+        sur_s[index.rows[dep]] = sur_deps[dep].get_s()
+    for dep in def_deps:
+        def_s[index.cols[dep]] = def_deps[dep].get_s()
+
+    # The rows of the unresolved surplus depots, and a mask of the columns of the unresolved deficit depots
+    open_rows = index.rows[list(sur_deps.keys())].tolist()
+    open_cols = np.zeros(len(def_names), dtype=bool)
+    open_cols[index.cols[list(def_deps.keys())]] = True
+
+    # The columns of the candidates of each row, as lists as they are short
+    if candidates is not None:
+        candidates = candidates[index.sur_names]
+        candidates = np.where(candidates >= 0, index.cols[candidates], -1)
+        candidates = [row_cols[row_cols >= 0].tolist() for row_cols in candidates]
+        is_open = open_cols.tolist()
+
+    # The Fenwick tree of the attractiveness of each column from each row picked so far
+    trees: Dict[int, FenwickTree] = {}
 
     # Store the path
-    path = []
+    path = Solution()
 
     # Continue until all depots are in equilibrium
-    while len(sur_deps) != 0:
+    while len(open_rows) != 0:
         # Pick the current depot as a random surplus depot
-        current_dep = random.choice(list(sur_deps.keys()))
-
-        # Store the transition probabilities, and total probabilities
-        probs = []
-        total_prob = 0
-        # Store the corresponding depot to each of the probabilities
-        deps = []
-
-        # For each of the neighbours to the surplus depot
-        for i in range(len(d[current_dep])):
-            # Check neighbour is a deficit depot that still to be resolved
-            if i in def_deps:
-                # Calculate pher^alpha * heur^beta
-                pher = p[current_dep][i]
-                heur = h[current_dep][i]
-                n = pher**alpha * heur**beta
-                # Add n to the transition probabilities
-                probs.append(n)
-
-                # Keen track of the total probabilities
-                total_prob += n
-
-                # Store the corresponding depot to the probability
-                deps.append(i)
+        open_idx = random.randrange(len(open_rows))
+        row = open_rows[open_idx]
+        col = None
+
+        # Restrict the neighbours to the surplus depot's unresolved candidates if there are any
+        cols = None
+        if candidates is not None:
+            cols = [candidate for candidate in candidates[row] if is_open[candidate]]
+
+        # With probability q0 move to the most attractive deficit depot, without a roulette wheel
+        exploit = q0 > 0 and random.random() < q0
+
+        if cols:
+            # Pick a candidate with probability proportional to its attractiveness
+            weights = attractiveness[row, cols].tolist()
+            if exploit:
+                if max(weights) > 0:
+                    col = cols[weights.index(max(weights))]
+            elif sum(weights) > 0:
+                col = random.choices(cols, weights=weights)[0]
+        elif exploit:
+            # The most attractive unresolved deficit depot
+            weights = attractiveness[row] * open_cols
+            col = int(np.argmax(weights))
+            if weights[col] <= 0:
+                col = None
+        else:
+            tree = trees.get(row)
+            if tree is None and sur_s[row] > tree_journeys * max_journey_size:
+                # Create a tree for a surplus depot the first time it is picked with many journeys left
+                tree = FenwickTree(weights=attractiveness[row] * open_cols)
+                trees[row] = tree
+
+            if tree is not None:
+                col = pick_from_tree(tree=tree, open_cols=open_cols)
+            else:
+                # The attractiveness of each unresolved deficit depot, which is 0 for every other depot
+                weights = attractiveness[row] * open_cols
+                cum_weights = np.cumsum(weights)
+                total = cum_weights[-1]
+                if total > 0:
+                    # Find the first depot whose cumulative weight is higher than a random number up to the total
+                    col = int(np.searchsorted(cum_weights, random.random() * total, side='right'))
+                    # Floating point rounding may give the total, so choose the last depot with any weight
+                    if col == len(weights):
+                        col = int(np.flatnonzero(weights)[-1])
 
         # If there are no choices with any pheromone (due to over-evaporation) choose a random deficit depot next
-        if total_prob == 0:
-            # Pick a random deficit depot
-            rand_def_dep = random.choice(list(def_deps.keys()))
-            # Perform a journey to the random deficit depot
-            journey, resolved_deps = perform_journey(
-                sur_dep=sur_deps[current_dep], def_dep=def_deps[rand_def_dep], max_journey_size=max_journey_size)
-            # Remove any resolved depots from their associated dictionaries
-            for r_dep in resolved_deps:
-                if r_dep in sur_deps:
-                    del sur_deps[r_dep]
-                else:
-                    del def_deps[r_dep]
-
-            # Add the journey to the path
-            path.append(journey)
-
-        else:  # If there was pheromone present
-            # Calculate the cumulative probabilities
-            cum_probs = []
-            for prob in probs:
-                # Check if probability is the first
-                if len(cum_probs) > 0:  # If it is not then
-                    # Add the probabilities to a cumulative probabilities list
-                    cum_probs.append((prob / total_prob)+cum_probs[-1])
-                else:  # If it is
-                    # Add the probability / the total probability
-                    cum_probs.append(prob / total_prob)
-
-            # Use final value in cumulative probabilities as max to allow for floating point errors
-            # Select a random number between 0 and 1
-            rand_choice = random.uniform(0, cum_probs[-1])
-            # Loop through probabilities until find one that is higher than the random probability
-            for i in range(len(cum_probs)):
-                if cum_probs[i] > rand_choice:
-                    # If depot is selected perform journey from the surplus depot to it
-                    journey, resolved_deps = perform_journey(
-                        sur_dep=sur_deps[current_dep], def_dep=def_deps[deps[i]],
-                        max_journey_size=max_journey_size)
-                    # Remove the resolved depots from their associated dictionaries
-                    for r_dep in resolved_deps:
-                        if r_dep in sur_deps:
-                            del sur_deps[r_dep]
-                        else:
-                            del def_deps[r_dep]
-
-                    # Add the journey to the path
-                    path.append(journey)
-
-                    # Break to avoid unnecessary computation
-                    break
+        if col is None:
+            col = random.choice(np.flatnonzero(open_cols).tolist())
+
+        # Perform the journey of maximum quantity from the surplus depot to the chosen deficit depot
+        move_size = min(sur_s[row], -def_s[col], max_journey_size)
+        sur_s[row] -= move_size
+        def_s[col] += move_size
+        path.append(sur_names[row], def_names[col], move_size)
+
+        # Remove any resolved depots
+        if sur_s[row] == 0:
+            open_rows[open_idx] = open_rows[-1]
+            open_rows.pop()
+        if def_s[col] == 0:
+            open_cols[col] = False
+            if candidates is not None:
+                is_open[col] = False
+            # Zero the deficit depot's weight in the current tree. Other trees zero it when they next pick it
+            if row in trees:
+                trees[row].set(idx=col, weight=0)
 
     return path
+
+
+def roulette(weights: np.ndarray, rng: np.random.Generator, block_size=32) -> np.ndarray:
+    """
+    Picks an item from each row of weights with probability proportional to its weight.
+    The items are split into blocks, so a block is picked from the sums of the blocks and then an item
+    from the cumulative sum of that block, rather than taking the cumulative sum of every item
+
+    params
+        weights - (rows x items) array of non-negative weights
+        rng - The random number generator used
+        block_size - The number of items in each block (default=32)
+
+    returns
+        The item picked from each row, which is -1 for a row without any weight
+    """
+    num_rows, num_items = weights.shape
+    num_blocks = -(-num_items // block_size)
+    blocks = weights
+    if num_blocks * block_size != num_items:
+        blocks = np.zeros((num_rows, num_blocks * block_size))
+        blocks[:, :num_items] = weights
+    blocks = blocks.reshape(num_rows, num_blocks, block_size)
+    row_idxs = np.arange(num_rows)
+
+    # Find the first block whose cumulative weight is higher than a random number up to the total
+    block_sums = blocks.sum(axis=2)
+    cum_blocks = np.cumsum(block_sums, axis=1)
+    totals = cum_blocks[:, -1]
+    rand = rng.random(num_rows) * totals
+    picked_blocks = np.minimum((cum_blocks <= rand[:, None]).sum(axis=1), num_blocks - 1)
+
+    # Find the first item in the block whose cumulative weight is higher than the rest of the random number
+    rand -= cum_blocks[row_idxs, picked_blocks] - block_sums[row_idxs, picked_blocks]
+    cum_items = np.cumsum(blocks[row_idxs, picked_blocks], axis=1)
+    picked_items = np.minimum((cum_items <= rand[:, None]).sum(axis=1), block_size - 1)
+    choices = picked_blocks * block_size + picked_items
+
+    # Floating point rounding may pick an item without weight, so choose the last item with any weight
+    bad = np.flatnonzero(blocks.reshape(num_rows, -1)[row_idxs, choices] <= 0)
+    if len(bad) > 0:
+        choices[bad] = num_items - 1 - np.argmax(weights[bad, ::-1] > 0, axis=1)
+
+    choices[totals <= 0] = -1
+    return choices
+
+
+def generate_colony(sur_deps: Dict[int, Depot], def_deps: Dict[int, Depot], m: int, attractiveness: np.ndarray,
+                    max_journey_size: int, index: BipartiteIndex = None,
+                    candidates: np.ndarray = None) -> List[Solution]:
+    """
+    Generates the paths of m ants at once. The ants are advanced in lock-step, each performing one journey
+    per step, with the supply of every ant held in (m x depots) arrays so that every ant picks its next
+    surplus and deficit depot at once
+
+    params:
+        sur_deps - The surplus depots in the model
+        def_deps - The deficit depots in the model
+        m - The number of ants
+        attractiveness - The attractiveness matrix, either full or bipartite
+        max_journey_size - Maximum journey size
+        index - The rows and columns of the depots in bipartite matrices (default=None, created
+                from sur_deps and def_deps)
+        candidates - Lists of the deficit depots each surplus depot may move to. Every deficit depot is
+                     considered once all of a surplus depot's candidates are resolved (default=None)
+
+    returns
+        The path of each ant as a Solution
+    """
+    if index is None:
+        index = BipartiteIndex(sur_names=list(sur_deps.keys()), def_names=list(def_deps.keys()))
+    if not index.is_bipartite(matrix=attractiveness):
+        attractiveness = index.restrict(matrix=attractiveness, dtype=np.float64)
+    rng = np.random.default_rng(random.getrandbits(64))
+
+    # The supply of each row and column for every ant. The columns are padded to a multiple of the
+    # roulette block size with depots that are never in deficit
+    block_size = 32
+    num_cols = -(-len(index.def_names) // block_size) * block_size
+    sur_s = np.zeros(len(index.sur_names), dtype=np.int64)
+    sur_s[index.rows[list(sur_deps.keys())]] = [dep.get_s() for dep in sur_deps.values()]
+    def_s = np.zeros(num_cols, dtype=np.int64)
+    def_s[index.cols[list(def_deps.keys())]] = [dep.get_s() for dep in def_deps.values()]
+    padded = np.zeros((len(index.sur_names), num_cols))
+    padded[:, :len(index.def_names)] = attractiveness
+    attractiveness = padded
+
+    # The unresolved rows of each ant, of which the first open_surs are unresolved
+    open_rows = np.tile(np.flatnonzero(sur_s > 0), (m, 1))
+    open_surs = np.full(m, open_rows.shape[1], dtype=np.int64)
+    sur_s = np.tile(sur_s, (m, 1))
+    def_s = np.tile(def_s, (m, 1))
+
+    # The columns of the candidates of each row, which are -1 for padding
+    if candidates is not None:
+        candidates = candidates[index.sur_names]
+        candidates = np.where(candidates >= 0, index.cols[candidates], -1)
+
+    # The journeys performed by each ant at each step
+    step_ants, step_rows, step_cols, step_moves = [], [], [], []
+
+    # The ants with unresolved surplus depots
+    active = np.flatnonzero(open_surs > 0)
+
+    while len(active) != 0:
+        # Pick a random unresolved surplus depot for each ant
+        open_idxs = (rng.random(len(active)) * open_surs[active]).astype(np.int64)
+        rows = open_rows[active, open_idxs]
+        open_cols = def_s[active] < 0
+        cols = np.full(len(active), -1, dtype=np.int64)
+
+        # Pick from the unresolved candidates of the ants that have any
+        use_full = np.ones(len(active), dtype=bool)
+        if candidates is not None:
+            ant_candidates = candidates[rows]
+            valid = (ant_candidates >= 0) & \
+                np.take_along_axis(open_cols, np.maximum(ant_candidates, 0), axis=1)
+            use_full = ~valid.any(axis=1)
+            has_candidates = np.flatnonzero(~use_full)
+            if len(has_candidates) > 0:
+                choices = roulette(weights=np.take_along_axis(attractiveness[rows[has_candidates]],
+                                                              np.maximum(ant_candidates[has_candidates], 0),
+                                                              axis=1) * valid[has_candidates], rng=rng)
+                picked = choices >= 0
+                cols[has_candidates[picked]] = ant_candidates[has_candidates[picked], choices[picked]]
+
+        # Pick from every unresolved deficit depot for the other ants
+        full = np.flatnonzero(use_full)
+        if len(full) > 0:
+            cols[full] = roulette(weights=attractiveness[rows[full]] * open_cols[full], rng=rng,
+                                  block_size=block_size)
+
+        # If there are no choices with any pheromone (due to over-evaporation) choose a random deficit depot next
+        no_choice = np.flatnonzero(cols < 0)
+        if len(no_choice) > 0:
+            cols[no_choice] = np.argmax(np.where(open_cols[no_choice],
+                                                 rng.random((len(no_choice), num_cols)), -1), axis=1)
+
+        # Perform the journey of maximum quantity from each surplus depot to its chosen deficit depot
+        moves = np.minimum(np.minimum(sur_s[active, rows], -def_s[active, cols]), max_journey_size)
+        sur_s[active, rows] -= moves
+        def_s[active, cols] += moves
+        step_ants.append(active)
+        step_rows.append(rows)
+        step_cols.append(cols)
+        step_moves.append(moves)
+
+        # Remove resolved surplus depots by moving each ant's last unresolved row into their place
+        resolved = np.flatnonzero(sur_s[active, rows] == 0)
+        resolved_ants = active[resolved]
+        open_surs[resolved_ants] -= 1
+        open_rows[resolved_ants, open_idxs[resolved]] = open_rows[resolved_ants, open_surs[resolved_ants]]
+
+        # Remove the ants that have resolved every surplus depot
+        active = active[open_surs[active] > 0]
+
+    if len(step_ants) == 0:
+        return [Solution() for _ in range(m)]
+
+    # Split the journeys into the path of each ant, in the order they were performed
+    ants = np.concatenate(step_ants)
+    order = np.argsort(ants, kind='stable')
+    froms = index.sur_names[np.concatenate(step_rows)[order]]
+    tos = index.def_names[np.concatenate(step_cols)[order]]
+    moves = np.concatenate(step_moves)[order]
+    ends = np.cumsum(np.bincount(ants, minlength=m))
+    starts = ends - np.bincount(ants, minlength=m)
+
+    return [Solution.from_arrays(froms=froms[start:end], tos=tos[start:end], s=moves[start:end])
+            for start, end in zip(starts.tolist(), ends.tolist())]
+
+
+def generate_path(sur_deps: Dict[int, Depot], def_deps: Dict[int, Depot],
+                  d: List[List[float]], h: List[List[float]], p: List[List[float]], max_journey_size: int,
+                  alpha=1, beta=2, candidates: np.ndarray = None,
+                  attractiveness: np.ndarray = None, tree_journeys=2,
+                  index: BipartiteIndex = None) -> List[Dict[str, int]]:
+    """
+    Generates a path from surplus to deficit depots using distance and pheromone matrices.
+    See generate_solution for the parameters
+
+    returns
+        Path as list of journeys as dictionaries {from, to, s}
+    """
+    return generate_solution(sur_deps=sur_deps, def_deps=def_deps, d=d, h=h, p=p,
+                             max_journey_size=max_journey_size, alpha=alpha, beta=beta,
+                             candidates=candidates, attractiveness=attractiveness,
+                             tree_journeys=tree_journeys, index=index).to_dicts()
@@ -2,6 +2,203 @@
 Methods for the updating of a pheromone
 """
 from typing import List, Dict
+import numpy as np
+from searches.aco.create_matrices import BipartiteIndex
+from searches.aco.path_generation import attractiveness_matrix
+from searches.solution import Solution, as_solution
+from searches.utils import pack_solutions
+
+
+class PheromoneMatrix:
+    """
+    A pheromone matrix stored as a NumPy array of values multiplied by a global scale.
+
+    Evaporating every edge only multiplies the scale, so it takes O(1) time, and pheromone is
+    deposited by dividing by the scale. The values are multiplied into the scale once it is small
+    enough that they could overflow. If a heuristic matrix is given, the attractiveness
+    pher^alpha * heur^beta of every edge (without the scale, which every edge shares) is updated
+    with each deposit, so a colony doesn't recalculate it
+    """
+
+    def __init__(self, p: List[List[float]], h: List[List[float]] = None, alpha=1, beta=2,
+                 min_scale: float = None, index: BipartiteIndex = None) -> None:
+        """
+        Create the pheromone matrix
+
+        params
+            p - The initial pheromone matrix. A float32 array is kept in float32
+            h - The heuristic matrix (default=None, the attractiveness is not kept)
+            alpha - The exponent used to scale the pheromone matrix (default=1)
+            beta - The exponent used to scale the heuristic matrix (default=2)
+            min_scale - The scale below which the values are renormalised
+                        (default=None, 1e-10 for float32 values and 1e-30 otherwise)
+            index - The rows and columns of the depots if the matrices are bipartite (default=None, full matrices)
+        """
+        dtype = np.float32 if isinstance(p, np.ndarray) and p.dtype == np.float32 else np.float64
+        self.values = np.array(p, dtype=dtype)
+        self.scale = 1.0
+        if min_scale is None:
+            min_scale = 1e-10 if dtype == np.float32 else 1e-30
+        self.min_scale = min_scale
+        self.alpha = alpha
+        self.beta = beta
+        self.index = index
+
+        # The heuristic matrix and the attractiveness of the values, which is kept in float64
+        self.heur = None
+        self.attractiveness: np.ndarray = None
+        if h is not None:
+            self.heur = np.asarray(h)
+            self.attractiveness = attractiveness_matrix(p=self.values, h=h, alpha=alpha, beta=beta)
+
+    def evaporate(self, e: float):
+        """
+        Evaporates every edge by e% in O(1) time
+
+        params
+            e - evaporation rate
+        """
+        self.scale *= 1-e
+        if self.scale < self.min_scale:
+            self.renormalise()
+
+    def renormalise(self):
+        """
+        Multiplies the scale into the values and resets it to 1
+        """
+        self.values *= self.scale
+        if self.attractiveness is not None:
+            self.attractiveness *= self.scale**self.alpha
+        self.scale = 1.0
+
+    def deposit(self, froms: np.ndarray, tos: np.ndarray, amounts: np.ndarray):
+        """
+        Adds pheromone to edges, in time proportional to the number of edges
+
+        params
+            froms - The depot each edge is from
+            tos - The depot each edge is to
+            amounts - The pheromone added to each edge, which may be repeated
+        """
+        # Find the rows and columns of the depots in bipartite matrices
+        if self.index is not None:
+            froms = self.index.rows[froms]
+            tos = self.index.cols[tos]
+
+        amounts = np.asarray(amounts, dtype=np.float64) / self.scale
+        np.add.at(self.values, (froms, tos), amounts.astype(self.values.dtype))
+        if self.attractiveness is not None:
+            self.attractiveness[froms, tos] = \
+                np.power(self.values[froms, tos], self.alpha, dtype=np.float64) * \
+                np.power(self.heur[froms, tos], self.beta, dtype=np.float64)
+
+    def blend(self, froms: np.ndarray, tos: np.ndarray, rate: float, target: float):
+        """
+        Moves the pheromone of edges rate of the way towards target, as in the updates of ACS.
+        An edge repeated in froms and tos is only moved once
+
+        params
+            froms - The depot each edge is from
+            tos - The depot each edge is to
+            rate - The fraction of the way the pheromone is moved
+            target - The pheromone the edges are moved towards
+        """
+        # Find the rows and columns of the depots in bipartite matrices
+        if self.index is not None:
+            froms = self.index.rows[froms]
+            tos = self.index.cols[tos]
+
+        self.values[froms, tos] = (1 - rate) * self.values[froms, tos] + rate * target / self.scale
+        if self.attractiveness is not None:
+            self.attractiveness[froms, tos] = \
+                np.power(self.values[froms, tos], self.alpha, dtype=np.float64) * \
+                np.power(self.heur[froms, tos], self.beta, dtype=np.float64)
+
+    def clamp(self, p_min: float, p_max: float):
+        """
+        Limits the pheromone of every edge to [p_min, p_max], updating the attractiveness of the changed edges
+
+        params
+            p_min - The minimum pheromone of an edge
+            p_max - The maximum pheromone of an edge
+        """
+        for bound, outside in ((p_min, self.values < p_min / self.scale),
+                               (p_max, self.values > p_max / self.scale)):
+            if not outside.any():
+                continue
+            self.values[outside] = bound / self.scale
+            if self.attractiveness is not None:
+                self.attractiveness[outside] = \
+                    np.power(self.values[outside], self.alpha, dtype=np.float64) * \
+                    np.power(self.heur[outside], self.beta, dtype=np.float64)
+
+    def reset(self, value: float):
+        """
+        Sets the pheromone of every edge to value
+
+        params
+            value - The new pheromone of every edge
+        """
+        self.values[:] = value
+        self.scale = 1.0
+        if self.attractiveness is not None:
+            self.attractiveness[:] = np.power(np.float64(value), self.alpha) * \
+                np.power(self.heur, self.beta, dtype=np.float64)
+
+    def branching_factor(self, lam=0.05) -> float:
+        """
+        The mean lambda-branching factor of the rows, the number of edges in a row whose pheromone is at least
+        lam of the way from the row's minimum to its maximum. It falls towards 1 as the pheromone converges
+
+        params
+            lam - The fraction of the way from the minimum to the maximum of a row (default=0.05)
+
+        returns
+            The mean branching factor of the rows
+        """
+        if self.values.size == 0:
+            return 0.0
+        row_min = self.values.min(axis=1, keepdims=True)
+        row_max = self.values.max(axis=1, keepdims=True)
+        threshold = row_min + lam * (row_max - row_min)
+        return float(np.count_nonzero(self.values >= threshold) / len(self.values))
+
+    def to_array(self) -> np.ndarray:
+        """
+        returns
+            The pheromone of every edge as a NumPy array
+        """
+        return self.values * self.scale
+
+    def write_back(self, p: List[List[float]]) -> np.ndarray:
+        """
+        Writes the pheromone into the full or bipartite matrix passed to an algorithm, so it is updated
+        with the final pheromone
+
+        params
+            p - The full or bipartite pheromone matrix
+
+        returns
+            The pheromone of every edge as a NumPy array
+        """
+        final_p = self.to_array()
+        if self.index is None or self.index.is_bipartite(matrix=p):
+            p[:] = final_p if isinstance(p, np.ndarray) else final_p.tolist()
+        else:
+            self.index.expand(bipartite=final_p, matrix=p)
+        return final_p
+
+    def __getitem__(self, idx):
+        """The pheromone of a row or edge"""
+        return self.values[idx] * self.scale
+
+    def __len__(self) -> int:
+        """The number of rows"""
+        return len(self.values)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Converts the pheromone matrix to an array with np.asarray"""
+        return self.to_array() if dtype is None else self.to_array().astype(dtype)
 
 
 def update_pheromone(p: List[List[float]], paths: List[List[Dict[str, int]]], fitnesses: List[int], e: float, Q: int):
@@ -9,12 +206,23 @@ def update_pheromone(p: List[List[float]], paths: List[List[Dict[str, int]]], fi
     Updates the pheromone matrix of a population of ants
 
     params
-        p - Pheromone matrix
-        paths - list of paths in the population
+        p - Pheromone matrix, or a PheromoneMatrix which is updated in time proportional to the path lengths
+        paths - list of paths in the population, as lists of {from, to, s} or Solutions
         fitnesses - list of the corresponding path fitnesses
         e - evaporation rate (% of pheromone removed with each population)
         Q - A scaling constant for pheromone
     """
+    if isinstance(p, PheromoneMatrix):
+        # Evaporate edges by e%
+        p.evaporate(e=e)
+
+        # Deposit Q / cost on every journey of every path at once
+        if len(paths) > 0:
+            froms, tos, offsets = pack_solutions(solutions=[as_solution(path=path) for path in paths])
+            amounts = np.repeat(Q / np.asarray(fitnesses, dtype=np.float64), np.diff(offsets))
+            p.deposit(froms=froms, tos=tos, amounts=amounts)
+        return
+
     # Evaporate edges by e%
     for v in range(len(p)):
         for n in range(len(p[v])):
@@ -28,7 +236,11 @@ def update_pheromone(p: List[List[float]], paths: List[List[Dict[str, int]]], fi
         # Add Q / cost to each of the edges used in the path
         to_add = Q / cost
 
-        # Add the pheromone for each journey in the
+        # Add the pheromone for each journey in the path, reading a Solution's arrays directly
+        if isinstance(path, Solution):
+            for from_dep, to_dep in zip(path.froms.tolist(), path.tos.tolist()):
+                p[from_dep][to_dep] += to_add
+            continue
         for journey in path:
             # Add to pheromone matrix for p[from][to]
             p[journey['from']][journey['to']] += to_add
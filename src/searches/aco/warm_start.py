@@ -0,0 +1,102 @@
+"""
+Saves the final pheromone of a run and loads it as a warm start for later runs on the same depot layout
+"""
+import hashlib
+import os
+from typing import Dict
+import numpy as np
+from TNRP_model.depot import Depot
+from TNRP_model.array_model import TNRPModel
+from searches.aco.create_matrices import BipartiteIndex
+
+
+def instance_key(model: Dict[int, Depot]) -> str:
+    """
+    Creates a key identifying the depot layout of a model, from the coordinates of its depots.
+    Models with the same depots in the same places have the same key whatever their supply values
+
+    params
+        model - The TNRP model as a dictionary of depot name: DepotObj
+
+    returns
+        The SHA-256 hash of the depot coordinates as a hex string
+    """
+    if isinstance(model, TNRPModel):
+        coords = np.stack([np.asarray(model.x, dtype=np.int64), np.asarray(model.y, dtype=np.int64)])
+    else:
+        names = sorted(model)
+        coords = np.array([[model[name].x for name in names], [model[name].y for name in names]],
+                          dtype=np.int64)
+    return hashlib.sha256(coords.tobytes()).hexdigest()
+
+
+def pheromone_path(directory: str, model: Dict[int, Depot]) -> str:
+    """
+    params
+        directory - The directory the pheromone matrices are saved in
+        model - The TNRP model
+
+    returns
+        The path of the file holding the pheromone of the model's depot layout
+    """
+    return os.path.join(directory, f'{instance_key(model=model)}.npz')
+
+
+def save_pheromone(directory: str, model: Dict[int, Depot], p: np.ndarray, index: BipartiteIndex):
+    """
+    Saves a bipartite pheromone matrix for the depot layout of a model, replacing any saved before
+
+    params
+        directory - The directory the pheromone matrices are saved in, which is created if needed
+        model - The TNRP model
+        p - The bipartite pheromone matrix
+        index - The rows and columns of the depots in the pheromone matrix
+    """
+    os.makedirs(directory, exist_ok=True)
+    np.savez(pheromone_path(directory=directory, model=model), p=np.asarray(p, dtype=np.float32),
+             sur_names=index.sur_names, def_names=index.def_names)
+
+
+def warm_start_pher_matrix(directory: str, model: Dict[int, Depot], p: np.ndarray, index: BipartiteIndex,
+                           weight=0.5) -> np.ndarray:
+    """
+    Blends the pheromone saved for the depot layout of a model into an initial pheromone matrix.
+
+    The supply values may have changed since the pheromone was saved, so only the edges from a depot that
+    is still in surplus to a depot still in deficit are blended. The saved pheromone is scaled to have the
+    same mean as the initial pheromone on those edges, as its size depends on the fitnesses of the old run
+
+    params
+        directory - The directory the pheromone matrices are saved in
+        model - The TNRP model
+        p - The initial bipartite pheromone matrix
+        index - The rows and columns of the depots in the pheromone matrix
+        weight - The weight of the saved pheromone, between 0 and 1 (default=0.5)
+
+    returns
+        The blended bipartite pheromone matrix, or p if no pheromone was saved for the layout
+    """
+    filepath = pheromone_path(directory=directory, model=model)
+    if not os.path.exists(filepath):
+        return p
+
+    with np.load(filepath) as saved:
+        saved_p = saved['p']
+        saved_index = BipartiteIndex(sur_names=saved['sur_names'], def_names=saved['def_names'],
+                                     size=len(model))
+
+    # Find the rows and columns of the depots that are in both matrices
+    rows = np.flatnonzero(saved_index.rows[index.sur_names] >= 0)
+    cols = np.flatnonzero(saved_index.cols[index.def_names] >= 0)
+    if len(rows) == 0 or len(cols) == 0:
+        return p
+
+    # Scale the saved pheromone to the initial pheromone, then blend them
+    blended = np.array(p, dtype=np.float32)
+    old = saved_p[np.ix_(saved_index.rows[index.sur_names[rows]], saved_index.cols[index.def_names[cols]])]
+    new = blended[np.ix_(rows, cols)]
+    old_mean = float(old.mean())
+    if old_mean > 0:
+        old = old * (float(new.mean()) / old_mean)
+    blended[np.ix_(rows, cols)] = (1 - weight) * new + weight * old
+    return blended
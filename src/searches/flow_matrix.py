@@ -0,0 +1,191 @@
+"""
+The canonical flow-matrix form of a solution
+"""
+from typing import Dict, Tuple
+import numpy as np
+from TNRP_model.depot import Depot
+from TNRP_model.array_model import TNRPModel
+from TNRP_model.supply_state import SupplyState
+from searches.solution import Solution, as_solution
+
+
+class FlowMatrix:
+    """
+    A solution stored as the total quantity (flow) moved along each surplus -> deficit edge,
+    as a sparse matrix of coordinate arrays sorted by from and then to depot, without zero flows.
+
+    Once compressed, a solution is determined by its flows: each edge is made up of
+    ceil(flow / max_journey_size) journeys, so its cost is the sum of ceil(flow / max_journey_size) * distance.
+    Two solutions with the same flows are equal and have the same hash
+    """
+
+    def __init__(self, froms: np.ndarray, tos: np.ndarray, flows: np.ndarray) -> None:
+        """
+        Create the flow matrix from coordinate arrays, which are summed over repeated edges and sorted
+
+        params
+            froms - The depot each flow is from
+            tos - The depot each flow is to
+            flows - The quantity moved along each edge
+        """
+        froms = np.asarray(froms, dtype=np.int32)
+        tos = np.asarray(tos, dtype=np.int32)
+        flows = np.asarray(flows, dtype=np.int64)
+
+        if len(froms) > 0:
+            # Sort the edges by from and then to depot
+            order = np.lexsort((tos, froms))
+            froms = froms[order]
+            tos = tos[order]
+            flows = flows[order]
+
+            # Sum the flows of repeated edges
+            new_edge = np.ones(len(froms), dtype=bool)
+            new_edge[1:] = (froms[1:] != froms[:-1]) | (tos[1:] != tos[:-1])
+            starts = np.flatnonzero(new_edge)
+            froms = froms[starts]
+            tos = tos[starts]
+            flows = np.add.reduceat(flows, starts)
+
+            # Remove the edges without any flow
+            used = flows != 0
+            froms = froms[used]
+            tos = tos[used]
+            flows = flows[used]
+
+        self.froms = froms
+        self.tos = tos
+        self.flows = flows
+        for array in (self.froms, self.tos, self.flows):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_solution(cls, path) -> 'FlowMatrix':
+        """
+        Creates the flow matrix of a solution
+
+        params
+            path - A Solution, a path of form [{from, to, s}] or a chromosome of form [(from, to, s)]
+
+        returns
+            The flow matrix
+        """
+        solution = as_solution(path=path)
+        return cls(froms=solution.froms, tos=solution.tos, flows=solution.s)
+
+    @classmethod
+    def from_flows(cls, flows: Dict[Tuple[int, int], int]) -> 'FlowMatrix':
+        """
+        Creates the flow matrix from a dictionary of (from, to): flow
+
+        returns
+            The flow matrix
+        """
+        edges = list(flows.keys())
+        return cls(froms=[edge[0] for edge in edges], tos=[edge[1] for edge in edges],
+                   flows=list(flows.values()))
+
+    def to_flows(self) -> Dict[Tuple[int, int], int]:
+        """
+        returns
+            Dictionary of (from, to): flow
+        """
+        return dict(zip(zip(self.froms.tolist(), self.tos.tolist()), self.flows.tolist()))
+
+    def journey_counts(self, max_journey_size: int) -> np.ndarray:
+        """
+        returns
+            The number of journeys of each edge, ceil(flow / max_journey_size)
+        """
+        return -(-self.flows // max_journey_size)
+
+    def to_solution(self, max_journey_size: int) -> Solution:
+        """
+        Creates the compressed journeys of the flows. Each edge is made up of as many journeys of
+        max_journey_size as possible followed by one journey of the remainder
+
+        params
+            max_journey_size - The maximum size of a journey
+
+        returns
+            The compressed Solution, ordered by from and then to depot
+        """
+        counts = self.journey_counts(max_journey_size=max_journey_size)
+
+        # Every journey is max_journey_size except the final journey of each edge with a remainder
+        s = np.full(int(counts.sum()), max_journey_size, dtype=np.int32)
+        remainders = self.flows % max_journey_size
+        has_remainder = remainders > 0
+        s[(np.cumsum(counts) - 1)[has_remainder]] = remainders[has_remainder]
+
+        return Solution.from_arrays(froms=np.repeat(self.froms, counts),
+                                    tos=np.repeat(self.tos, counts), s=s)
+
+    def cost(self, model: Dict[int, Depot], max_journey_size: int) -> float:
+        """
+        Calculates the fitness of the compressed solution, the sum of ceil(flow / max_journey_size) * distance
+
+        params
+            model - The model the solution is for
+            max_journey_size - The maximum size of a journey
+
+        returns
+            The total distance of the compressed solution
+        """
+        counts = self.journey_counts(max_journey_size=max_journey_size)
+        if isinstance(model, TNRPModel):
+            dists = model.distances(froms=self.froms, tos=self.tos)
+        else:
+            dists = np.array([model[f].get_connections()[t]
+                              for f, t in zip(self.froms.tolist(), self.tos.tolist())], dtype=np.float64)
+        return float(np.dot(counts, dists))
+
+    def net_flows(self, size: int) -> np.ndarray:
+        """
+        Calculates the net quantity received by each depot, the column sums minus the row sums
+
+        params
+            size - The number of depot names
+
+        returns
+            Array of the quantity each depot receives minus the quantity it sends
+        """
+        net = np.zeros(size, dtype=np.int64)
+        np.add.at(net, self.tos, self.flows)
+        np.subtract.at(net, self.froms, self.flows)
+        return net
+
+    def is_feasible(self, model: Dict[int, Depot]) -> bool:
+        """
+        Checks whether the flows resolve the model, so every surplus is sent and every deficit received
+
+        params
+            model - The model in its original state
+
+        returns
+            Boolean of whether the model is in equilibrium after the flows are applied
+        """
+        s = model.s if isinstance(model, TNRPModel) else SupplyState(model=model).s
+        if len(self.froms) > 0 and max(self.froms.max(), self.tos.max()) >= len(s):
+            return False
+        # Flows must be positive and leave every depot in equilibrium
+        return bool((self.flows > 0).all()) and not (s + self.net_flows(size=len(s))).any()
+
+    def __eq__(self, other: object) -> bool:
+        """Flow matrices are equal if they have the same flow along every edge"""
+        if not isinstance(other, FlowMatrix):
+            return NotImplemented
+        return np.array_equal(self.froms, other.froms) and np.array_equal(self.tos, other.tos) and \
+            np.array_equal(self.flows, other.flows)
+
+    def __hash__(self) -> int:
+        """The hash of the flow along every edge"""
+        return hash((self.froms.tobytes(), self.tos.tobytes(), self.flows.tobytes()))
+
+    def __len__(self) -> int:
+        """The number of edges with a flow"""
+        return len(self.flows)
+
+    def __repr__(self) -> str:
+        """Flow matrix to string method for debugging"""
+        return f'FlowMatrix({self.to_flows()})'
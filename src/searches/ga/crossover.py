@@ -3,16 +3,81 @@ Performs the crossover method for a GA
 """
 from typing import List, Tuple, Dict
 import random
-import copy
+import numpy as np
 from TNRP_model.depot import Depot
-from searches.random_search import random_search
-from searches.ga.population import encode_solution, decode_solution
-from searches.sa.neighbourhood import compress_neighbour
+from TNRP_model.supply_state import SupplyState
+from searches.flow_matrix import FlowMatrix
+from searches.solution import Solution, as_solution
 
 
-def aware_crossover(parent_1: List[Tuple[int, int, int]], parent_2: List[Tuple[int, int, int]], model: Dict[int, Depot], max_journey_size: int, crossover_rate: float) -> Tuple[List[Tuple[int, int, int]], List[Tuple[int, int, int]]]:
+def inherit_genes(genes: Tuple[List[int], List[int], List[int]], supply: List[int],
+                  flows: Dict[Tuple[int, int], int]):
     """
-    Performs a crossover which tries to remain aware of solution to produce two valid children
+    Adds genes to a child's flows in order, reducing each so it doesn't over resolve a depot
+
+    params
+        genes - The from depots, to depots and quantities of the genes
+        supply - The supply value of each depot, which is changed in place
+        flows - Dictionary of (from, to): quantity of the child, which is changed in place
+    """
+    for sur, deficit, s in zip(*genes):
+        # Add as much as possible without over resolving a depot
+        move_size = min(s, supply[sur], -supply[deficit])
+        if move_size > 0:
+            supply[sur] -= move_size
+            supply[deficit] += move_size
+            flows[(sur, deficit)] = flows.get((sur, deficit), 0) + move_size
+
+
+def resolve_remaining(supply: List[int], flows: Dict[Tuple[int, int], int]):
+    """
+    Resolves the depots left unresolved by the genes, moving as much as possible between randomly ordered
+    surplus and deficit depots, so each depot is joined to as few others as possible
+
+    params
+        supply - The supply value of each depot, which is changed in place
+        flows - Dictionary of (from, to): quantity of the child, which is changed in place
+    """
+    surs = [dep for dep, s in enumerate(supply) if s > 0]
+    defs = [dep for dep, s in enumerate(supply) if s < 0]
+    random.shuffle(surs)
+    random.shuffle(defs)
+
+    sur_idx = 0
+    def_idx = 0
+    while sur_idx < len(surs) and def_idx < len(defs):
+        sur, deficit = surs[sur_idx], defs[def_idx]
+        move_size = min(supply[sur], -supply[deficit])
+        supply[sur] -= move_size
+        supply[deficit] += move_size
+        flows[(sur, deficit)] = flows.get((sur, deficit), 0) + move_size
+        if supply[sur] == 0:
+            sur_idx += 1
+        if supply[deficit] == 0:
+            def_idx += 1
+
+
+def aware_crossover(parent_1: List[Tuple[int, int, int]], parent_2: List[Tuple[int, int, int]],
+                    model: Dict[int, Depot], max_journey_size: int, crossover_rate: float,
+                    supply: np.ndarray = None) -> Tuple[List[Tuple[int, int, int]], List[Tuple[int, int, int]]]:
+    """
+    Performs a crossover which tries to remain aware of solution to produce two valid children.
+
+    Genes are taken from the parents in the order of a random permutation of each parent, and each pair
+    of genes is swapped between the children with probability 0.5. The children are built as flows on an
+    integer supply vector, finished by resolving the remaining depots and returned compressed
+
+    params
+        parent_1 - The first parent, as a list of (from, to, s) or a Solution
+        parent_2 - The second parent, of the same type as the first
+        model - The model the algorithm is performed on
+        max_journey_size - The maximum size of a journey
+        crossover_rate - The chance of a crossover occurring
+        supply - The initial supply value of each depot by name, so it isn't read from the model with
+                 every crossover (default=None, read from the model)
+
+    returns
+        The two children, of the same type as the parents. The parents are not changed
     """
     # Generate a random float between 0 and 1
     rand = random.random()
@@ -22,102 +87,34 @@ def aware_crossover(parent_1: List[Tuple[int, int, int]], parent_2: List[Tuple[i
         # If it is, no crossover occurs and parents are returned
         return parent_1, parent_2
 
-    # Crate blank arrays for a child path and child models
-    child_1 = []
-    child_1_model = copy.deepcopy(model)
-    child_2 = []
-    child_2_model = copy.deepcopy(model)
-
-    while len(parent_1) > 0 and len(parent_2) > 0:
-        # Check whether to do a crossover or not
-        crossover = random.choice([False, True])
-        # Select a gene from parent 1 and parent 2
-        parent_1_gene_idx = random.randint(0, len(parent_1) - 1)
-        parent_2_gene_idx = random.randint(0, len(parent_2) - 1)
-        parent_1_gene = ()
-        parent_2_gene = ()
-        if not crossover:
-            parent_1_gene = parent_1[parent_1_gene_idx]
-            parent_2_gene = parent_2[parent_2_gene_idx]
-        else:
-            parent_1_gene = parent_2[parent_2_gene_idx]
-            parent_2_gene = parent_1[parent_1_gene_idx]
-        # Delete the gene
-        del parent_1[parent_1_gene_idx]
-        del parent_2[parent_2_gene_idx]
-
-        # Try and add parent 1 gene to child 1
-        par_1_sur = parent_1_gene[0]
-        par_1_def = parent_1_gene[1]
-        par_1_s = parent_1_gene[2]
-        # If the journey can be made to the model without over resolving a depot
-        if child_1_model[par_1_sur].get_s() >= par_1_s and abs(child_1_model[par_1_def].get_s()) >= par_1_s:
-            # Apply the journey
-            child_1.append(parent_1_gene)
-            # Move within the model
-            Depot.move_s(start=child_1_model[par_1_sur],
-                         end=child_1_model[par_1_def], s=par_1_s)
-
-        else:  # A depot is going to be resolved
-            # Add as much as possible to resolve a depot
-            min_s = min(child_1_model[par_1_sur].get_s(), abs(
-                child_1_model[par_1_def].get_s()))
-            # check there is a journey to add
-            if min_s != 0:
-                # Create the journey
-                journey = (par_1_sur, par_1_def, min_s)
-                # Add to the child
-                child_1.append(journey)
-                # Move within the model
-                Depot.move_s(start=child_1_model[par_1_sur],
-                             end=child_1_model[par_1_def], s=min_s)
-
-        # Try and add parent 2 gene to child 2
-        par_2_sur = parent_2_gene[0]
-        par_2_def = parent_2_gene[1]
-        par_2_s = parent_2_gene[2]
-        # If the journey can be made to the model without over resolving a depot
-        if child_2_model[par_2_sur].get_s() >= par_2_s and abs(child_2_model[par_2_def].get_s()) >= par_2_s:
-            # Apply the journey
-            child_2.append(parent_2_gene)
-            # Move within the model
-            Depot.move_s(start=child_2_model[par_2_sur],
-                         end=child_2_model[par_2_def], s=par_2_s)
-
-        else:  # A depot is going to be resolved
-            # Add as much as possible to resolve a depot
-            min_s = min(child_2_model[par_2_sur].get_s(), abs(
-                child_2_model[par_2_def].get_s()))
-            # check there is a journey to add
-            if min_s != 0:
-                # Create the journey
-                journey = (par_2_sur, par_2_def, min_s)
-                # Add to the child
-                child_2.append(journey)
-                # Move within the model
-                Depot.move_s(start=child_2_model[par_2_sur],
-                             end=child_2_model[par_2_def], s=min_s)
-
-    # Now want to add the final journeys to resolve a model using a random search
-    final_child_1_paths = encode_solution(random_search(
-        model=child_1_model, max_journey_size=max_journey_size))
-    child_1.extend(final_child_1_paths)
-
-    final_child_2_paths = encode_solution(random_search(
-        model=child_2_model, max_journey_size=max_journey_size))
-    child_2.extend(final_child_2_paths)
-
-    # Now compress the solutions
-    # Using the compression program from SA algorithm
-    encoded_child_1 = decode_solution(path=child_1)
-    compressed_child_1 = compress_neighbour(
-        path=encoded_child_1, max_journey_size=max_journey_size)
-    child_1 = encode_solution(path=compressed_child_1)
-
-    # Using the compression program from SA algorithm
-    encoded_child_2 = decode_solution(path=child_2)
-    compressed_child_2 = compress_neighbour(
-        path=copy.deepcopy(encoded_child_2), max_journey_size=max_journey_size)
-    child_2 = encode_solution(path=compressed_child_2)
-
-    return child_1, child_2
+    solution_1 = as_solution(path=parent_1)
+    solution_2 = as_solution(path=parent_2)
+    if supply is None:
+        supply = SupplyState(model=model).initial
+
+    # A gene is taken from each parent until one has none left, in the order of a random permutation
+    num_genes = min(len(solution_1), len(solution_2))
+    order_1 = np.array(random.sample(range(len(solution_1)), num_genes), dtype=np.int64)
+    order_2 = np.array(random.sample(range(len(solution_2)), num_genes), dtype=np.int64)
+    genes_1 = np.stack([solution_1.froms[order_1], solution_1.tos[order_1], solution_1.s[order_1]])
+    genes_2 = np.stack([solution_2.froms[order_2], solution_2.tos[order_2], solution_2.s[order_2]])
+
+    # Swap each pair of genes between the children with probability 0.5
+    crossover = np.array([random.random() < 0.5 for _ in range(num_genes)], dtype=bool)
+    child_genes_1 = np.where(crossover, genes_2, genes_1).tolist()
+    child_genes_2 = np.where(crossover, genes_1, genes_2).tolist()
+
+    children = []
+    for child_genes in (child_genes_1, child_genes_2):
+        # Add the genes to the child on its own supply vector, then resolve the remaining depots
+        child_supply = supply.tolist()
+        flows = {}
+        inherit_genes(genes=child_genes, supply=child_supply, flows=flows)
+        resolve_remaining(supply=child_supply, flows=flows)
+        # Create the compressed journeys of the child's flows
+        children.append(FlowMatrix.from_flows(flows=flows).to_solution(max_journey_size=max_journey_size))
+
+    # Return the children in the form the parents were passed in
+    if isinstance(parent_1, Solution):
+        return children[0], children[1]
+    return children[0].to_tuples(), children[1].to_tuples()
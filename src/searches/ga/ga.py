@@ -2,20 +2,23 @@
 Main body of the genetic algorithm
 """
 import random
-import copy
 from math import inf
+import numpy as np
 from typing import Dict, List, Tuple
 from TNRP_model.depot import Depot
-from searches.ga.population import gen_pop, decode_solution
-from searches.ga.selection import tournament
+from TNRP_model.supply_state import SupplyState
+from searches.ga.population import gen_solutions
+from searches.ga.selection import select_indices
 from searches.ga.crossover import aware_crossover
 from searches.ga.mutation import swap
-from searches.utils import fitness
+from searches.ga.parallel import ParallelBreeder
+from searches.utils import fitness_batch, pack_solutions
+from searches.solution import Solution
 
 
 def ga(model: Dict[int, Depot], mutation_rate: float, crossover_rate: float,
-       pop_size: int, t_size: int, n: int, max_journey_size: int) -> Tuple[List[int],
-                                                                           List[Dict[str, int]]]:
+       pop_size: int, t_size: int, n: int, max_journey_size: int,
+       selection='tournament', workers=1) -> Tuple[List[int], List[Dict[str, int]]]:
     """
     The main body of the GA algorithm
 
@@ -27,16 +30,27 @@ def ga(model: Dict[int, Depot], mutation_rate: float, crossover_rate: float,
         t_size - The size of the tournament
         n - The termination criterion for how many fitness evals before completion
         max_journey_size - The maximum journey size for the problem
+        selection - How parents are selected using the fitnesses already calculated for the population,
+                    'tournament', 'rank' or 'sus' (fitness proportional stochastic universal sampling)
+                    (default='tournament')
+        workers - The number of processes creating and evaluating the children of each population. Above 1
+                  each worker's random numbers are seeded from the random module (default=1, this process)
 
     returns
         A tuple of fitnesses and the best path as a list of Dictionaries of {from, to, s}
     """
+    # The random number generator of the vectorised selection, seeded from the random module
+    rng = np.random.default_rng(random.getrandbits(64))
+
+    # The initial supply vector of the model, which every crossover builds its children on
+    supply = SupplyState(model=model).initial
+
     # Generate a population of pop_size feasible solutions
-    pop = gen_pop(pop_size=pop_size,  model=model,
-                  max_journey_size=max_journey_size)
+    pop = gen_solutions(pop_size=pop_size,  model=model,
+                        max_journey_size=max_journey_size)
 
     # Store the start best_path to check convergence
-    best_path = []
+    best_path = Solution(capacity=1)
     best_fitness = inf
 
     # Store the value of each fitness evaluation
@@ -45,67 +59,96 @@ def ga(model: Dict[int, Depot], mutation_rate: float, crossover_rate: float,
     # Keep track of the number of fitness evals
     fitness_evals = 0
 
+    # Calculate the fitness of the original population at once
+    froms, tos, offsets = pack_solutions(solutions=pop)
+    pop_fitnesses = fitness_batch(froms=froms, tos=tos, model=model, offsets=offsets).tolist()
+
     # For each of the original population
-    for path in pop:
-        # Calculate its fitness and increment number of fitness evaluations
-        fit = fitness(path=decode_solution(path=path), model=model)
+    for path, fit in zip(pop, pop_fitnesses):
+        # Increment number of fitness evaluations
         fitness_evals += 1
         # Store the result of the fitness evaluations
         all_fitnesses.append(fit)
         # If the fitness is the best so far then store it
         if fit < best_fitness:
-            best_path = decode_solution(path=path)
+            best_path = path
             best_fitness = fit
 
-    # While the number of fitness evals is lower than terminating criterion
-    while fitness_evals < n:
-        # Store the new population
-        new_pop = []
-
-        # Start creating the new population until it is of the correct size
-        while len(new_pop) < pop_size:
-            # Select two parents
-            parent_1 = tournament(pop=pop, t_size=t_size, model=model)
-            parent_2 = tournament(pop=pop, t_size=t_size, model=model)
-
-            # Perform crossover
-            child_1, child_2 = aware_crossover(
-                parent_1=copy.deepcopy(parent_1), parent_2=copy.deepcopy(parent_2),
-                model=model, max_journey_size=max_journey_size, crossover_rate=crossover_rate)
-
-            # Perform mutation
-            child_1 = swap(parent=child_1, mutation_rate=mutation_rate,
-                           max_journey_size=max_journey_size)
-            child_2 = swap(parent=child_2, mutation_rate=mutation_rate,
-                           max_journey_size=max_journey_size)
-
-            # Add children to the new population
-            new_pop.append(child_1)
-            new_pop.append(child_2)
-
-        # If there is an odd number in population and therefore the new population is too large
-        if len(new_pop) > pop_size:
-            # Remove a member from the new population at random
-            i = random.randint(0, len(new_pop)-1)
-            del new_pop[i]
-
-        # Assign the new population to the old one
-        pop = new_pop
-
-        # Calculate the fitness of individuals in the population
-        for path in pop:
-            # Check number of fitness evals isnt broken
-            if fitness_evals == n:
-                break
-            # Calculate the fitness and increment fitness evaluations
-            fit = fitness(path=decode_solution(path=path), model=model)
-            fitness_evals += 1
-            # Store result of evaluation
-            all_fitnesses.append(fit)
-
-            # Check if individual is fitter
-            if fit < best_fitness:
-                best_fitness = fit
-                best_path = decode_solution(path=path)
-
-    return all_fitnesses, best_path
+    # Create the children in worker processes, which are sent the model once
+    breeder = None
+    if workers > 1:
+        breeder = ParallelBreeder(model=model, max_journey_size=max_journey_size, crossover_rate=crossover_rate,
+                                  mutation_rate=mutation_rate, workers=workers)
+
+    try:
+        # While the number of fitness evals is lower than terminating criterion
+        while fitness_evals < n:
+            # Store the new population
+            new_pop = []
+
+            # Select the parents of the whole new population at once from the population's fitnesses
+            num_parents = pop_size + pop_size % 2
+            parents = select_indices(fitnesses=pop_fitnesses, k=num_parents, method=selection, rng=rng,
+                                     t_size=t_size).tolist()
+
+            # Create the children in the worker processes, which also remove a child of an odd population and
+            # evaluate the children without breaking the number of fitness evals
+            child_fitnesses = None
+            if breeder is not None:
+                new_pop, child_fitnesses = breeder.breed(parents=[pop[idx] for idx in parents],
+                                                         num_children=pop_size, num_evaluated=n - fitness_evals)
+
+            # Start creating the new population until it is of the correct size
+            for parent_idx in range(0, num_parents if breeder is None else 0, 2):
+                # Take the next two parents
+                parent_1 = pop[parents[parent_idx]]
+                parent_2 = pop[parents[parent_idx + 1]]
+
+                # Perform crossover
+                child_1, child_2 = aware_crossover(
+                    parent_1=parent_1, parent_2=parent_2,
+                    model=model, max_journey_size=max_journey_size, crossover_rate=crossover_rate, supply=supply)
+
+                # Perform mutation
+                child_1 = swap(parent=child_1, mutation_rate=mutation_rate,
+                               max_journey_size=max_journey_size)
+                child_2 = swap(parent=child_2, mutation_rate=mutation_rate,
+                               max_journey_size=max_journey_size)
+
+                # Add children to the new population
+                new_pop.append(child_1)
+                new_pop.append(child_2)
+
+            # If there is an odd number in population and therefore the new population is too large
+            if len(new_pop) > pop_size:
+                # Remove a member from the new population at random
+                i = random.randint(0, len(new_pop)-1)
+                del new_pop[i]
+
+            # Assign the new population to the old one
+            pop = new_pop
+
+            # Calculate the fitness of individuals in the population at once,
+            # without breaking the number of fitness evals
+            evaluated = pop[:n - fitness_evals]
+            if child_fitnesses is not None:
+                pop_fitnesses = child_fitnesses
+            else:
+                froms, tos, offsets = pack_solutions(solutions=evaluated)
+                pop_fitnesses = fitness_batch(froms=froms, tos=tos, model=model, offsets=offsets).tolist()
+
+            for path, fit in zip(evaluated, pop_fitnesses):
+                # Increment fitness evaluations
+                fitness_evals += 1
+                # Store result of evaluation
+                all_fitnesses.append(fit)
+
+                # Check if individual is fitter
+                if fit < best_fitness:
+                    best_fitness = fit
+                    best_path = path
+    finally:
+        if breeder is not None:
+            breeder.close()
+
+    return all_fitnesses, best_path.to_dicts()
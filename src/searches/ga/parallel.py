@@ -0,0 +1,188 @@
+"""
+Creates the children of a GA population in worker processes
+"""
+import random
+import multiprocessing
+from typing import Dict, List, Tuple
+import numpy as np
+from TNRP_model.depot import Depot
+from TNRP_model.supply_state import SupplyState
+from searches.ga.crossover import aware_crossover
+from searches.ga.mutation import swap
+from searches.solution import Solution
+from searches.utils import fitness_batch, pack_solutions
+
+# The state of a worker process, set once when the worker starts
+_worker = {}
+
+
+def init_worker(model: Dict[int, Depot], max_journey_size: int, crossover_rate: float, mutation_rate: float):
+    """
+    Stores the model and hyperparameters in a worker process, so they are only sent to it once
+
+    params
+        model - The model the algorithm is performed on
+        max_journey_size - The maximum journey size for the problem
+        crossover_rate - The chance that a crossover occurs
+        mutation_rate - The chance of a mutation occurring
+    """
+    _worker['model'] = model
+    _worker['supply'] = SupplyState(model=model).initial
+    _worker['max_journey_size'] = max_journey_size
+    _worker['crossover_rate'] = crossover_rate
+    _worker['mutation_rate'] = mutation_rate
+
+
+def pack(solutions: List[Solution]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Packs solutions into arrays, so they are sent between processes compactly
+
+    params
+        solutions - The solutions
+
+    returns
+        Tuple of the from depots, to depots and quantities of every journey, and the offsets where each
+        solution starts in them
+    """
+    froms, tos, offsets = pack_solutions(solutions=solutions)
+    s = np.concatenate([solution.s for solution in solutions]) if len(solutions) > 0 else \
+        np.empty(0, dtype=np.int32)
+    return froms, tos, s, offsets
+
+
+def unpack(froms: np.ndarray, tos: np.ndarray, s: np.ndarray, offsets: np.ndarray) -> List[Solution]:
+    """
+    Unpacks the solutions packed by pack
+
+    returns
+        The solutions
+    """
+    return [Solution.from_arrays(froms=froms[start:end], tos=tos[start:end], s=s[start:end])
+            for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def breed(task: Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], int, int, int]) \
+        -> Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
+    """
+    Performs crossover and mutation on pairs of parents in a worker process, and evaluates the first children
+
+    params
+        task - Tuple of the packed parents, where parents 2i and 2i + 1 are paired, the seed of the worker's
+               random numbers, the index of a child to remove (-1 if none is removed) and the number of the
+               remaining children evaluated
+
+    returns
+        Tuple of the packed children and the fitness of each child evaluated
+    """
+    packed_parents, seed, drop, num_evaluated = task
+    random.seed(seed)
+    parents = unpack(*packed_parents)
+
+    children = []
+    for parent_idx in range(0, len(parents), 2):
+        # Perform crossover
+        child_1, child_2 = aware_crossover(
+            parent_1=parents[parent_idx], parent_2=parents[parent_idx + 1], model=_worker['model'],
+            max_journey_size=_worker['max_journey_size'], crossover_rate=_worker['crossover_rate'],
+            supply=_worker['supply'])
+
+        # Perform mutation
+        for child in (child_1, child_2):
+            children.append(swap(parent=child, mutation_rate=_worker['mutation_rate'],
+                                 max_journey_size=_worker['max_journey_size']))
+
+    # Remove a child before any are evaluated, so only the children kept count as fitness evaluations
+    if drop >= 0:
+        del children[drop]
+
+    # Calculate the fitness of the evaluated children at once
+    froms, tos, offsets = pack_solutions(solutions=children[:num_evaluated])
+    fitnesses = fitness_batch(froms=froms, tos=tos, model=_worker['model'], offsets=offsets)
+    return pack(solutions=children), fitnesses
+
+
+class ParallelBreeder:
+    """
+    A pool of worker processes that create and evaluate the children of each GA population.
+
+    The model is sent to each worker once when it starts, and the parents and children are sent as packed
+    arrays. Each worker's random numbers are seeded from the random module for every population, so a run is
+    reproducible with random.seed whatever the order the workers finish in
+    """
+
+    def __init__(self, model: Dict[int, Depot], max_journey_size: int, crossover_rate: float,
+                 mutation_rate: float, workers: int) -> None:
+        """
+        Start the workers
+
+        params
+            model - The model the algorithm is performed on
+            max_journey_size - The maximum journey size for the problem
+            crossover_rate - The chance that a crossover occurs
+            mutation_rate - The chance of a mutation occurring
+            workers - The number of worker processes
+        """
+        self.workers = workers
+        self.pool = multiprocessing.Pool(processes=workers, initializer=init_worker,
+                                         initargs=(model, max_journey_size, crossover_rate, mutation_rate))
+
+    def breed(self, parents: List[Solution], num_children: int = None,
+              num_evaluated: int = None) -> Tuple[List[Solution], List[float]]:
+        """
+        Creates two children from each pair of parents, splitting the pairs between the workers
+
+        params
+            parents - The parents, where parents 2i and 2i + 1 are paired
+            num_children - The number of children kept. If it is one less than the number of parents, a child
+                           is removed at random (default=None, every child is kept)
+            num_evaluated - The number of children evaluated, from the first child, so the evaluations don't
+                            exceed a budget (default=None, every child is evaluated)
+
+        returns
+            Tuple of the children, in the order of their parents, and the fitness of each child evaluated
+        """
+        num_pairs = len(parents) // 2
+        if num_children is None:
+            num_children = 2 * num_pairs
+        if num_evaluated is None:
+            num_evaluated = num_children
+
+        # Remove a child at random if there is one too many
+        drop = random.randint(0, 2 * num_pairs - 1) if num_children < 2 * num_pairs else -1
+
+        # Split the pairs as evenly as possible, with a seed for each worker
+        sizes = [num_pairs // self.workers + (1 if worker < num_pairs % self.workers else 0)
+                 for worker in range(self.workers)]
+        tasks = []
+        start = 0
+        for size in sizes:
+            if size > 0:
+                # The child removed and the number evaluated of the worker's children
+                task_drop = drop - 2 * start if 2 * start <= drop < 2 * (start + size) else -1
+                task_evaluated = min(max(num_evaluated, 0), 2 * size - (1 if task_drop >= 0 else 0))
+                num_evaluated -= task_evaluated
+                tasks.append((pack(solutions=parents[2 * start:2 * (start + size)]), random.getrandbits(64),
+                              task_drop, task_evaluated))
+            start += size
+
+        children = []
+        fitnesses = []
+        for packed_children, child_fitnesses in self.pool.map(breed, tasks):
+            children.extend(unpack(*packed_children))
+            fitnesses.extend(child_fitnesses.tolist())
+        return children, fitnesses
+
+    def close(self):
+        """
+        Stops the workers
+        """
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self) -> 'ParallelBreeder':
+        """Use the breeder as a context manager"""
+        return self
+
+    def __exit__(self, *args):
+        """Close the breeder at the end of a with block"""
+        self.close()
@@ -1,10 +1,11 @@
 """
 Encodes a solution into a chromosome
 """
-import copy
 from typing import Dict, List, Tuple
 from TNRP_model.depot import Depot
-from searches.random_search import random_search
+from TNRP_model.supply_state import SupplyState
+from searches.random_search import random_solution
+from searches.solution import Solution
 
 
 def encode_solution(path: List[Dict[str, int]]) -> List[Tuple[int, int, int]]:
@@ -44,9 +45,9 @@ def decode_solution(path: List[Tuple[int, int, int]]) -> List[Dict[str, int]]:
     return decoded
 
 
-def gen_pop(pop_size: int, model: Dict[int, Depot], max_journey_size: int) -> List[List[Tuple[int, int, int]]]:
+def gen_solutions(pop_size: int, model: Dict[int, Depot], max_journey_size: int) -> List[Solution]:
     """
-    Generates an initial population for the genetic algorithm as a list of chromosomes
+    Generates an initial population for the genetic algorithm as a list of Solutions
 
     params
         pop_size - The size of the population returned
@@ -54,15 +55,30 @@ def gen_pop(pop_size: int, model: Dict[int, Depot], max_journey_size: int) -> Li
         max_journey_size - The maximum size journey for the problem
 
     returns
-        List of solutions, represented as genomes of (from_depot, to_depot, s) for each journey
+        List of random Solutions
     """
     pop = []
+    # Create a supply state to perform the random searches on, leaving the model unchanged
+    state = SupplyState(model=model)
     while len(pop) < pop_size:
-        # Generate a copy of the model
-        model_copy = copy.deepcopy(model)
-        # Generate a random solution
-        path = random_search(
-            model=model_copy, max_journey_size=max_journey_size)
-        # Add the encoded solution to the population
-        pop.append(encode_solution(path=path))
+        # Return the supply values to the initial state of the model
+        state.reset()
+        # Generate a random solution and add it to the population
+        pop.append(random_solution(model=state, max_journey_size=max_journey_size))
     return pop
+
+
+def gen_pop(pop_size: int, model: Dict[int, Depot], max_journey_size: int) -> List[List[Tuple[int, int, int]]]:
+    """
+    Generates an initial population for the genetic algorithm as a list of chromosomes
+
+    params
+        pop_size - The size of the population returned
+        model - The model the algorithm is performed on of type depot_name: Depot object
+        max_journey_size - The maximum size journey for the problem
+
+    returns
+        List of solutions, represented as genomes of (from_depot, to_depot, s) for each journey
+    """
+    return [solution.to_tuples() for solution in gen_solutions(
+        pop_size=pop_size, model=model, max_journey_size=max_journey_size)]
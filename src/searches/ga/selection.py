@@ -3,41 +3,152 @@ Performs selection for the genetic algorithm
 """
 from typing import List, Dict, Tuple
 import random
-from math import inf
-from searches.ga.population import encode_solution, decode_solution
-from searches.utils import fitness
+import numpy as np
+from searches.solution import as_solution
+from searches.utils import fitness_batch, pack_solutions
 from TNRP_model.depot import Depot
 
 
-def tournament(pop: List[List[Tuple[int, int, int]]], t_size: int, model: Dict[int, Depot]) -> List[Tuple[int, int, int]]:
+def tournament(pop: List[List[Tuple[int, int, int]]], t_size: int, model: Dict[int, Depot],
+               fitnesses: List[float] = None) -> List[Tuple[int, int, int]]:
     """
     Performs tournament selection on a population
 
     params
-        pop - The population as a list of solution chromosomes, represented as [(from, to, s)]
+        pop - The population as a list of Solutions or solution chromosomes, represented as [(from, to, s)]
         t_size - The size of the tournament
         model - The model to use when evaluating solutions
+        fitnesses - The fitness of each member of the population, so the entrants aren't evaluated again
+                    (default=None, the entrants are evaluated)
 
     returns
         The winning solution from the tournament
     """
-    # Shuffle the population
-    random.shuffle(pop)
+    # Pick the entrants of the tournament without shuffling the population
+    entrants = random.sample(range(len(pop)), min(t_size, len(pop)))
 
-    # Create population for the tournament
-    t_pop = pop[:t_size]
+    if fitnesses is not None:
+        t_fitnesses = [fitnesses[idx] for idx in entrants]
+    else:
+        # Calculate the fitness of every element of the tournament at once, decoding any chromosomes
+        t_paths = [as_solution(path=pop[idx]) for idx in entrants]
+        froms, tos, offsets = pack_solutions(solutions=t_paths)
+        t_fitnesses = fitness_batch(froms=froms, tos=tos, model=model, offsets=offsets)
 
-    # Calculate the best fitness element of the tournament
-    best_path = []
-    best_fitness = inf
-    for i in range(t_size):
-        # Calculate the fitness of the ith element
-        i_fitness = fitness(path=decode_solution(path=t_pop[i]), model=model)
+    # Return the best fitness element of the tournament
+    return pop[entrants[int(np.argmin(t_fitnesses))]]
 
-        # If fitness best so far, set it to the best path
-        if i_fitness < best_fitness:
-            # Set best fitness value to fitness of the element
-            best_fitness = i_fitness
-            best_path = t_pop[i]
 
-    return best_path
+def tournament_indices(fitnesses: np.ndarray, k: int, t_size: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Performs k tournaments at once, each between t_size different members of the population
+
+    params
+        fitnesses - The fitness of each member of the population
+        k - The number of tournaments
+        t_size - The size of each tournament
+        rng - The random number generator used
+
+    returns
+        The index of the winner of each tournament
+    """
+    fitnesses = np.asarray(fitnesses, dtype=np.float64)
+    t_size = min(t_size, len(fitnesses))
+
+    # The entrants of each tournament are the positions of its t_size smallest random keys
+    keys = rng.random((k, len(fitnesses)))
+    entrants = np.argpartition(keys, t_size - 1, axis=1)[:, :t_size]
+    winners = np.argmin(fitnesses[entrants], axis=1)
+    return entrants[np.arange(k), winners]
+
+
+def sus_indices(weights: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Performs stochastic universal sampling, picking k members of the population with k evenly spaced
+    pointers on one roulette wheel, so each member is picked close to its expected number of times
+
+    params
+        weights - The non-negative weight of each member of the population
+        k - The number of members picked
+        rng - The random number generator used
+
+    returns
+        The indices of the picked members, in a random order
+    """
+    cum_weights = np.cumsum(np.asarray(weights, dtype=np.float64))
+    total = cum_weights[-1]
+    if total <= 0:
+        return rng.integers(len(cum_weights), size=k)
+
+    pointers = (rng.random() + np.arange(k)) * (total / k)
+    picked = np.minimum(np.searchsorted(cum_weights, pointers, side='right'), len(cum_weights) - 1)
+    # The pointers pick in population order, so shuffle them before they are paired as parents
+    return rng.permutation(picked)
+
+
+def rank_indices(fitnesses: np.ndarray, k: int, rng: np.random.Generator, pressure=2.0) -> np.ndarray:
+    """
+    Performs linear rank selection, weighting each member of the population by its rank rather than
+    its fitness, and picking k members with stochastic universal sampling
+
+    params
+        fitnesses - The fitness of each member of the population
+        k - The number of members picked
+        rng - The random number generator used
+        pressure - The weight of the best member relative to the mean weight, between 1 and 2 (default=2.0)
+
+    returns
+        The indices of the picked members, in a random order
+    """
+    fitnesses = np.asarray(fitnesses, dtype=np.float64)
+    size = len(fitnesses)
+
+    # Rank 0 is the worst member and rank size - 1 is the best
+    ranks = np.empty(size, dtype=np.float64)
+    ranks[np.argsort(-fitnesses, kind='stable')] = np.arange(size)
+    weights = (2 - pressure) + 2 * (pressure - 1) * ranks / max(size - 1, 1)
+    return sus_indices(weights=weights, k=k, rng=rng)
+
+
+def fitness_proportional_indices(fitnesses: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Picks k members of the population with stochastic universal sampling, weighting each member by
+    1 / fitness as the fitness is minimised
+
+    params
+        fitnesses - The fitness of each member of the population
+        k - The number of members picked
+        rng - The random number generator used
+
+    returns
+        The indices of the picked members, in a random order
+    """
+    fitnesses = np.asarray(fitnesses, dtype=np.float64)
+    weights = np.divide(1.0, fitnesses, out=np.zeros_like(fitnesses), where=fitnesses > 0)
+    # A member with a fitness of 0 is optimal, so only those members are picked
+    if np.any(fitnesses <= 0):
+        weights = (fitnesses <= 0).astype(np.float64)
+    return sus_indices(weights=weights, k=k, rng=rng)
+
+
+def select_indices(fitnesses: np.ndarray, k: int, method: str, rng: np.random.Generator, t_size=2) -> np.ndarray:
+    """
+    Picks k members of the population with a selection method
+
+    params
+        fitnesses - The fitness of each member of the population
+        k - The number of members picked
+        method - 'tournament', 'rank' or 'sus' (fitness proportional stochastic universal sampling)
+        rng - The random number generator used
+        t_size - The size of each tournament (default=2)
+
+    returns
+        The indices of the picked members
+    """
+    if method == 'tournament':
+        return tournament_indices(fitnesses=fitnesses, k=k, t_size=t_size, rng=rng)
+    if method == 'rank':
+        return rank_indices(fitnesses=fitnesses, k=k, rng=rng)
+    if method == 'sus':
+        return fitness_proportional_indices(fitnesses=fitnesses, k=k, rng=rng)
+    raise ValueError(f"Unknown selection method '{method}', expected 'tournament', 'rank' or 'sus'")
@@ -3,7 +3,10 @@ Creates a random solution to the model passed in
 """
 import random
 from typing import List, Dict, Tuple
+import numpy as np
 from TNRP_model.depot import Depot
+from searches.solution import Solution
+from searches.utils import perform_move
 
 
 def perform_journey(sur_dep: Depot, def_dep: Depot,
@@ -19,39 +22,33 @@ def perform_journey(sur_dep: Depot, def_dep: Depot,
     returns
         Tuple of journey as {from, to, s} and List of any depots that have reach equilibrium as a result
     """
-    # Calculate the move size as the minimum to either resolve a depot or reach the max journey size
-    move_size = min(sur_dep.get_s(), abs(def_dep.get_s()), max_journey_size)
-
-    # Update the depot objects for the movement
-    Depot.move_s(start=sur_dep, end=def_dep, s=move_size)
+    # Perform the movement between the depots
+    move_size, equilibrium_deps = perform_move(
+        sur_dep=sur_dep, def_dep=def_dep, max_journey_size=max_journey_size)
 
     # Put the journey in a dictionary
     journey = {'from': sur_dep.get_name(), 'to': def_dep.get_name(),
                's': move_size}
 
-    # Check if any of the depots have reached equilibrium
-    equilibrium_deps = []
-    if sur_dep.get_s() == 0:
-        equilibrium_deps.append(sur_dep.get_name())
-
-    if def_dep.get_s() == 0:
-        equilibrium_deps.append(def_dep.get_name())
-
     return journey, equilibrium_deps
 
 
-def random_search(model: Dict[int, Depot], max_journey_size: int) -> List[Dict[str, int]]:
+def random_solution(model: Dict[int, Depot], max_journey_size: int,
+                    candidates: np.ndarray = None) -> Solution:
     """
     Performs a random search on the model that is passed in
 
     params:
         model - the TNRP as a dictionary of depot name: Depot object
         max_journey_size - The maximum number of goods that can be moved between depots
+        candidates - Lists of the deficit depots each surplus depot may move to, such as the
+                     neighbours of a sparse TNRPModel. Any deficit depot is used once all of a
+                     surplus depot's candidates are resolved (default=None, any deficit depot)
 
     returns
-        List of journeys of form [{from, to, s}]
+        The journeys as a Solution
     """
-    path = []
+    solution = Solution()
 
     # Split depots into surplus and deficit depots
     sur_deps = {dep: model[dep] for dep in model if model[dep].get_s() > 0}
@@ -61,15 +58,20 @@ def random_search(model: Dict[int, Depot], max_journey_size: int) -> List[Dict[s
     while len(sur_deps) > 0:
         # Pick a random surplus depot
         sur_dep = random.choice(list(sur_deps.keys()))
-        # Pick a random deficit depot
-        def_dep = random.choice(list(def_deps.keys()))
+        # Pick a random deficit depot, from the surplus depot's candidates if any are unresolved
+        def_options = list(def_deps.keys())
+        if candidates is not None:
+            open_candidates = [dep for dep in candidates[sur_dep] if dep in def_deps]
+            if len(open_candidates) > 0:
+                def_options = open_candidates
+        def_dep = random.choice(def_options)
 
         # Perform the journey from surplus to deficit depot
-        journey, resolved_deps = perform_journey(
+        move_size, resolved_deps = perform_move(
             sur_dep=sur_deps[sur_dep], def_dep=def_deps[def_dep], max_journey_size=max_journey_size)
 
         # Add the journey to the solution
-        path.append(journey)
+        solution.append(sur_dep, def_dep, move_size)
 
         # Remove any resolved depots from the sets
         for r_dep in resolved_deps:
@@ -78,4 +80,21 @@ def random_search(model: Dict[int, Depot], max_journey_size: int) -> List[Dict[s
             else:
                 del def_deps[r_dep]
 
-    return path
+    return solution
+
+
+def random_search(model: Dict[int, Depot], max_journey_size: int,
+                  candidates: np.ndarray = None) -> List[Dict[str, int]]:
+    """
+    Performs a random search on the model that is passed in
+
+    params:
+        model - the TNRP as a dictionary of depot name: Depot object
+        max_journey_size - The maximum number of goods that can be moved between depots
+        candidates - Lists of the deficit depots each surplus depot may move to (default=None, any deficit depot)
+
+    returns
+        List of journeys of form [{from, to, s}]
+    """
+    return random_solution(model=model, max_journey_size=max_journey_size,
+                           candidates=candidates).to_dicts()
@@ -0,0 +1,273 @@
+"""
+A compressed SA solution indexed by (from, to) edge, with moves made in place and undone if rejected
+"""
+import random
+from typing import Dict, List, Set, Tuple
+import numpy as np
+from TNRP_model.depot import Depot
+from searches.solution import Solution
+from searches.flow_matrix import FlowMatrix
+from searches.sa.neighbourhood import flow_cost_delta, journey_swap_changes
+
+
+class EdgeSolution:
+    """
+    A solution stored as the total quantity (flow) moved along each (from, to) edge.
+
+    The solution is always compressed, so an edge with a flow of f is made up of f // max_journey_size
+    journeys of max_journey_size and one journey of the remainder. Every journey has a slot,
+    so a random journey is picked in O(1) time. A swap changes the flow of four edges, each by
+    at most max_journey_size, so it adds or removes at most one slot per edge and is applied and
+    undone in O(1) time, however long the solution is
+    """
+
+    def __init__(self, solution: Solution, model: Dict[int, Depot], max_journey_size: int) -> None:
+        """
+        Create the edge solution from a Solution
+
+        params
+            solution - The solution, which is compressed by creating the edge solution
+            model - The model the solution is for
+            max_journey_size - The maximum size of a journey
+        """
+        self.model = model
+        self.max_journey_size = max_journey_size
+
+        # The flow along each edge, and the slots of the journeys of each edge
+        self.flows: Dict[Tuple[int, int], int] = {}
+        self.edge_slots: Dict[Tuple[int, int], List[int]] = {}
+        # The edge of each slot and its position in the edge's list of slots
+        self.slot_edge: List[Tuple[int, int]] = []
+        self.slot_pos: List[int] = []
+        # The surplus depots moving to each deficit depot, used to find candidate swaps
+        self.into: Dict[int, Set[int]] = {}
+
+        # The changes of the last move, so it can be undone
+        self.last_changes: Dict[Tuple[int, int], int] = None
+        self.last_delta = 0
+
+        # The best solution is stored lazily as a snapshot of the flows and the changes applied since.
+        # The snapshot is only moved forward once the log is longer than the solution
+        self.snapshot: Dict[Tuple[int, int], int] = {}
+        self.log: List[Dict[Tuple[int, int], int]] = []
+        self.best_mark = 0
+
+        changes = {}
+        for from_dep, to_dep, s in solution:
+            changes[(from_dep, to_dep)] = changes.get((from_dep, to_dep), 0) + s
+        self.change_flows(changes=changes)
+        self.snapshot = dict(self.flows)
+
+        # The energy (fitness) of the compressed solution
+        self.energy = self.full_energy()
+
+    def __len__(self) -> int:
+        """The number of journeys in the compressed solution"""
+        return len(self.slot_edge)
+
+    def journey(self, slot: int) -> Tuple[int, int, int]:
+        """
+        Getter for the journey in a slot
+
+        returns
+            The journey as (from, to, s). The last journey of an edge is the remainder of its flow
+        """
+        edge = self.slot_edge[slot]
+        remainder = self.flows[edge] % self.max_journey_size
+        if remainder != 0 and self.slot_pos[slot] == len(self.edge_slots[edge]) - 1:
+            return edge[0], edge[1], remainder
+        return edge[0], edge[1], self.max_journey_size
+
+    def _add_slot(self, edge: Tuple[int, int]):
+        """Adds a journey to an edge"""
+        slots = self.edge_slots.setdefault(edge, [])
+        self.slot_pos.append(len(slots))
+        slots.append(len(self.slot_edge))
+        self.slot_edge.append(edge)
+
+    def _remove_slot(self, edge: Tuple[int, int]):
+        """Removes the last journey of an edge, moving the last slot into its place"""
+        slots = self.edge_slots[edge]
+        slot = slots.pop()
+        if len(slots) == 0:
+            del self.edge_slots[edge]
+
+        last_slot = len(self.slot_edge) - 1
+        last_edge = self.slot_edge.pop()
+        last_pos = self.slot_pos.pop()
+        if slot != last_slot:
+            self.slot_edge[slot] = last_edge
+            self.slot_pos[slot] = last_pos
+            self.edge_slots[last_edge][last_pos] = slot
+
+    def change_flows(self, changes: Dict[Tuple[int, int], int]):
+        """
+        Changes the flow along edges, adding or removing journeys so the edges stay compressed
+
+        params
+            changes - Dictionary of (from, to): change in the quantity moved along the edge
+        """
+        flows = self.flows
+        max_journey_size = self.max_journey_size
+        for edge, change in changes.items():
+            old_flow = flows.get(edge, 0)
+            new_flow = old_flow + change
+
+            # Add or remove journeys for the change in ceil(flow / max_journey_size)
+            added = -(-new_flow // max_journey_size) + (-old_flow // max_journey_size)
+            while added > 0:
+                self._add_slot(edge=edge)
+                added -= 1
+            while added < 0:
+                self._remove_slot(edge=edge)
+                added += 1
+
+            if new_flow == 0:
+                del flows[edge]
+                self.into[edge[1]].discard(edge[0])
+            else:
+                if old_flow == 0:
+                    self.into.setdefault(edge[1], set()).add(edge[0])
+                flows[edge] = new_flow
+
+    def pick_swap(self, candidates: np.ndarray = None, attempts=10) -> Tuple[int, int]:
+        """
+        Picks the slots of two journeys with different surplus and deficit depots to swap
+
+        params
+            candidates - Lists of the deficit depots each surplus depot may move to. If given, swaps that
+                         only create journeys to candidates are preferred (default=None, any swap)
+            attempts - The number of first journeys tried when looking for a candidate swap (default=10)
+
+        returns
+            Tuple of the two slots
+        """
+        if candidates is not None:
+            picked = self._pick_candidate_swap(candidates=candidates, attempts=attempts)
+            if picked is not None:
+                return picked
+
+        # Pick two random slots until their surplus and deficit depots are different.
+        # Slots on the same edge are always rejected so the two slots are different
+        slot_edge = self.slot_edge
+        num_slots = len(slot_edge)
+        slot_1 = slot_2 = 0
+        while slot_edge[slot_1][0] == slot_edge[slot_2][0] or slot_edge[slot_1][1] == slot_edge[slot_2][1]:
+            slot_1 = random.randrange(num_slots)
+            slot_2 = random.randrange(num_slots)
+        return slot_1, slot_2
+
+    def _pick_candidate_swap(self, candidates: np.ndarray, attempts: int) -> Tuple[int, int]:
+        """
+        Picks two journeys whose deficit depots can be swapped so both new journeys go to a candidate,
+        using the index of the surplus depots moving to each deficit depot
+
+        returns
+            Tuple of the two slots, or None if no pair was found
+        """
+        for _ in range(attempts):
+            slot_1 = random.randrange(len(self.slot_edge))
+            sur_1, def_1 = self.slot_edge[slot_1]
+
+            # Journeys from another surplus depot to a candidate of sur_1, that has def_1 as a candidate
+            options = [slot for def_2 in set(candidates[sur_1].tolist()) if def_2 >= 0 and def_2 != def_1
+                       for sur_2 in self.into.get(def_2, ()) if sur_2 != sur_1 and def_1 in candidates[sur_2]
+                       for slot in self.edge_slots[(sur_2, def_2)]]
+            if len(options) > 0:
+                return slot_1, random.choice(options)
+
+        return None
+
+    def apply_swap(self, slot_1: int, slot_2: int) -> float:
+        """
+        Swaps the deficit depots of two journeys in place, as in gen_neighbour followed by compress_neighbour
+
+        params
+            slot_1 - The slot of the first journey
+            slot_2 - The slot of the second journey
+
+        returns
+            The change in energy
+        """
+        changes = journey_swap_changes(journey_1=self.journey(slot_1), journey_2=self.journey(slot_2))
+        delta = flow_cost_delta(flows=self.flows, changes=changes, model=self.model,
+                                max_journey_size=self.max_journey_size)
+        self.change_flows(changes=changes)
+        self.energy += delta
+
+        # Store the move so it can be undone
+        self.last_changes = changes
+        self.last_delta = delta
+        return delta
+
+    def undo(self):
+        """
+        Rolls back the last move
+        """
+        self.change_flows(changes={edge: -change for edge, change in self.last_changes.items()})
+        self.energy -= self.last_delta
+        self.last_changes = None
+
+    def commit(self):
+        """
+        Keeps the last move, logging it so the best solution can be rebuilt
+        """
+        self.log.append(self.last_changes)
+        self.last_changes = None
+
+        # Move the snapshot forward to the best solution once the log is longer than the solution
+        if len(self.log) > max(len(self.flows), 64):
+            self.snapshot = self._best_flows()
+            self.log = self.log[self.best_mark:]
+            self.best_mark = 0
+
+    def mark_best(self):
+        """
+        Marks the current solution as the best so far
+        """
+        self.best_mark = len(self.log)
+
+    def _best_flows(self) -> Dict[Tuple[int, int], int]:
+        """Rebuilds the flows of the best solution from the snapshot and the log"""
+        flows = dict(self.snapshot)
+        for changes in self.log[:self.best_mark]:
+            for edge, change in changes.items():
+                flow = flows.get(edge, 0) + change
+                if flow == 0:
+                    del flows[edge]
+                else:
+                    flows[edge] = flow
+        return flows
+
+    def full_energy(self) -> float:
+        """
+        Calculates the energy of the current solution from every edge
+
+        returns
+            The fitness of the compressed solution
+        """
+        return FlowMatrix.from_flows(flows=self.flows).cost(model=self.model,
+                                                            max_journey_size=self.max_journey_size)
+
+    def to_flow_matrix(self) -> FlowMatrix:
+        """
+        returns
+            The flows of the current solution as a FlowMatrix
+        """
+        return FlowMatrix.from_flows(flows=self.flows)
+
+    def to_solution(self) -> Solution:
+        """
+        returns
+            The current solution as a compressed Solution, ordered by from and then to depot
+        """
+        return self.to_flow_matrix().to_solution(max_journey_size=self.max_journey_size)
+
+    def best_solution(self) -> Solution:
+        """
+        returns
+            The best solution marked as a compressed Solution, ordered by from and then to depot
+        """
+        return FlowMatrix.from_flows(flows=self._best_flows()).to_solution(
+            max_journey_size=self.max_journey_size)
+
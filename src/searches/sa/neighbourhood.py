@@ -1,9 +1,30 @@
 """
 Generate a random neighbouring solution for the SA algorithm
 """
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import random
 import copy
+import numpy as np
+from TNRP_model.depot import Depot
+from searches.solution import Solution
+from searches.flow_matrix import FlowMatrix
+from searches.utils import edge_distance
+
+
+def compress_solution(solution: Solution, max_journey_size: int) -> Solution:
+    """
+    Compresses a Solution so each (from, to) route is made up of as many journeys of max_journey_size
+    as possible followed by one journey of the remainder, using its flow matrix. This is the same result
+    as compressing the list of journeys. Journeys must be no larger than max_journey_size
+
+    params
+        solution - The Solution to compress
+        max_journey_size - the maximum size of the journey allowed in the model
+
+    returns
+        New compressed Solution, ordered by from and then to depot
+    """
+    return FlowMatrix.from_solution(path=solution).to_solution(max_journey_size=max_journey_size)
 
 
 def compress_neighbour(path: List[Dict[str, int]], max_journey_size: int) -> List[Dict[str, int]]:
@@ -11,12 +32,15 @@ def compress_neighbour(path: List[Dict[str, int]], max_journey_size: int) -> Lis
     Compresses a neighbour to improve solution in the case where two journeys with s less than max_journey size have the same surplus and deficit nodes
 
     params
-        path - The path a of journeys of form [{from, to, s}]
+        path - The path a of journeys of form [{from, to, s}], or a Solution
         max_journey_size - the maximum size of the journey allowed in the model
 
     returns
-        Compressed path
+        Compressed path, of the same type as the path passed in
     """
+    if isinstance(path, Solution):
+        return compress_solution(solution=path, max_journey_size=max_journey_size)
+
     # Sort path by j['from'] and the j['to'] and then j['s']
     path.sort(key=lambda j: (j['from'], j['to'], -j['s']))
 
@@ -89,22 +113,244 @@ def compress_neighbour(path: List[Dict[str, int]], max_journey_size: int) -> Lis
     return new_path
 
 
-def gen_neighbour(path) -> List[Dict[str, int]]:
+def pick_candidate_journeys(path: List[Dict[str, int]], candidates: np.ndarray,
+                            attempts=10) -> Tuple[int, int]:
+    """
+    Picks two journeys whose deficit depots can be swapped so that both new journeys
+    go to one of their surplus depot's candidates
+
+    params
+        path - The path of journeys of form [{from, to, s}], or a Solution
+        candidates - Lists of the deficit depots each surplus depot may move to
+        attempts - The number of first journeys tried before giving up (default=10)
+
+    returns
+        Tuple of the indexes of the two journeys, or None if no pair was found
+    """
+    if isinstance(path, Solution):
+        return pick_candidate_solution_journeys(solution=path, candidates=candidates, attempts=attempts)
+
+    for _ in range(attempts):
+        # Pick a random first journey
+        j_1_idx = random.randrange(len(path))
+        sur_1 = path[j_1_idx]['from']
+        def_1 = path[j_1_idx]['to']
+
+        # Find the journeys that could be swapped with it using only candidate edges
+        options = [idx for idx, j in enumerate(path)
+                   if j['from'] != sur_1 and j['to'] != def_1
+                   and j['to'] in candidates[sur_1] and def_1 in candidates[j['from']]]
+        if len(options) > 0:
+            return j_1_idx, random.choice(options)
+
+    return None
+
+
+def pick_candidate_solution_journeys(solution: Solution, candidates: np.ndarray,
+                                     attempts=10) -> Tuple[int, int]:
+    """
+    Picks two journeys of a Solution whose deficit depots can be swapped so that both new journeys
+    go to one of their surplus depot's candidates. See pick_candidate_journeys
+
+    returns
+        Tuple of the indexes of the two journeys, or None if no pair was found
+    """
+    froms = solution.froms
+    tos = solution.tos
+    # The candidates of every journey's surplus depot
+    journey_candidates = candidates[froms]
+
+    for _ in range(attempts):
+        # Pick a random first journey
+        j_1_idx = random.randrange(len(solution))
+        sur_1 = froms[j_1_idx]
+        def_1 = tos[j_1_idx]
+
+        # Find the journeys that could be swapped with it using only candidate edges
+        options = np.flatnonzero((froms != sur_1) & (tos != def_1)
+                                 & np.isin(tos, candidates[sur_1])
+                                 & (journey_candidates == def_1).any(axis=1))
+        if len(options) > 0:
+            return j_1_idx, int(random.choice(options))
+
+    return None
+
+
+def pick_journeys(solution: Solution, candidates: np.ndarray = None) -> Tuple[int, int]:
+    """
+    Picks two journeys of a Solution with different surplus and deficit depots to swap,
+    as if either were the same the change won't affect the fitness
+
+    params
+        solution - The current solution from the SA algorithm
+        candidates - Lists of the deficit depots each surplus depot may move to (default=None, any swap)
+
+    returns
+        Tuple of the indexes of the two journeys
+    """
+    froms = solution.froms
+    tos = solution.tos
+    j_1_idx = 0
+    j_2_idx = 0
+
+    # Restrict the swap to the candidate lists if a pair of journeys can be found
+    if candidates is not None:
+        picked = pick_candidate_solution_journeys(solution=solution, candidates=candidates)
+        if picked is not None:
+            j_1_idx, j_2_idx = picked
+
+    # Pick two journeys with different surplus and deficit depots
+    while (froms[j_1_idx] == froms[j_2_idx]) or (tos[j_1_idx] == tos[j_2_idx]):
+        j_1_idx, j_2_idx = random.sample(range(len(solution)), k=2)
+
+    return j_1_idx, j_2_idx
+
+
+def swap_journeys(solution: Solution, j_1_idx: int, j_2_idx: int) -> Solution:
+    """
+    Swaps the deficit depots of two journeys of a Solution, splitting the longer journey
+    so the swapped journeys are the same size. The same move as gen_neighbour
+
+    params
+        solution - The current solution from the SA algorithm
+        j_1_idx - The index of the first journey
+        j_2_idx - The index of the second journey
+
+    returns
+        The neighbouring Solution, leaving the current solution unchanged
+    """
+    neighbour = solution.copy()
+    from_1, to_1, s_1 = neighbour[j_1_idx]
+    from_2, to_2, s_2 = neighbour[j_2_idx]
+
+    # Split the longer journey into one of the length of the shorter journey and the remainder
+    if s_1 > s_2:
+        neighbour.append(from_1, to_1, s_1 - s_2)
+        s_1 = s_2
+    elif s_2 > s_1:
+        neighbour.append(from_2, to_2, s_2 - s_1)
+        s_2 = s_1
+
+    # Swap the deficit nodes of the two journeys of the same length
+    neighbour.set_journey(j_1_idx, from_1, to_2, s_1)
+    neighbour.set_journey(j_2_idx, from_2, to_1, s_2)
+    return neighbour
+
+
+def gen_solution_neighbour(solution: Solution, candidates: np.ndarray = None) -> Solution:
+    """
+    Generates a random neighbour to a Solution by swapping the deficit depots of two journeys
+
+    params
+        solution - The current solution from the SA algorithm
+        candidates - Lists of the deficit depots each surplus depot may move to (default=None, any swap)
+
+    returns
+        A randomly generated neighbouring Solution
+    """
+    j_1_idx, j_2_idx = pick_journeys(solution=solution, candidates=candidates)
+    return swap_journeys(solution=solution, j_1_idx=j_1_idx, j_2_idx=j_2_idx)
+
+
+def edge_flows(solution: Solution) -> Dict[Tuple[int, int], int]:
+    """
+    Totals the quantity moved along each (from, to) edge of a Solution
+
+    params
+        solution - The Solution
+
+    returns
+        Dictionary of (from, to): total quantity moved
+    """
+    flows = {}
+    for from_dep, to_dep, s in solution:
+        flows[(from_dep, to_dep)] = flows.get((from_dep, to_dep), 0) + s
+    return flows
+
+
+def swap_changes(solution: Solution, j_1_idx: int, j_2_idx: int) -> Dict[Tuple[int, int], int]:
+    """
+    Calculates how swap_journeys changes the quantity moved along each edge
+
+    returns
+        Dictionary of (from, to): change in quantity moved for the four edges the swap touches
+    """
+    return journey_swap_changes(journey_1=solution[j_1_idx], journey_2=solution[j_2_idx])
+
+
+def journey_swap_changes(journey_1: Tuple[int, int, int],
+                         journey_2: Tuple[int, int, int]) -> Dict[Tuple[int, int], int]:
+    """
+    Calculates how swapping the deficit depots of two journeys changes the quantity moved along each edge.
+    The quantity of the shorter journey moves from each journey's edge to the swapped edge
+
+    params
+        journey_1 - The first journey as (from, to, s)
+        journey_2 - The second journey as (from, to, s)
+
+    returns
+        Dictionary of (from, to): change in quantity moved for the four edges the swap touches
+    """
+    from_1, to_1, s_1 = journey_1
+    from_2, to_2, s_2 = journey_2
+    moved = min(s_1, s_2)
+    return {(from_1, to_1): -moved, (from_1, to_2): moved, (from_2, to_2): -moved, (from_2, to_1): moved}
+
+
+def flow_cost_delta(flows: Dict[Tuple[int, int], int], changes: Dict[Tuple[int, int], int],
+                    model: Dict[int, Depot], max_journey_size: int) -> float:
+    """
+    Calculates the change in fitness of a compressed solution when the flows of some edges change.
+    A compressed edge moving a total of f is made of ceil(f / max_journey_size) journeys,
+    so only the edges that change are needed, in O(1) time for a swap
+
+    params
+        flows - The total quantity moved along each edge of the current solution, from edge_flows
+        changes - The change in quantity moved along each changed edge
+        model - The model the solution is for
+        max_journey_size - The maximum size of a journey
+
+    returns
+        The change in fitness (energy)
+    """
+    delta = 0
+    for edge, change in changes.items():
+        old_flow = flows.get(edge, 0)
+        new_flow = old_flow + change
+        # Change in the number of journeys along the edge
+        journeys = -(-new_flow // max_journey_size) - -(-old_flow // max_journey_size)
+        if journeys != 0:
+            delta += journeys * edge_distance(model=model, from_dep=edge[0], to_dep=edge[1])
+    return delta
+
+
+def gen_neighbour(path, candidates: np.ndarray = None) -> List[Dict[str, int]]:
     """
     Generates a random neighbour to a path by swapping two cities in a journey
 
     params
-        path - The current path from the SA algorithm in form [{from ,to, s}]
+        path - The current path from the SA algorithm in form [{from ,to, s}], or a Solution
+        candidates - Lists of the deficit depots each surplus depot may move to. If given, swaps that
+                     only create journeys to candidates are preferred (default=None, any swap)
 
     returns
-        A randomly generated neighbouring path
+        A randomly generated neighbouring path, of the same type as the path passed in
     """
+    if isinstance(path, Solution):
+        return gen_solution_neighbour(solution=path, candidates=candidates)
+
     # Pick two different journeys in the path, making sure surplus and deficit nodes are different
     # As if either were the same change won't affect the fitness
     # Store the indexes of the two selected
     j_1_idx = 0
     j_2_idx = 0
 
+    # Restrict the swap to the candidate lists if a pair of journeys can be found
+    if candidates is not None:
+        picked = pick_candidate_journeys(path=path, candidates=candidates)
+        if picked is not None:
+            j_1_idx, j_2_idx = picked
+
     while (path[j_1_idx]['from'] == path[j_2_idx]['from']) or (path[j_1_idx]['to'] == path[j_2_idx]['to']):
         # Calculate two random indexes in the path
         j_1_idx, j_2_idx = random.sample(range(len(path)), k=2)
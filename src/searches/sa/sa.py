@@ -4,10 +4,12 @@ Performs the simulated annealing algorithm
 import random
 import math
 from typing import Dict, List, Tuple
-from searches.random_search import random_search
+import numpy as np
+from searches.random_search import random_solution
 from TNRP_model.depot import Depot
 from searches.utils import fitness
-from searches.sa.neighbourhood import gen_neighbour, compress_neighbour
+from searches.sa.neighbourhood import compress_neighbour
+from searches.sa.edge_solution import EdgeSolution
 
 
 def accept(delta_e: int, t: float):
@@ -33,9 +35,12 @@ def accept(delta_e: int, t: float):
 
 
 def sa(start_temp: int, n: int, cool_r: float, max_journey_size: int,
-       model: Dict[int, Depot]) -> Tuple[List[int], List[Dict[str, int]]]:
+       model: Dict[int, Depot], candidates: np.ndarray = None,
+       verify_every=1000) -> Tuple[List[int], List[Dict[str, int]]]:
     """
-    Performs the Simulated annealing algorithm on the TNRP
+    Performs the Simulated annealing algorithm on the TNRP.
+    The energy of each neighbour is calculated from the change to the few edges the move touches.
+    Moves are made in place on a solution indexed by edge and undone if they are rejected
 
     params 
         start_temp - The initial temperature of the algorithm
@@ -43,6 +48,10 @@ def sa(start_temp: int, n: int, cool_r: float, max_journey_size: int,
         cool_r - The value, multiplied by the temperature after each algorithm iteration
         max_journey_size - The maximum journey size
         model - The initial state of the model
+        candidates - Lists of the deficit depots each surplus depot may move to, such as the
+                     neighbours of a sparse TNRPModel (default=None, any deficit depot)
+        verify_every - The number of iterations between full fitness calculations of the current
+                       solution, which check the energy and remove floating point drift (default=1000)
 
     returns
         The final solution
@@ -66,51 +75,60 @@ def sa(start_temp: int, n: int, cool_r: float, max_journey_size: int,
     # Set current temperature to the start temperature
     temp = start_temp
 
-    # Generate a current solution using random search
-    cur_solution = random_search(
-        model=model, max_journey_size=max_journey_size)
+    # Generate a current solution using random search, compressed so its energy is the sum
+    # of ceil(flow / max_journey_size) * distance over its edges
+    cur_solution = compress_neighbour(
+        path=random_solution(model=model, max_journey_size=max_journey_size, candidates=candidates),
+        max_journey_size=max_journey_size)
 
     # Calculate the fitness (energy) of the current solution
     cur_e = fitness(path=cur_solution, model=model)
 
+    # Index the solution by edge so moves are made in place
+    cur_solution = EdgeSolution(solution=cur_solution, model=model, max_journey_size=max_journey_size)
+    cur_solution.energy = cur_e
+
     # Store the energies from all fitness calculations and add the first energy value
     energies = []
     energies.append(cur_e)
 
-    # Store the best solution so far
-    best_solution = cur_solution
+    # Store the best energy so far, the solution marks its best state
     best_e = cur_e
+    cur_solution.mark_best()
 
     # For n-1 fitness calculations (one calculation to generate initial solution)
-    for _ in range(n-1):
-        # Generate a random neighbour to the current solution
-        neighbour = gen_neighbour(path=cur_solution)
-
-        # Compress the neighbour to ensure best fitness
-        neighbour = compress_neighbour(
-            path=neighbour, max_journey_size=max_journey_size)
-
-        # Calculate the energy of the new solution
-        new_e = fitness(path=neighbour, model=model)
+    for i in range(1, n):
+        # Pick the two journeys of a random neighbour to the current solution
+        slot_1, slot_2 = cur_solution.pick_swap(candidates=candidates)
 
-        # Calculate if new solution is better
-        delta_e = new_e - cur_e
+        # Make the swap in place, calculating the change in energy from the edges it changes
+        delta_e = cur_solution.apply_swap(slot_1=slot_1, slot_2=slot_2)
 
         # See whether to accept the new solution
         if accept(delta_e=delta_e, t=temp):  # If it is accepted
-            # update the current solution and its energy
-            cur_solution = neighbour
-            cur_e = new_e
+            # Keep the move
+            cur_solution.commit()
 
             # Check if new best solution
-            if new_e < best_e:
-                best_solution = cur_solution
-                best_e = cur_e
+            if cur_solution.energy < best_e:
+                best_e = cur_solution.energy
+                cur_solution.mark_best()
+        else:
+            # Roll back the move
+            cur_solution.undo()
+
+        # Periodically recalculate the full energy of the current solution
+        if i % verify_every == 0:
+            full_e = fitness(path=cur_solution.to_solution(), model=model)
+            if not math.isclose(full_e, cur_solution.energy, rel_tol=1e-6, abs_tol=1e-6):
+                raise RuntimeError(f"SA energy {cur_solution.energy} does not match the fitness "
+                                   f"{full_e} of the current solution")
+            cur_solution.energy = full_e
 
         # Add the energy of the current solution to all energies
-        energies.append(cur_e)
+        energies.append(cur_solution.energy)
 
         # Decrease the temperature of the algorithm by multiplying by cooling rate
         temp *= cool_r
 
-    return energies, best_solution
+    return energies, cur_solution.best_solution().to_dicts()
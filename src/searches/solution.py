@@ -0,0 +1,257 @@
+"""
+The structure-of-arrays solution representation shared by all of the searches
+"""
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+
+
+class Solution:
+    """
+    A path of journeys stored as three int32 arrays of the depots each journey is from,
+    the depots each journey is to and the quantity (s) moved by each journey.
+
+    Journeys are appended in amortised O(1) time by doubling the capacity of the arrays.
+    Views of the legacy formats ([{from, to, s}] and [(from, to, s)]) can be taken without copying
+    """
+
+    def __init__(self, capacity=16) -> None:
+        """
+        Create an empty solution
+
+        params
+            capacity - The number of journeys that can be added before the arrays grow (default=16)
+        """
+        # Rows are from, to and s so each is a contiguous array
+        self._data = np.empty((3, max(capacity, 1)), dtype=np.int32)
+        self.length = 0
+
+    @classmethod
+    def from_arrays(cls, froms: np.ndarray, tos: np.ndarray, s: np.ndarray) -> 'Solution':
+        """
+        Creates a solution from arrays of the journeys' from depots, to depots and quantities
+
+        returns
+            The solution
+        """
+        solution = cls(capacity=len(froms))
+        solution.extend(froms=froms, tos=tos, s=s)
+        return solution
+
+    @classmethod
+    def from_dicts(cls, path: List[Dict[str, int]]) -> 'Solution':
+        """
+        Creates a solution from a path of form [{from, to, s}]
+
+        returns
+            The solution
+        """
+        solution = cls(capacity=len(path))
+        solution.length = len(path)
+        solution._data[:, :len(path)] = [[j['from'] for j in path], [j['to'] for j in path],
+                                         [j['s'] for j in path]]
+        return solution
+
+    @classmethod
+    def from_tuples(cls, path: List[Tuple[int, int, int]]) -> 'Solution':
+        """
+        Creates a solution from a chromosome of form [(from, to, s)]
+
+        returns
+            The solution
+        """
+        solution = cls(capacity=len(path))
+        solution.length = len(path)
+        if len(path) > 0:
+            solution._data[:, :len(path)] = np.array(path, dtype=np.int32).T
+        return solution
+
+    @property
+    def froms(self) -> np.ndarray:
+        """The depots each journey is from"""
+        return self._data[0, :self.length]
+
+    @property
+    def tos(self) -> np.ndarray:
+        """The depots each journey is to"""
+        return self._data[1, :self.length]
+
+    @property
+    def s(self) -> np.ndarray:
+        """The quantity moved by each journey"""
+        return self._data[2, :self.length]
+
+    def _reserve(self, size: int):
+        """Doubles the capacity of the arrays until size journeys fit"""
+        capacity = self._data.shape[1]
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        data = np.empty((3, capacity), dtype=np.int32)
+        data[:, :self.length] = self._data[:, :self.length]
+        self._data = data
+
+    def append(self, from_dep: int, to_dep: int, s: int):
+        """
+        Adds a journey to the end of the solution
+
+        params
+            from_dep - The depot the journey is from
+            to_dep - The depot the journey is to
+            s - The quantity moved
+        """
+        if self.length == self._data.shape[1]:
+            self._reserve(self.length + 1)
+        data = self._data
+        data[0, self.length] = from_dep
+        data[1, self.length] = to_dep
+        data[2, self.length] = s
+        self.length += 1
+
+    def extend(self, froms: np.ndarray, tos: np.ndarray, s: np.ndarray):
+        """
+        Adds many journeys to the end of the solution
+
+        params
+            froms - The depots the journeys are from
+            tos - The depots the journeys are to
+            s - The quantities moved
+        """
+        size = self.length + len(froms)
+        self._reserve(size)
+        self._data[0, self.length:size] = froms
+        self._data[1, self.length:size] = tos
+        self._data[2, self.length:size] = s
+        self.length = size
+
+    def set_journey(self, idx: int, from_dep: int, to_dep: int, s: int):
+        """
+        Replaces the journey at position idx
+        """
+        self._data[:, idx] = (from_dep, to_dep, s)
+
+    def remove(self, idx: int):
+        """
+        Removes the journey at position idx in O(1) time by moving the last journey into its place.
+        The order of the journeys is not kept
+        """
+        self.length -= 1
+        self._data[:, idx] = self._data[:, self.length]
+
+    def copy(self) -> 'Solution':
+        """
+        returns
+            A copy of the solution
+        """
+        solution = Solution(capacity=self.length)
+        solution._data[:, :self.length] = self._data[:, :self.length]
+        solution.length = self.length
+        return solution
+
+    def as_dicts(self) -> 'JourneyDicts':
+        """
+        returns
+            A view of the solution as a sequence of {from, to, s} dictionaries
+        """
+        return JourneyDicts(solution=self)
+
+    def as_tuples(self) -> 'JourneyTuples':
+        """
+        returns
+            A view of the solution as a sequence of (from, to, s) tuples
+        """
+        return JourneyTuples(solution=self)
+
+    def to_dicts(self) -> List[Dict[str, int]]:
+        """
+        returns
+            The solution as a path of form [{from, to, s}]
+        """
+        return [{'from': f, 'to': t, 's': s} for f, t, s in zip(*self._data[:, :self.length].tolist())]
+
+    def to_tuples(self) -> List[Tuple[int, int, int]]:
+        """
+        returns
+            The solution as a chromosome of form [(from, to, s)]
+        """
+        return list(zip(*self._data[:, :self.length].tolist()))
+
+    def __len__(self) -> int:
+        """The number of journeys in the solution"""
+        return self.length
+
+    def __getitem__(self, idx: int) -> Tuple[int, int, int]:
+        """The journey at position idx as a (from, to, s) tuple"""
+        if idx < 0:
+            idx += self.length
+        if not 0 <= idx < self.length:
+            raise IndexError(idx)
+        return tuple(self._data[:, idx].tolist())
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        """Iterate over the journeys as (from, to, s) tuples"""
+        return iter(self.to_tuples())
+
+    def __eq__(self, other: object) -> bool:
+        """Solutions are equal if they have the same journeys in the same order"""
+        if not isinstance(other, Solution):
+            return NotImplemented
+        return self.length == other.length and np.array_equal(
+            self._data[:, :self.length], other._data[:, :other.length])
+
+    def __repr__(self) -> str:
+        """Solution to string method for debugging"""
+        return f'Solution({self.to_tuples()})'
+
+
+class JourneyDicts(Sequence):
+    """
+    A read-only view of a solution as a sequence of {from, to, s} dictionaries.
+    Each dictionary is created when it is accessed
+    """
+
+    def __init__(self, solution: Solution) -> None:
+        self.solution = solution
+
+    def __getitem__(self, idx: int) -> Dict[str, int]:
+        from_dep, to_dep, s = self.solution[idx]
+        return {'from': from_dep, 'to': to_dep, 's': s}
+
+    def __len__(self) -> int:
+        return len(self.solution)
+
+
+class JourneyTuples(Sequence):
+    """
+    A read-only view of a solution as a sequence of (from, to, s) tuples.
+    Each tuple is created when it is accessed
+    """
+
+    def __init__(self, solution: Solution) -> None:
+        self.solution = solution
+
+    def __getitem__(self, idx: int) -> Tuple[int, int, int]:
+        return self.solution[idx]
+
+    def __len__(self) -> int:
+        return len(self.solution)
+
+
+def as_solution(path) -> Solution:
+    """
+    Converts a path in any of the formats used in the project into a Solution
+
+    params
+        path - A Solution, a path of form [{from, to, s}] or a chromosome of form [(from, to, s)]
+
+    returns
+        The path as a Solution (the same object if it already was one)
+    """
+    if isinstance(path, Solution):
+        return path
+    if isinstance(path, JourneyDicts) or isinstance(path, JourneyTuples):
+        return path.solution
+    if len(path) > 0 and isinstance(path[0], dict):
+        return Solution.from_dicts(path=path)
+    return Solution.from_tuples(path=path)
@@ -1,9 +1,12 @@
 """
 General utilities for use throughout the project
 """
-from typing import Dict, List
-import copy
+from typing import Dict, List, Tuple
+import numpy as np
 from TNRP_model.depot import Depot
+from TNRP_model.array_model import TNRPModel
+from TNRP_model.supply_state import SupplyState
+from searches.solution import Solution
 
 
 def fitness(path: List[Dict[str, int]], model: Dict[int, Depot]) -> int:
@@ -11,12 +14,26 @@ def fitness(path: List[Dict[str, int]], model: Dict[int, Depot]) -> int:
     Function for calculating fitness (distance) of a solution
 
     params:
-        path - List of {from, to, s} dictionaries
+        path - List of {from, to, s} dictionaries, or a Solution
         model - The depots in the solution
 
     returns
         Total distance of the solution
     """
+    if isinstance(path, Solution):
+        # An array-backed model can look up every journey in its distance matrix at once
+        if isinstance(model, TNRPModel):
+            return float(model.distances(froms=path.froms, tos=path.tos).sum())
+        # Otherwise look up each journey's distance in the connections of its surplus depot
+        return sum(model[f].get_connections()[t]
+                   for f, t in zip(path.froms.tolist(), path.tos.tolist()))
+
+    # An array-backed model can look up every journey in its distance matrix at once
+    if isinstance(model, TNRPModel):
+        froms = [j['from'] for j in path]
+        tos = [j['to'] for j in path]
+        return float(model.distances(froms=froms, tos=tos).sum())
+
     # Counter for total distance
     total_dist = 0
 
@@ -34,6 +51,85 @@ def fitness(path: List[Dict[str, int]], model: Dict[int, Depot]) -> int:
     return total_dist
 
 
+def edge_distance(model: Dict[int, Depot], from_dep: int, to_dep: int) -> float:
+    """
+    Getter for the distance of one edge of a model
+
+    params
+        model - The depots in the model
+        from_dep - The depot the edge is from
+        to_dep - The depot the edge is to
+
+    returns
+        The distance between the depots
+    """
+    if isinstance(model, TNRPModel):
+        return model.distance(from_dep, to_dep)
+    return model[from_dep].get_connections()[to_dep]
+
+
+def pack_solutions(solutions: List[Solution]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Concatenates many solutions into ragged arrays for fitness_batch
+
+    params
+        solutions - The Solutions to pack
+
+    returns
+        Tuple of the from depots and to depots of every journey, and the offsets where each solution
+        starts in them, with a final offset of the total number of journeys
+    """
+    offsets = np.zeros(len(solutions) + 1, dtype=np.int64)
+    np.cumsum([len(solution) for solution in solutions], out=offsets[1:])
+    if len(solutions) == 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), offsets
+    froms = np.concatenate([solution.froms for solution in solutions])
+    tos = np.concatenate([solution.tos for solution in solutions])
+    return froms, tos, offsets
+
+
+def fitness_batch(froms: np.ndarray, tos: np.ndarray, model: Dict[int, Depot],
+                  offsets: np.ndarray = None) -> np.ndarray:
+    """
+    Calculates the fitness (distance) of many solutions at once, using one gather over the distances
+
+    params:
+        froms - The from depot of every journey, either as a (solutions x journeys) array padded with -1,
+                or as one ragged array of every solution's journeys with offsets
+        tos - The to depot of every journey, in the same form as froms
+        model - The depots in the solutions
+        offsets - The position each solution starts in the ragged arrays, with a final offset of the
+                  total number of journeys, as returned by pack_solutions (default=None, padded arrays)
+
+    returns
+        Array of the total distance of each solution
+    """
+    froms = np.asarray(froms)
+    tos = np.asarray(tos)
+
+    # Padded arrays are flattened, leaving out the padding and recording the solution of each journey
+    if offsets is None:
+        valid = froms >= 0
+        num_solutions = froms.shape[0]
+        solution_ids = np.nonzero(valid)[0]
+        froms = froms[valid]
+        tos = tos[valid]
+    else:
+        offsets = np.asarray(offsets)
+        num_solutions = len(offsets) - 1
+        solution_ids = np.repeat(np.arange(num_solutions), np.diff(offsets))
+
+    # Look up the distance of every journey at once
+    if isinstance(model, TNRPModel):
+        dists = model.distances(froms=froms, tos=tos)
+    else:
+        dists = np.array([model[f].get_connections()[t] for f, t in zip(froms.tolist(), tos.tolist())],
+                         dtype=np.float64)
+
+    # Sum the distances of the journeys of each solution
+    return np.bincount(solution_ids, weights=dists, minlength=num_solutions)
+
+
 def is_resolved(model: Dict[int, Depot]) -> bool:
     """
     Returns whether or not a model is in equilibrium
@@ -44,6 +140,10 @@ def is_resolved(model: Dict[int, Depot]) -> bool:
     Returns
         Boolean value representing whether model is in equilibrium
     """
+    # An array-backed model can check all of its supply values at once
+    if isinstance(model, TNRPModel):
+        return not model.s.any()
+
     # If any of the depots are not in equilibrium, return false
     for dep in model:
         if model[dep].get_s() != 0:
@@ -52,13 +152,44 @@ def is_resolved(model: Dict[int, Depot]) -> bool:
     return True
 
 
+def perform_move(sur_dep: Depot, def_dep: Depot, max_journey_size: int) -> Tuple[int, List[int]]:
+    """
+    Moves the maximum quantity from a surplus depot to a deficit depot, without creating a journey object
+
+    params
+        sur_dep - The surplus depot
+        def_dep - The deficit depot
+        max_journey_size - The maximum size of journey allowed
+
+    returns
+        Tuple of the quantity moved and List of any depots that have reached equilibrium as a result
+    """
+    # Calculate the move size as the minimum to either resolve a depot or reach the max journey size
+    move_size = min(sur_dep.get_s(), abs(def_dep.get_s()), max_journey_size)
+
+    # Update the depot objects for the movement
+    Depot.move_s(start=sur_dep, end=def_dep, s=move_size)
+
+    # Check if any of the depots have reached equilibrium
+    equilibrium_deps = []
+    if sur_dep.get_s() == 0:
+        equilibrium_deps.append(sur_dep.get_name())
+
+    if def_dep.get_s() == 0:
+        equilibrium_deps.append(def_dep.get_name())
+
+    return move_size, equilibrium_deps
+
+
 def apply_path(path: List[Dict[str, int]], model: Dict[int, Depot]):
     """
     Applies a list of journeys to a model to get a new model state
     params
-        path - A list of dictionaries of {from, to, s} to apply to the model
+        path - A list of dictionaries of {from, to, s}, or a Solution, to apply to the model
         model - A list of depots in original state
     """
+    if isinstance(path, Solution):
+        path = path.as_dicts()
     # For every journey
     for journey in path:
         # Get the depot objects the journey is going from and to
@@ -73,15 +204,19 @@ def is_complete(path: List[Dict[str, int]], original_model_state: Dict[int, Depo
     Checks whether a path leads to a model being in equilibrium
 
     params
-        path - The path applied to the model
+        path - The path applied to the model, as a list of {from, to, s} or a Solution
         original_model_state - The original state of the model the journeys are applied to
 
     returns
         Boolean of whether the model is in equilibrium after the journeys are applied
     """
-    # Apply the journey to the model
-    model_copy = copy.deepcopy(original_model_state)
-    apply_path(path=path, model=model_copy)
+    # Apply the journeys to a supply state, leaving the original model unchanged
+    state = SupplyState(model=original_model_state)
+    if isinstance(path, Solution):
+        state.apply_journeys(froms=path.froms, tos=path.tos, s=path.s)
+    else:
+        state.apply_journeys(froms=[j['from'] for j in path], tos=[j['to'] for j in path],
+                             s=[j['s'] for j in path])
 
     # Check whether model is in equilibrium
-    return is_resolved(model=model_copy)
+    return state.is_resolved()
@@ -0,0 +1,122 @@
+"""
+Tests for the array-backed TNRP model
+"""
+import unittest
+import copy
+from math import sqrt
+from TNRP_model.array_model import TNRPModel
+from TNRP_model.depot import Depot
+from searches.utils import fitness
+
+
+class TestArrayModelClass(unittest.TestCase):
+    """
+    Tests the TNRPModel class and its Depot adapter
+    """
+
+    def setUp(self):
+        """Create a 3 depot model"""
+        self.model = TNRPModel(x=[0, 3, 5], y=[0, 4, 12], s=[-5, -5, 10])
+
+    def test_depot_api(self):
+        """
+        Tests the depots of the model can be used as Depot objects
+        """
+        dep = self.model[1]
+        self.assertIsInstance(dep, Depot)
+        self.assertEqual(1, dep.get_name())
+        self.assertEqual(-5, dep.get_s())
+        self.assertEqual(3, dep.get_long())
+        self.assertEqual(4, dep.get_lat())
+        self.assertEqual(5, dep.get_connections()[0])
+        self.assertEqual(sqrt(68), dep.get_connections()[2])
+        self.assertEqual('Depot 1, (x,y): (3,4), S: -5', str(dep))
+
+    def test_supply_moved_in_arrays(self):
+        """
+        Tests that moving supply between depots updates the model's supply array
+        """
+        Depot.move_s(start=self.model[2], end=self.model[0], s=5)
+        self.assertEqual([0, -5, 5], self.model.s.tolist())
+        self.assertEqual(0, self.model[0].get_s())
+
+    def test_behaves_as_dictionary(self):
+        """
+        Tests the model can be used in place of a dictionary of depot name: Depot object
+        """
+        self.assertEqual(3, len(self.model))
+        self.assertEqual([0, 1, 2], list(self.model))
+        self.assertIn(2, self.model)
+        self.assertNotIn(3, self.model)
+        with self.assertRaises(KeyError):
+            _ = self.model[3]
+        surplus = {dep: self.model[dep]
+                   for dep in self.model if self.model[dep].get_s() > 0}
+        self.assertEqual([2], list(surplus))
+
+    def test_deepcopy_shares_distances(self):
+        """
+        Tests a copy of the model has its own supply values but shares the distance matrix
+        """
+        model_copy = copy.deepcopy(self.model)
+        model_copy[0].add_s(5)
+
+        self.assertEqual(-5, self.model[0].get_s())
+        self.assertEqual(0, model_copy[0].get_s())
+        self.assertIs(self.model.dist, model_copy.dist)
+
+    def test_from_depots(self):
+        """
+        Tests a dictionary of Depot objects is converted to an equivalent model
+        """
+        dep0 = Depot(name=0, s=-5, x=0, y=0)
+        dep1 = Depot(name=1, s=5, x=3, y=4)
+        model = TNRPModel.from_depots({0: dep0, 1: dep1})
+
+        self.assertEqual([-5, 5], model.s.tolist())
+        self.assertEqual(5, model.distance(0, 1))
+
+    def test_fitness_uses_distance_matrix(self):
+        """
+        Tests the fitness of a path on the array-backed model
+        """
+        path = [
+            {'from': 2, 'to': 0, 's': 5},  # dist 13
+            {'from': 2, 'to': 1, 's': 5}  # dist sqrt(68)
+        ]
+        self.assertAlmostEqual(13 + sqrt(68), fitness(path=path, model=self.model))
+
+    def test_sparse_model(self):
+        """
+        Tests a sparse model keeps neighbour lists and calculates distances when needed
+        """
+        model = TNRPModel(x=[0, 3, 5], y=[0, 4, 12], s=[-5, -5, 10], k_nearest=1)
+
+        self.assertTrue(model.is_sparse())
+        with self.assertRaises(ValueError):
+            _ = model.dist
+
+        # The surplus depot's nearest deficit depot is depot 1
+        self.assertEqual([[2], [2], [1]], model.neighbours.tolist())
+        self.assertEqual(13, model[0].get_connections()[2])
+        self.assertEqual([5, 13], model.distances(froms=[1, 2], tos=[0, 0]).tolist())
+
+        path = [{'from': 2, 'to': 0, 's': 5}, {'from': 2, 'to': 1, 's': 5}]
+        self.assertAlmostEqual(13 + sqrt(68), fitness(path=path, model=model))
+
+    def test_neighbours_use_initial_supply(self):
+        """
+        Tests the neighbour lists are calculated from the initial supply values, even if the supply values
+        are changed before the lists are first read
+        """
+        model = TNRPModel(x=[0, 3, 5], y=[0, 4, 12], s=[-5, -5, 10], k_nearest=1)
+        unchanged = copy.deepcopy(model)
+
+        # Resolve the surplus depot and one deficit depot before reading the neighbours
+        model[2].s = 0
+        model[0].s = 0
+
+        self.assertEqual([[2], [2], [1]], model.neighbours.tolist())
+        self.assertEqual(TNRPModel(x=[0, 3, 5], y=[0, 4, 12], s=[-5, -5, 10], k_nearest=1).neighbours.tolist(),
+                         model.neighbours.tolist())
+        self.assertEqual(model.neighbours.tolist(), unchanged.neighbours.tolist())
@@ -0,0 +1,81 @@
+"""
+Tests for reading and writing TNRP instance files
+"""
+import unittest
+import os
+import tempfile
+import numpy as np
+from TNRP_model.instance_io import read_text_model, write_binary_model, load_binary_model, \
+    load_heur_matrix, read_binary_arrays, convert_text_models
+from TNRP_model.tnrp_model import write_generated_model
+from searches.aco.create_matrices import create_dist_matrix, create_heur_matrix
+
+
+class TestInstanceIOClass(unittest.TestCase):
+    """
+    Tests the text and binary TNRP file formats
+    """
+
+    def setUp(self):
+        """Create a temporary directory containing a text TNRP"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.text_path = os.path.join(self.directory.name, '30.txt')
+        write_generated_model(filepath=self.text_path, n=30,
+                              rng=np.random.default_rng(0))
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.directory.cleanup()
+
+    def test_binary_round_trip(self):
+        """
+        Tests a model written to a binary file is loaded with the same values and matrices
+        """
+        model = read_text_model(filepath=self.text_path)
+        binary_path = os.path.join(self.directory.name, '30.tnrp')
+        write_binary_model(filepath=binary_path, model=model, block_size=7)
+
+        loaded = load_binary_model(filepath=binary_path)
+        self.assertEqual(model.x.tolist(), loaded.x.tolist())
+        self.assertEqual(model.y.tolist(), loaded.y.tolist())
+        self.assertEqual(model.s.tolist(), loaded.s.tolist())
+
+        # Check the distance and heuristic matrices are memory-mapped and match calculated ones
+        self.assertIsInstance(loaded.dist, np.memmap)
+        self.assertTrue(np.array_equal(model.dist, loaded.dist))
+        heur = load_heur_matrix(filepath=binary_path)
+        self.assertTrue(np.array_equal(
+            create_heur_matrix(dist_matrix=create_dist_matrix(model=model)), heur))
+
+    def test_loaded_supply_values_can_change(self):
+        """
+        Tests the supply values of a loaded model can be changed without changing the file
+        """
+        binary_path = os.path.join(self.directory.name, '30.tnrp')
+        write_binary_model(filepath=binary_path, model=read_text_model(filepath=self.text_path),
+                           store_dist=False, store_heur=False)
+
+        loaded = load_binary_model(filepath=binary_path)
+        original_s = loaded[0].get_s()
+        loaded[0].add_s(1)
+
+        self.assertEqual(original_s, load_binary_model(filepath=binary_path)[0].get_s())
+        self.assertIsNone(load_heur_matrix(filepath=binary_path))
+        self.assertNotIn('dist', read_binary_arrays(filepath=binary_path))
+
+    def test_convert_text_models(self):
+        """
+        Tests every text TNRP in a directory is converted to a binary file
+        """
+        convert_text_models(directory=self.directory.name, store_heur=False)
+        binary_path = os.path.join(self.directory.name, '30.tnrp')
+        self.assertTrue(os.path.exists(binary_path))
+        self.assertEqual(read_text_model(filepath=self.text_path).s.tolist(),
+                         load_binary_model(filepath=binary_path).s.tolist())
+
+    def test_not_binary_file(self):
+        """
+        Tests an error is raised when a text file is loaded as a binary file
+        """
+        with self.assertRaises(ValueError):
+            load_binary_model(filepath=self.text_path)
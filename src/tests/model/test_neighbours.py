@@ -0,0 +1,43 @@
+"""
+Tests for the nearest opposite-sign depot lists
+"""
+import unittest
+import numpy as np
+from TNRP_model.neighbours import nearest_opposite
+from TNRP_model.tnrp_model import generate_model
+
+
+class TestNeighboursClass(unittest.TestCase):
+    """
+    Tests the grid search for the nearest opposite-sign depots
+    """
+
+    def test_matches_brute_force(self):
+        """
+        Tests the grid search finds the same nearest depots as checking every distance
+        """
+        for n, k in [(10, 3), (200, 5), (500, 20)]:
+            model = generate_model(n=n, rng=np.random.default_rng(n))
+            neighbours, dists = nearest_opposite(x=model.x, y=model.y, s=model.s, k=k)
+
+            for i in range(n):
+                # Calculate the distances to every opposite-sign depot
+                opposite = np.flatnonzero(model.s * np.sign(model.s[i]) < 0)
+                expected = np.sort(model.dist[i, opposite])[:k]
+                found = min(k, len(opposite))
+
+                self.assertTrue(np.allclose(expected, dists[i, :found]))
+                self.assertTrue(np.allclose(model.dist[i, neighbours[i, :found]],
+                                            dists[i, :found]))
+                # Check the neighbours are all of the opposite sign
+                self.assertTrue((model.s[neighbours[i, :found]] * model.s[i] < 0).all())
+
+    def test_padded_when_too_few_depots(self):
+        """
+        Tests rows are padded when there are fewer than k opposite-sign depots
+        """
+        neighbours, dists = nearest_opposite(x=[0, 1, 5], y=[0, 0, 0], s=[2, 3, -5], k=2)
+
+        self.assertEqual([2, -1], neighbours[0].tolist())
+        self.assertEqual([1, 0], neighbours[2].tolist())
+        self.assertEqual(np.inf, dists[1, 1])
@@ -0,0 +1,72 @@
+"""
+Tests for the supply state used in place of copies of the model
+"""
+import unittest
+from TNRP_model.supply_state import SupplyState
+from TNRP_model.array_model import TNRPModel
+from TNRP_model.depot import Depot
+from searches.random_search import random_search
+from searches.utils import is_complete
+
+
+class TestSupplyStateClass(unittest.TestCase):
+    """
+    Tests the SupplyState class
+    """
+
+    def setUp(self):
+        """Create a 3 depot model"""
+        self.model = TNRPModel(x=[0, 3, 5], y=[0, 4, 12], s=[-6, -4, 10])
+
+    def test_model_not_changed(self):
+        """
+        Tests moving supply in the state doesn't change the model it was created from
+        """
+        state = SupplyState(model=self.model)
+        Depot.move_s(start=state[2], end=state[0], s=6)
+
+        self.assertEqual(0, state[0].get_s())
+        self.assertEqual(4, state[2].get_s())
+        self.assertEqual([-6, -4, 10], self.model.s.tolist())
+
+    def test_reset_and_snapshot(self):
+        """
+        Tests the state can be reset to its initial values or to a snapshot
+        """
+        state = SupplyState(model=self.model)
+        state.move_s(start=2, end=0, s=6)
+        snapshot = state.snapshot()
+        state.move_s(start=2, end=1, s=4)
+        self.assertTrue(state.is_resolved())
+
+        state.reset(snapshot=snapshot)
+        self.assertEqual([0, -4, 4], state.s.tolist())
+
+        state.reset()
+        self.assertEqual([-6, -4, 10], state.s.tolist())
+
+    def test_dictionary_model(self):
+        """
+        Tests a state can be created over a dictionary of Depot objects
+        """
+        dep0 = Depot(name=0, s=-6, x=0, y=0)
+        dep2 = Depot(name=2, s=6, x=5, y=12)
+        dep0.add_connection(dep2)
+        state = SupplyState(model={0: dep0, 2: dep2})
+
+        self.assertEqual([0, 2], list(state))
+        self.assertNotIn(1, state)
+        self.assertEqual(13, state[0].get_connections()[2])
+        self.assertEqual([2], state.surplus_deps().tolist())
+        self.assertEqual([0], state.deficit_deps().tolist())
+
+    def test_random_search_on_state(self):
+        """
+        Tests a random search can be repeatedly performed on a reset state
+        """
+        state = SupplyState(model=self.model)
+        for _ in range(3):
+            state.reset()
+            path = random_search(model=state, max_journey_size=3)
+            self.assertTrue(state.is_resolved())
+            self.assertTrue(is_complete(path=path, original_model_state=self.model))
@@ -2,7 +2,11 @@
 Tests for TNRP model creation
 """
 import unittest
-from TNRP_model.tnrp_model import create_empty_matrix, create_locations, create_model, generate_s_vals
+import os
+import tempfile
+import numpy as np
+from TNRP_model.tnrp_model import create_empty_matrix, create_locations, create_model, generate_s_vals, \
+    sample_locations, sample_s_vals, generate_model, write_generated_model, chunk_sizes
 from TNRP_model.depot import Depot
 from math import sqrt
 
@@ -173,3 +177,99 @@ class TestModelCreationClass(unittest.TestCase):
 
                 # Check connection in 2nd of the pair
                 self.assertEqual(dist, connections_2[i])
+
+    def test_sample_locations(self):
+        """
+        Tests the vectorised sampling creates unique locations within the grid
+        """
+        n = 1000
+        alpha = 2
+        x, y = sample_locations(n=n, alpha=alpha, rng=np.random.default_rng(0))
+
+        # Check there are n unique locations
+        self.assertEqual(n, len(set(zip(x.tolist(), y.tolist()))))
+
+        # Check all locations are on the grid
+        self.assertTrue(((0 <= x) & (x < alpha * n)).all())
+        self.assertTrue(((0 <= y) & (y < alpha * n)).all())
+
+        # Check the same error is raised for alpha < 1
+        with self.assertRaises(ValueError):
+            sample_locations(n=n, alpha=0.9, rng=np.random.default_rng(0))
+
+    def test_sample_s_vals(self):
+        """
+        Tests the vectorised sampling of supply values returns valid supply values
+        """
+        rng = np.random.default_rng(0)
+        for n in [2, 3, 10, 10000]:
+            vals = sample_s_vals(n=n, max_def=-100, max_sur=100, rng=rng)
+
+            # Check there are n non-zero values between the bounds that sum to 0
+            self.assertEqual(n, len(vals))
+            self.assertTrue(((-100 <= vals) & (vals <= 100)).all())
+            self.assertTrue((vals != 0).all())
+            self.assertEqual(0, vals.sum())
+
+    def test_sample_s_vals_bounds(self):
+        """
+        Tests supply values are sampled for tight bounds, and an error is raised if they can not sum to 0
+        """
+        rng = np.random.default_rng(0)
+        # Even n with bounds of 1 and -1, and odd n with room for one depot to balance the others
+        for n, max_def, max_sur in [(4, -1, 1), (5, -1, 2), (5, -2, 1)]:
+            vals = sample_s_vals(n=n, max_def=max_def, max_sur=max_sur, rng=rng)
+            self.assertTrue(((max_def <= vals) & (vals <= max_sur)).all())
+            self.assertTrue((vals != 0).all())
+            self.assertEqual(0, vals.sum())
+
+        # Odd n with bounds of 1 and -1 can never sum to 0
+        with self.assertRaises(ValueError):
+            sample_s_vals(n=5, max_def=-1, max_sur=1, rng=rng)
+
+    def test_generate_model_is_seeded(self):
+        """
+        Tests models generated with the same seed are identical
+        """
+        model_1 = generate_model(n=50, rng=np.random.default_rng(42))
+        model_2 = generate_model(n=50, rng=np.random.default_rng(42))
+
+        self.assertEqual(model_1.x.tolist(), model_2.x.tolist())
+        self.assertEqual(model_1.y.tolist(), model_2.y.tolist())
+        self.assertEqual(model_1.s.tolist(), model_2.s.tolist())
+
+    def test_write_generated_model(self):
+        """
+        Tests a generated model is written to a text file in chunks
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'model.txt')
+            write_generated_model(filepath=filepath, n=25, rng=np.random.default_rng(0),
+                                  chunk_size=10)
+
+            with open(filepath, 'r') as f:
+                lines = f.readlines()
+
+        # Check every depot is written in order at a unique location and the supply values sum to 0
+        self.assertEqual(25, len(lines))
+        sum_s = 0
+        locations = set()
+        for i, line in enumerate(lines):
+            self.assertTrue(line.startswith(f'Depot {i}, (x,y): ('))
+            locations.add(line.split('(x,y): ')[1].split(', S:')[0])
+            s = int(line.split(' ')[-1])
+            self.assertNotEqual(0, s)
+            self.assertTrue(-100 <= s <= 100)
+            sum_s += s
+        self.assertEqual(25, len(locations))
+        self.assertEqual(0, sum_s)
+
+    def test_chunk_sizes(self):
+        """
+        Tests depots are split into chunks of at least 2 depots
+        """
+        self.assertEqual([10, 10, 5], chunk_sizes(n=25, chunk_size=10))
+        self.assertEqual([10, 11], chunk_sizes(n=21, chunk_size=10))
+        self.assertEqual([2, 3], chunk_sizes(n=5, chunk_size=1))
+        with self.assertRaises(ValueError):
+            chunk_sizes(n=1, chunk_size=10)
@@ -0,0 +1,140 @@
+"""
+Tests for the Ant Colony System
+"""
+import unittest
+import random
+from unittest import mock
+import numpy as np
+from searches.aco.create_matrices import create_dist_matrix, create_pher_matrix, create_heur_matrix, \
+    BipartiteIndex
+from searches.aco.ACS import ACS
+from searches.aco.colony import Colony
+from searches.aco.path_generation import generate_solution
+from searches.aco.pheromone import PheromoneMatrix
+from TNRP_model.depot import Depot
+from TNRP_model.tnrp_model import create_model
+from searches.utils import is_complete, fitness
+
+
+class TestACSClass(unittest.TestCase):
+    """
+    Class for the testing of the ACS algorithm
+    """
+
+    def test_greedy_transitions(self):
+        """
+        Tests a q0 of 1 always moves to the most attractive deficit depot
+        """
+        sur_deps = {0: Depot(name=0, s=10, x=0, y=0)}
+        def_deps = {1: Depot(name=1, s=-5, x=0, y=1), 2: Depot(name=2, s=-5, x=0, y=5)}
+        index = BipartiteIndex(sur_names=[0], def_names=[1, 2])
+        # The attractiveness of the surplus -> deficit edges
+        attractiveness = [[0.2, 0.9]]
+
+        for _ in range(10):
+            path = generate_solution(sur_deps=sur_deps, def_deps=def_deps, d=None, h=None, p=None,
+                                     max_journey_size=5, attractiveness=attractiveness, index=index, q0=1)
+            self.assertEqual([(0, 2, 5), (0, 1, 5)], path.to_tuples())
+
+    def test_greedy_path_is_argmax(self):
+        """
+        Tests every journey of an ant with a q0 of 1 is to the most attractive unresolved deficit depot
+        """
+        random.seed(5)
+        model = create_model(n=40, alpha=2)
+        d = create_dist_matrix(model=model)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+        h = create_heur_matrix(dist_matrix=d)
+        colony = Colony(model=model, d=d, p=p, h=h, max_journey_size=5)
+        # Random pheromone so the most attractive deficit depot is not always the nearest
+        random_p = np.random.default_rng(5).uniform(0.1, 1, size=colony.index.shape())
+        pheromone = PheromoneMatrix(p=random_p, h=colony.h, index=colony.index)
+
+        path = colony.construct_ant(pheromone=pheromone, q0=1)
+        self.assertTrue(is_complete(original_model_state=model, path=path.to_dicts()),
+                        "Path does not resolve the model")
+
+        # Replay the path, finding the most attractive unresolved deficit depot before each journey
+        def_s = {dep: model[dep].get_s() for dep in model if model[dep].get_s() < 0}
+        def_names = colony.index.def_names.tolist()
+        for from_dep, to_dep, s in path.to_tuples():
+            weights = np.where([def_s[dep] < 0 for dep in def_names],
+                               pheromone.attractiveness[colony.index.rows[from_dep]], -1)
+            self.assertEqual(def_names[int(np.argmax(weights))], to_dep)
+            def_s[to_dep] += s
+
+    def test_pheromone_updates(self):
+        """
+        Tests the edges used by each ant move towards tau0, and only the edges of the best path so far
+        move towards Q / its fitness after each population
+        """
+        random.seed(2)
+        model = create_model(n=30, alpha=2)
+        d = create_dist_matrix(model=model)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+        h = create_heur_matrix(dist_matrix=d)
+        m, e, Q, phi = 4, 0.3, 10, 0.2
+
+        # Record the pheromone before and after each update
+        updates = []
+        blend = PheromoneMatrix.blend
+
+        def record_blend(pheromone, froms, tos, rate, target):
+            before = pheromone.to_array()
+            blend(pheromone, froms=froms, tos=tos, rate=rate, target=target)
+            updates.append((froms, tos, rate, target, before, pheromone.to_array()))
+
+        with mock.patch.object(PheromoneMatrix, 'blend', autospec=True, side_effect=record_blend):
+            fitnesses, path = ACS(model=model, m=m, e=e, Q=Q, d=d, p=p, h=h, n=1 + 5 * m,
+                                  max_journey_size=5, q0=0.5, phi=phi)
+
+        # The greedy path sets tau0, then each population has m local updates and one global update
+        tau0 = Q / fitnesses[0]
+        self.assertEqual(5 * (m + 1), len(updates))
+        moved = 0
+        index = BipartiteIndex.from_model(model=model)
+        for i, (froms, tos, rate, target, before, after) in enumerate(updates):
+            edges = (index.rows[froms], index.cols[tos])
+            is_global = (i + 1) % (m + 1) == 0
+            if is_global:
+                self.assertEqual(e, rate)
+                self.assertAlmostEqual(Q / min(fitnesses[:i - i // (m + 1) + 1]), target)
+            else:
+                self.assertEqual((phi, tau0), (rate, target))
+                moved += np.count_nonzero(~np.isclose(before[edges], tau0))
+
+            # The updated edges move rate of the way towards the target and no other edge changes
+            expected = before.copy()
+            expected[edges] = (1 - rate) * before[edges] + rate * target
+            np.testing.assert_allclose(expected, after, rtol=1e-5)
+            unchanged = np.ones(before.shape, dtype=bool)
+            unchanged[edges] = False
+            self.assertTrue(np.array_equal(before[unchanged], after[unchanged]))
+
+        # Some edges the ants used had moved away from tau0 with the global updates
+        self.assertGreater(moved, 0)
+        # The last global update is on the edges of the best path
+        froms, tos = updates[-1][:2]
+        self.assertEqual(sorted((journey['from'], journey['to']) for journey in path),
+                         sorted(zip(froms.tolist(), tos.tolist())))
+
+    def test_ACS(self):
+        """
+        Tests the ACS algorithm returns a valid path with the best fitness evaluated
+        """
+        random.seed(3)
+        model = create_model(n=50, alpha=2)
+        d = create_dist_matrix(model=model)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+        h = create_heur_matrix(dist_matrix=d)
+
+        fitnesses, path = ACS(model=model, m=4, e=0.2, Q=10, d=d, p=p, h=h, n=30, max_journey_size=5)
+
+        self.assertEqual(30, len(fitnesses))
+        self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
+        self.assertAlmostEqual(min(fitnesses), fitness(path=path, model=model))
+
+        # Candidate lists are also used for the greedy transitions
+        fitnesses, path = ACS(model=model, m=4, e=0.2, Q=10, d=d, p=p, h=h, n=10, max_journey_size=5, k=3)
+        self.assertEqual(10, len(fitnesses))
+        self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
@@ -2,8 +2,11 @@
 Tests for the main ACO algorithm
 """
 import unittest
+import random
+import copy
 from typing import List, Dict
-from searches.aco.create_matrices import create_dist_matrix, create_pher_matrix, create_heur_matrix
+from searches.aco.create_matrices import create_dist_matrix, create_pher_matrix, create_heur_matrix, \
+    BipartiteIndex, create_bipartite_heur_matrix, create_bipartite_pher_matrix
 from searches.aco.AS import AS
 from TNRP_model.depot import Depot
 from TNRP_model.tnrp_model import create_model
@@ -48,3 +51,62 @@ class TestASClass(unittest.TestCase):
         # Check the path resolves the model
         self.assertTrue(is_complete(original_model_state=model,
                         path=path), "Path does not resolve the model")
+
+    def test_AS_bipartite_matrices(self):
+        """
+        Tests the AS algorithm runs on bipartite matrices and updates the pheromone matrix passed in
+        """
+        model = create_model(n=50, alpha=2)
+        d = create_dist_matrix(model=model)
+        index = BipartiteIndex.from_model(model=model)
+        p = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+        h = create_bipartite_heur_matrix(dist_matrix=d, index=index)
+
+        fitnesses, path = AS(model=model, m=5, e=0.5, Q=10, d=d, p=p, h=h, n=50, max_journey_size=5)
+
+        self.assertEqual(50, len(fitnesses))
+        self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
+        # The pheromone has evaporated from 1 on the edges no ant used
+        self.assertEqual(index.shape(), p.shape)
+        self.assertLess(p.min(), 1)
+
+    def test_AS_candidate_lists(self):
+        """
+        Tests the AS algorithm finds valid paths when restricted to candidate lists
+        """
+        model = create_model(n=50, alpha=2)
+        d = create_dist_matrix(model=model)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+        h = create_heur_matrix(dist_matrix=d)
+
+        fitnesses, path = AS(model=model, m=2, e=0.5, Q=10, d=d, p=p, h=h, n=20, max_journey_size=5, k=3)
+
+        self.assertEqual(20, len(fitnesses))
+        self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
+
+        # A large colony is constructed in lock-step, and the last colony is cut short by the termination condition
+        fitnesses, path = AS(model=model, m=12, e=0.5, Q=10, d=d, p=p, h=h, n=30, max_journey_size=5, k=3)
+
+        self.assertEqual(30, len(fitnesses))
+        self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
+
+    def test_AS_parallel(self):
+        """
+        Tests the AS algorithm finds valid paths with worker processes, and is reproducible with a seed
+        """
+        model = create_model(n=40, alpha=2)
+        d = create_dist_matrix(model=model)
+        index = BipartiteIndex.from_model(model=model)
+        h = create_bipartite_heur_matrix(dist_matrix=d, index=index)
+
+        results = []
+        for _ in range(2):
+            random.seed(7)
+            p = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+            results.append(AS(model=copy.deepcopy(model), m=10, e=0.5, Q=10, d=d, p=p, h=h, n=25,
+                              max_journey_size=5, workers=2))
+
+        fitnesses, path = results[0]
+        self.assertEqual(25, len(fitnesses))
+        self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
+        self.assertEqual(results[0], results[1])
@@ -2,8 +2,11 @@
 Tests the matrix creation functions of AS
 """
 import unittest
+import numpy as np
 from TNRP_model.depot import Depot
-from searches.aco.create_matrices import create_dist_matrix, create_pher_matrix, create_heur_matrix
+from TNRP_model.tnrp_model import create_model
+from searches.aco.create_matrices import create_dist_matrix, create_pher_matrix, create_heur_matrix, \
+    BipartiteIndex, create_bipartite_heur_matrix, create_bipartite_pher_matrix, create_candidate_lists
 
 
 class TestASMatricesClass(unittest.TestCase):
@@ -109,3 +112,58 @@ class TestASMatricesClass(unittest.TestCase):
 
         # Assert equal
         self.assertEqual(h_matrix, expected)
+
+    def test_bipartite_matrix_creation(self):
+        """
+        Tests the bipartite matrices hold the surplus -> deficit edges of the full matrices
+        """
+        index = BipartiteIndex.from_model(model=self.model)
+        self.assertEqual([1, 2], index.sur_names.tolist())
+        self.assertEqual([0], index.def_names.tolist())
+        self.assertEqual([-1, 0, 1], index.rows.tolist())
+        self.assertEqual([0, -1, -1], index.cols.tolist())
+
+        dist_matrix = create_dist_matrix(self.model)
+        heur_matrix = create_bipartite_heur_matrix(dist_matrix=dist_matrix, index=index)
+        pher_matrix = create_bipartite_pher_matrix(index=index)
+
+        # One row for each surplus depot and one column for each deficit depot in float32
+        self.assertEqual((2, 1), heur_matrix.shape)
+        self.assertEqual(np.float32, heur_matrix.dtype)
+        self.assertEqual((2, 1), pher_matrix.shape)
+        self.assertEqual(np.float32, pher_matrix.dtype)
+        self.assertTrue(((pher_matrix >= 0) & (pher_matrix <= 1)).all())
+
+        # The heuristic of edge 2 -> 0 is 1 / 13
+        self.assertAlmostEqual(round(1 / 13, 4), heur_matrix[1][0], 6)
+        np.testing.assert_allclose(heur_matrix, index.restrict(matrix=create_heur_matrix(dist_matrix)))
+        self.assertTrue(index.is_bipartite(matrix=heur_matrix))
+        self.assertFalse(index.is_bipartite(matrix=dist_matrix))
+
+        # Writing the bipartite matrix into a full matrix only changes the surplus -> deficit edges
+        full_matrix = [[0] * 3 for _ in range(3)]
+        index.expand(bipartite=np.array([[1], [2]]), matrix=full_matrix)
+        self.assertEqual([[0, 0, 0], [1, 0, 0], [2, 0, 0]], full_matrix)
+
+    def test_candidate_list_creation(self):
+        """
+        Tests each surplus depot's candidate list is its k nearest deficit depots, nearest first
+        """
+        model = create_model(n=60)
+        dist_matrix = create_dist_matrix(model)
+        index = BipartiteIndex.from_model(model=model)
+        candidates = create_candidate_lists(dist_matrix=dist_matrix, index=index, k=5, block_size=7)
+
+        self.assertEqual((60, 5), candidates.shape)
+        for dep in range(60):
+            if model[dep].get_s() <= 0:
+                self.assertTrue((candidates[dep] == -1).all())
+                continue
+            nearest = sorted(index.def_names.tolist(), key=lambda def_dep: dist_matrix[dep][def_dep])
+            self.assertEqual([dist_matrix[dep][def_dep] for def_dep in nearest[:5]],
+                             [dist_matrix[dep][def_dep] for def_dep in candidates[dep]])
+
+        # k is limited to the number of deficit depots
+        self.assertEqual((3, 1), create_candidate_lists(dist_matrix=create_dist_matrix(self.model),
+                                                        index=BipartiteIndex.from_model(model=self.model),
+                                                        k=5).shape)
@@ -0,0 +1,49 @@
+"""
+Tests for the MAX-MIN Ant System
+"""
+import unittest
+import numpy as np
+from searches.aco.create_matrices import create_dist_matrix, create_pher_matrix, create_heur_matrix, \
+    BipartiteIndex
+from searches.aco.MMAS import MMAS, pheromone_bounds
+from TNRP_model.tnrp_model import create_model
+from searches.utils import is_complete
+
+
+class TestMMASClass(unittest.TestCase):
+    """
+    Class for the testing of the MMAS algorithm
+    """
+
+    def test_pheromone_bounds(self):
+        """
+        Tests the maximum pheromone is Q / (e * best fitness) and the minimum is below it
+        """
+        p_min, p_max = pheromone_bounds(best_fitness=50, e=0.2, Q=100, num_choices=20)
+        self.assertAlmostEqual(10, p_max)
+        self.assertTrue(0 < p_min < p_max)
+
+        # A larger p_best gives a smaller minimum, and a single choice has no range
+        self.assertLess(pheromone_bounds(best_fitness=50, e=0.2, Q=100, num_choices=20, p_best=0.5)[0], p_min)
+        self.assertEqual((10, 10), pheromone_bounds(best_fitness=50, e=0.2, Q=100, num_choices=1))
+
+    def test_MMAS(self):
+        """
+        Tests the MMAS algorithm finds valid paths and keeps the pheromone within its bounds
+        """
+        model = create_model(n=50, alpha=2)
+        d = create_dist_matrix(model=model)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+        h = create_heur_matrix(dist_matrix=d)
+
+        fitnesses, path = MMAS(model=model, m=10, e=0.2, Q=10, d=d, p=p, h=h, n=45, max_journey_size=5, k=5)
+
+        self.assertEqual(45, len(fitnesses))
+        self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
+
+        # The final pheromone of the surplus -> deficit edges is within the bounds of the best fitness
+        index = BipartiteIndex.from_model(model=model)
+        _, p_max = pheromone_bounds(best_fitness=min(fitnesses), e=0.2, Q=10, num_choices=5)
+        final_p = index.restrict(matrix=p)
+        self.assertTrue(np.all(final_p > 0))
+        self.assertTrue(np.all(final_p <= p_max * (1 + 1e-5)))
@@ -0,0 +1,83 @@
+"""
+Tests for the Population-based ACO
+"""
+import unittest
+import numpy as np
+from searches.aco.create_matrices import create_dist_matrix, create_pher_matrix, create_heur_matrix, \
+    BipartiteIndex, create_bipartite_heur_matrix, create_bipartite_pher_matrix
+from searches.aco.PACO import PACO, PathArchive, archive_edges
+from searches.solution import Solution
+from TNRP_model.tnrp_model import create_model
+from searches.utils import is_complete
+
+
+class TestPACOClass(unittest.TestCase):
+    """
+    Class for the testing of the P-ACO algorithm
+    """
+
+    def test_archive_policies(self):
+        """
+        Tests the oldest path leaves a fifo archive and the worst path leaves a quality archive
+        """
+        paths = [Solution.from_tuples(path=[(0, 1, i + 1)]) for i in range(4)]
+
+        archive = PathArchive(size=2, policy='fifo')
+        self.assertEqual((True, None), archive.add(path=paths[0], path_fitness=5))
+        archive.add(path=paths[1], path_fitness=3)
+        self.assertEqual((True, paths[0]), archive.add(path=paths[2], path_fitness=9))
+        self.assertEqual([paths[1], paths[2]], archive.paths())
+
+        archive = PathArchive(size=2, policy='quality')
+        archive.add(path=paths[0], path_fitness=5)
+        archive.add(path=paths[1], path_fitness=3)
+        self.assertEqual((False, None), archive.add(path=paths[2], path_fitness=9))
+        self.assertEqual((True, paths[0]), archive.add(path=paths[3], path_fitness=4))
+        self.assertEqual([paths[1], paths[3]], archive.paths())
+
+        with self.assertRaises(ValueError):
+            PathArchive(size=2, policy='random')
+
+    def test_archive_edges(self):
+        """
+        Tests the edges of a path are distinct and only between surplus and deficit depots
+        """
+        index = BipartiteIndex(sur_names=[0, 2], def_names=[1, 3])
+        path = Solution.from_tuples(path=[(0, 1, 5), (2, 3, 5), (0, 1, 5), (1, 3, 2), (2, 7, 1)])
+        froms, tos = archive_edges(path=path, index=index)
+        self.assertEqual([(0, 1), (2, 3)], list(zip(froms.tolist(), tos.tolist())))
+
+    def test_PACO(self):
+        """
+        Tests the P-ACO algorithm finds valid paths, and its pheromone is the initial pheromone plus the archive
+        """
+        model = create_model(n=50, alpha=2)
+        d = create_dist_matrix(model=model)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+        h = create_heur_matrix(dist_matrix=d)
+
+        fitnesses, path = PACO(model=model, m=10, d=d, p=p, h=h, n=45, max_journey_size=5)
+        self.assertEqual(45, len(fitnesses))
+        self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
+
+        # Keep the archive to warm start a second run from uniform pheromone
+        index = BipartiteIndex.from_model(model=model)
+        archive = PathArchive(size=3, policy='quality')
+        p = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+        h = create_bipartite_heur_matrix(dist_matrix=d, index=index)
+        PACO(model=model, m=5, d=d, p=p, h=h, n=30, max_journey_size=5, archive=archive, p_max=4)
+        self.assertEqual(3, len(archive))
+
+        # Each archived path adds (4 - 1) / 3 to its edges
+        expected = np.ones(index.shape())
+        for archived in archive.paths():
+            froms, tos = archive_edges(path=archived, index=index)
+            expected[index.rows[froms], index.cols[tos]] += 1
+        np.testing.assert_allclose(expected, p, rtol=1e-5)
+
+        # A warm started run starts from the archive's pheromone
+        p = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+        fitnesses, path = PACO(model=model, m=5, d=d, p=p, h=h, n=10, max_journey_size=5, archive=archive,
+                               p_max=4)
+        self.assertEqual(10, len(fitnesses))
+        self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
@@ -0,0 +1,63 @@
+"""
+Tests the set up and ant construction shared by the ACO algorithms
+"""
+import unittest
+import numpy as np
+from TNRP_model.tnrp_model import create_model
+from searches.aco.colony import Colony
+from searches.aco.create_matrices import create_dist_matrix, create_heur_matrix, create_pher_matrix
+from searches.aco.pheromone import PheromoneMatrix
+from searches.utils import is_complete
+
+
+class TestColonyClass(unittest.TestCase):
+    """
+    Tests the Colony class
+    """
+
+    def test_construct(self):
+        """
+        Tests full matrices are restricted to the surplus -> deficit edges, and valid populations are constructed
+        both in lock-step and one ant at a time
+        """
+        model = create_model(n=30, alpha=2)
+        d = create_dist_matrix(model=model)
+        h = create_heur_matrix(dist_matrix=d)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+
+        colony = Colony(model=model, d=d, p=p, h=h, max_journey_size=20, k=3, batch_min=4)
+        self.assertEqual((len(colony.sur_deps), len(colony.def_deps)), colony.p.shape)
+        self.assertEqual(colony.p.shape, colony.h.shape)
+
+        pheromone = PheromoneMatrix(p=colony.p, h=colony.h, index=colony.index)
+        with colony:
+            for m in [2, 6]:
+                paths = colony.construct(m=m, pheromone=pheromone)
+                self.assertEqual(m, len(paths))
+                for path in paths:
+                    self.assertTrue(is_complete(original_model_state=model, path=path.to_dicts()))
+
+            path = colony.construct_ant(pheromone=pheromone, q0=1)
+            self.assertTrue(is_complete(original_model_state=model, path=path.to_dicts()))
+
+    def test_write_back(self):
+        """
+        Tests the final pheromone is written into the full or bipartite matrix passed to an algorithm
+        """
+        model = create_model(n=10, alpha=2)
+        d = create_dist_matrix(model=model)
+        h = create_heur_matrix(dist_matrix=d)
+        full_p = create_pher_matrix(model=model, dist_matrix=d)
+
+        colony = Colony(model=model, d=d, p=full_p, h=h, max_journey_size=20)
+        pheromone = PheromoneMatrix(p=colony.p, h=colony.h, index=colony.index)
+        pheromone.evaporate(e=0.5)
+
+        # A full matrix only has its surplus -> deficit edges updated
+        final_p = pheromone.write_back(p=full_p)
+        np.testing.assert_allclose(final_p, colony.index.restrict(matrix=full_p))
+
+        # A bipartite list is updated in place
+        bipartite_p = colony.p.tolist()
+        pheromone.write_back(p=bipartite_p)
+        np.testing.assert_allclose(final_p, bipartite_p)
@@ -0,0 +1,65 @@
+"""
+Tests the Fenwick tree used to pick deficit depots in the AS algorithm
+"""
+import unittest
+import random
+import numpy as np
+from searches.aco.fenwick import FenwickTree
+from searches.aco.path_generation import pick_from_tree
+
+
+class TestFenwickTreeClass(unittest.TestCase):
+    """
+    Test suite for the FenwickTree class
+    """
+
+    def test_prefix_sums(self):
+        """
+        Tests the tree finds the first item whose cumulative weight is higher than a value
+        """
+        weights = [random.uniform(0, 1) for _ in range(37)]
+        tree = FenwickTree(weights=np.array(weights))
+        cum_weights = np.cumsum(weights)
+
+        self.assertAlmostEqual(cum_weights[-1], tree.total)
+        for _ in range(100):
+            value = random.uniform(0, cum_weights[-1])
+            self.assertEqual(int(np.searchsorted(cum_weights, value, side='right')), tree.find(value=value))
+
+    def test_set_weight(self):
+        """
+        Tests items with no weight are never found after their weight is set to 0
+        """
+        tree = FenwickTree(weights=[1, 2, 3, 4, 5])
+        tree.set(idx=2, weight=0)
+        tree.set(idx=4, weight=0)
+        self.assertAlmostEqual(7, tree.total)
+        # Items 0, 1 and 3 cover [0, 1), [1, 3) and [3, 7)
+        self.assertEqual(0, tree.find(value=0.5))
+        self.assertEqual(1, tree.find(value=2.9))
+        self.assertEqual(3, tree.find(value=3))
+        self.assertEqual(3, tree.find(value=6.9))
+
+    def test_pick_from_tree(self):
+        """
+        Tests resolved deficit depots are zeroed when picked and never returned
+        """
+        open_cols = np.array([False, True, False, True])
+        tree = FenwickTree(weights=[10, 1, 10, 1])
+
+        for _ in range(20):
+            self.assertIn(pick_from_tree(tree=tree, open_cols=open_cols), [1, 3])
+        # No unresolved deficit depot has any weight
+        open_cols[:] = False
+        self.assertIsNone(pick_from_tree(tree=tree, open_cols=open_cols))
+
+    def test_pick_from_stale_tree(self):
+        """
+        Tests a tree with many resolved deficit depots is rebuilt without them
+        """
+        open_cols = np.array([False] * 8 + [True])
+        tree = FenwickTree(weights=[1] * 8 + [0])
+
+        # Only resolved deficit depots have weight, so they are all zeroed by the rebuild after 2 are picked
+        self.assertIsNone(pick_from_tree(tree=tree, open_cols=open_cols, max_stale=2))
+        self.assertEqual(0, tree.total)
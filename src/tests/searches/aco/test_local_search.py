@@ -0,0 +1,62 @@
+"""
+Tests for the local search of ants
+"""
+import unittest
+import copy
+import random
+from searches.aco.create_matrices import create_dist_matrix, create_pher_matrix, create_heur_matrix
+from searches.aco.AS import AS
+from searches.aco.local_search import descent
+from searches.random_search import random_solution
+from searches.solution import as_solution
+from TNRP_model.tnrp_model import create_model
+from searches.utils import fitness, is_complete
+
+
+class TestLocalSearchClass(unittest.TestCase):
+    """
+    Class for testing the descent applied to ants
+    """
+
+    def test_descent(self):
+        """
+        Tests the descent never makes a solution worse, returns the fitness of the solution it returns, and the
+        fitness of the current solution after each swap
+        """
+        random.seed(5)
+        model = create_model(n=40)
+        path = random_solution(model=copy.deepcopy(model), max_journey_size=10)
+        start_fitness = fitness(path=path, model=model)
+
+        improved, improved_fitness, energies = descent(solution=as_solution(path=path), model=model,
+                                                       max_journey_size=10, steps=300)
+
+        self.assertLess(improved_fitness, start_fitness)
+        self.assertEqual(300, len(energies))
+        self.assertTrue(all(later <= earlier + 1e-9 for earlier, later in zip(energies, energies[1:])))
+        self.assertAlmostEqual(energies[-1], improved_fitness)
+        self.assertAlmostEqual(fitness(path=improved.to_dicts(), model=model), improved_fitness)
+        self.assertTrue(is_complete(original_model_state=model, path=improved.to_dicts()))
+
+    def test_AS_local_search(self):
+        """
+        Tests AS with local search finds valid paths, and counts each swap tried as a fitness evaluation after the
+        evaluations of the ants
+        """
+        model = create_model(n=50, alpha=2)
+        d = create_dist_matrix(model=model)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+        h = create_heur_matrix(dist_matrix=d)
+
+        fitnesses, path = AS(model=model, m=5, e=0.5, Q=10, d=d, p=p, h=h, n=100, max_journey_size=5,
+                             local_search_steps=10, k=5)
+
+        # Each population is 5 ant evaluations and 10 swaps, with the final population's descent cut short
+        self.assertEqual(100, len(fitnesses))
+        for start in range(0, 100, 15):
+            ants = fitnesses[start:start + 5]
+            swaps = fitnesses[start + 5:start + 15]
+            self.assertLessEqual(swaps[0], min(ants) + 1e-9)
+            self.assertTrue(all(later <= earlier + 1e-9 for earlier, later in zip(swaps, swaps[1:])))
+        self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
+        self.assertAlmostEqual(min(fitnesses), fitness(path=path, model=model))
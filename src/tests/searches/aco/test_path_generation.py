@@ -2,8 +2,13 @@
 Tests a valid path can be generated in the AS algorithm using matrices
 """
 import unittest
-from searches.aco.path_generation import perform_journey, generate_path
-from searches.aco.create_matrices import create_heur_matrix, create_dist_matrix, create_pher_matrix
+from unittest import mock
+import numpy as np
+from searches.aco import path_generation
+from searches.aco.path_generation import perform_journey, generate_path, attractiveness_matrix, generate_colony, \
+    roulette
+from searches.aco.create_matrices import create_heur_matrix, create_dist_matrix, create_pher_matrix, \
+    BipartiteIndex, create_candidate_lists
 from TNRP_model.tnrp_model import create_model
 from TNRP_model.depot import Depot
 from searches.utils import is_complete
@@ -229,3 +234,141 @@ class TestASPathGenerationClass(unittest.TestCase):
                         {'from': 0, 'to': 1, 's': 3}]
 
             self.assertEqual(path, expected)
+
+    def test_precomputed_attractiveness(self):
+        """
+        Tests the attractiveness matrix is pher^alpha * heur^beta and paths generated from it are valid
+        """
+        p = [[0, 0.5, 0.2], [0, 0, 0], [0, 0, 0]]
+        h = [[0, 0.1, 0.4], [0.1, 0, 0.2], [0.4, 0.2, 0]]
+        attractiveness = attractiveness_matrix(p=p, h=h, alpha=2, beta=3)
+        self.assertAlmostEqual(0.5**2 * 0.1**3, attractiveness[0][1])
+        self.assertAlmostEqual(0.2**2 * 0.4**3, attractiveness[0][2])
+        self.assertEqual(0, attractiveness[1][2])
+
+        # Generate paths for a larger model from one attractiveness matrix
+        model = create_model(n=100, alpha=2, max_def=-20, max_sur=20)
+        d = create_dist_matrix(model=model)
+        h = create_heur_matrix(dist_matrix=d)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+        attractiveness = attractiveness_matrix(p=p, h=h)
+
+        sur_deps = {dep: model[dep] for dep in model if model[dep].get_s() > 0}
+        def_deps = {dep: model[dep] for dep in model if model[dep].get_s() < 0}
+
+        for _ in range(5):
+            path = generate_path(sur_deps=sur_deps, def_deps=def_deps, d=d, h=h, p=p,
+                                 max_journey_size=10, attractiveness=attractiveness)
+            self.assertTrue(is_complete(path=path, original_model_state=model))
+
+    def test_paths_generated_with_fenwick_trees(self):
+        """
+        Tests valid paths are generated when every surplus depot picks from a Fenwick tree
+        """
+        model = create_model(n=100, alpha=2, max_def=-20, max_sur=20)
+        d = create_dist_matrix(model=model)
+        h = create_heur_matrix(dist_matrix=d)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+
+        sur_deps = {dep: model[dep] for dep in model if model[dep].get_s() > 0}
+        def_deps = {dep: model[dep] for dep in model if model[dep].get_s() < 0}
+
+        for _ in range(5):
+            path = generate_path(sur_deps=sur_deps, def_deps=def_deps, d=d, h=h, p=p,
+                                 max_journey_size=3, tree_journeys=0)
+            self.assertTrue(is_complete(path=path, original_model_state=model))
+
+        # A deficit depot without pheromone is never picked from a tree while another one is unresolved
+        dep_0 = Depot(name=0, s=4, x=0, y=0)
+        dep_1 = Depot(name=1, s=-3, x=3, y=2)
+        dep_2 = Depot(name=2, s=-1, x=1, y=1)
+        model = {0: dep_0, 1: dep_1, 2: dep_2}
+        dep_0.add_connection(dep_1)
+        dep_0.add_connection(dep_2)
+        dep_1.add_connection(dep_2)
+        d = create_dist_matrix(model=model)
+        h = create_heur_matrix(dist_matrix=d)
+        p = [[0, 1, 0], [0, 0, 0], [0, 0, 0]]
+
+        for _ in range(10):
+            path = generate_path(sur_deps={0: dep_0}, def_deps={1: dep_1, 2: dep_2}, d=d, h=h, p=p,
+                                 max_journey_size=1, tree_journeys=0)
+            self.assertEqual([{'from': 0, 'to': 1, 's': 1}] * 3 + [{'from': 0, 'to': 2, 's': 1}], path)
+
+    def test_fenwick_trees_used_by_default(self):
+        """
+        Tests a model with the default supply values and journey size builds a Fenwick tree for each surplus depot
+        with more than tree_journeys journeys, and no trees are built with a higher threshold
+        """
+        model = create_model(n=60, alpha=2)
+        d = create_dist_matrix(model=model)
+        h = create_heur_matrix(dist_matrix=d)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+
+        sur_deps = {dep: model[dep] for dep in model if model[dep].get_s() > 0}
+        def_deps = {dep: model[dep] for dep in model if model[dep].get_s() < 0}
+        # Each surplus depot is first picked with all of its supply, and builds a tree if it needs 3 or more journeys
+        num_trees = len([dep for dep in sur_deps if sur_deps[dep].get_s() > 2 * 20])
+        self.assertGreater(num_trees, 0)
+
+        # Surplus depots need at most 5 journeys, so none build a tree with a threshold of 5
+        for kwargs, expected in [({}, num_trees), ({'tree_journeys': 5}, 0)]:
+            with mock.patch.object(path_generation, 'FenwickTree', wraps=path_generation.FenwickTree) as tree:
+                path = generate_path(sur_deps=sur_deps, def_deps=def_deps, d=d, h=h, p=p,
+                                     max_journey_size=20, **kwargs)
+            self.assertTrue(is_complete(path=path, original_model_state=model))
+            self.assertEqual(expected, tree.call_count)
+
+    def test_roulette(self):
+        """
+        Tests items are picked in proportion to their weight, and items without weight are never picked
+        """
+        rng = np.random.default_rng(0)
+        weights = np.zeros((3000, 70))
+        weights[:, [3, 40, 69]] = [1, 2, 1]
+        weights[-1] = 0
+
+        choices = roulette(weights=weights, rng=rng, block_size=32)
+        self.assertEqual(-1, choices[-1])
+        counts = np.bincount(choices[:-1], minlength=70)
+        self.assertEqual(2999, counts[[3, 40, 69]].sum())
+        self.assertGreater(counts[40], counts[3])
+        self.assertGreater(counts[40], counts[69])
+
+    def test_colony_generation(self):
+        """
+        Tests a colony of ants generated in lock-step are all valid paths
+        """
+        model = create_model(n=100, alpha=2, max_def=-20, max_sur=20)
+        d = create_dist_matrix(model=model)
+        h = create_heur_matrix(dist_matrix=d)
+        p = create_pher_matrix(model=model, dist_matrix=d)
+        index = BipartiteIndex.from_model(model=model)
+        attractiveness = attractiveness_matrix(p=index.restrict(matrix=p), h=index.restrict(matrix=h))
+
+        sur_deps = {dep: model[dep] for dep in model if model[dep].get_s() > 0}
+        def_deps = {dep: model[dep] for dep in model if model[dep].get_s() < 0}
+        candidates = create_candidate_lists(dist_matrix=d, index=index, k=3)
+
+        for colony_candidates in (None, candidates):
+            paths = generate_colony(sur_deps=sur_deps, def_deps=def_deps, m=20, attractiveness=attractiveness,
+                                    max_journey_size=3, index=index, candidates=colony_candidates)
+            self.assertEqual(20, len(paths))
+            for path in paths:
+                self.assertTrue(is_complete(path=path, original_model_state=model))
+
+        # Every ant follows the pheromone, moving 0->1 before 0->2
+        dep_0 = Depot(name=0, s=4, x=0, y=0)
+        dep_1 = Depot(name=1, s=-3, x=3, y=2)
+        dep_2 = Depot(name=2, s=-1, x=1, y=1)
+        model = {0: dep_0, 1: dep_1, 2: dep_2}
+        dep_0.add_connection(dep_1)
+        dep_0.add_connection(dep_2)
+        dep_1.add_connection(dep_2)
+        p = [[0, 1, 0], [0, 0, 0], [0, 0, 0]]
+        attractiveness = attractiveness_matrix(p=p, h=create_heur_matrix(dist_matrix=create_dist_matrix(model)))
+
+        paths = generate_colony(sur_deps={0: dep_0}, def_deps={1: dep_1, 2: dep_2}, m=10,
+                                attractiveness=attractiveness, max_journey_size=3)
+        for path in paths:
+            self.assertEqual([{'from': 0, 'to': 1, 's': 3}, {'from': 0, 'to': 2, 's': 1}], path.to_dicts())
@@ -2,7 +2,12 @@
 Unit tests for the pheromone update function
 """
 import unittest
-from searches.aco.pheromone import update_pheromone
+import copy
+import random
+import numpy as np
+from searches.aco.path_generation import attractiveness_matrix
+from searches.aco.pheromone import PheromoneMatrix, update_pheromone
+from searches.solution import Solution
 
 
 class TestPheromoneClass(unittest.TestCase):
@@ -66,3 +71,47 @@ class TestPheromoneClass(unittest.TestCase):
 
         # check pheromone matrix changed correctly
         self.assertEqual(self.p, expected)
+
+    def test_pheromone_matrix_matches_list(self):
+        """
+        Tests the lazily evaporated pheromone matrix matches the pheromone list after many updates
+        """
+        h = [[0, 0.5, 0.2], [0.5, 0, 0.4], [0.2, 0.4, 0]]
+        pheromone = PheromoneMatrix(p=copy.deepcopy(self.p), h=h, alpha=2, beta=3, min_scale=1e-3)
+
+        for _ in range(100):
+            paths = [Solution.from_tuples(path=[(0, 1, 5), (1, 2, 5), (0, 1, 3)]),
+                     [{'from': 2, 'to': 0, 's': 4}]]
+            costs = [random.uniform(5, 20), random.uniform(5, 20)]
+            update_pheromone(p=self.p, paths=paths, fitnesses=costs, e=0.2, Q=10)
+            update_pheromone(p=pheromone, paths=paths, fitnesses=costs, e=0.2, Q=10)
+
+        # The scale has been renormalised, and both matrices hold the same pheromone
+        self.assertGreaterEqual(pheromone.scale, 1e-3)
+        np.testing.assert_allclose(self.p, pheromone.to_array())
+        self.assertAlmostEqual(self.p[0][1], pheromone[0][1])
+
+        # The attractiveness is proportional to the attractiveness of the pheromone
+        attractiveness = attractiveness_matrix(p=self.p, h=h, alpha=2, beta=3)
+        np.testing.assert_allclose(attractiveness, pheromone.attractiveness * pheromone.scale**2)
+
+    def test_pheromone_bounds_and_reset(self):
+        """
+        Tests the pheromone is clamped to its bounds, reset, and its branching factor falls as it converges
+        """
+        h = np.array([[0.5, 0.2, 0.1], [0.4, 0.3, 0.2]])
+        pheromone = PheromoneMatrix(p=np.ones((2, 3)), h=h, alpha=1, beta=2)
+        self.assertEqual(3, pheromone.branching_factor())
+
+        # Evaporate so the scale is used, then deposit on one edge of each row
+        pheromone.evaporate(e=0.5)
+        pheromone.deposit(froms=np.array([0, 1]), tos=np.array([0, 2]), amounts=np.array([5, 0.5]))
+        pheromone.clamp(p_min=0.6, p_max=2)
+        np.testing.assert_allclose([[2, 0.6, 0.6], [0.6, 0.6, 1]], pheromone.to_array())
+        np.testing.assert_allclose(attractiveness_matrix(p=pheromone.to_array(), h=h),
+                                   pheromone.attractiveness * pheromone.scale)
+        self.assertEqual(1, pheromone.branching_factor())
+
+        pheromone.reset(value=2)
+        np.testing.assert_allclose(np.full((2, 3), 2), pheromone.to_array())
+        np.testing.assert_allclose(attractiveness_matrix(p=pheromone.to_array(), h=h), pheromone.attractiveness)
@@ -0,0 +1,88 @@
+"""
+Tests for the pheromone warm starts
+"""
+import unittest
+import copy
+import tempfile
+import numpy as np
+from searches.aco.AS import AS
+from searches.aco.create_matrices import BipartiteIndex, create_dist_matrix, create_bipartite_heur_matrix, \
+    create_bipartite_pher_matrix
+from searches.aco.warm_start import instance_key, save_pheromone, warm_start_pher_matrix
+from TNRP_model.array_model import TNRPModel
+from TNRP_model.tnrp_model import create_model
+from searches.utils import is_complete
+
+
+class TestWarmStartClass(unittest.TestCase):
+    """
+    Class for testing the saving and blending of pheromone
+    """
+
+    def test_instance_key(self):
+        """
+        Tests the key depends on the depot coordinates but not the supply values or model type
+        """
+        model = create_model(n=20)
+        changed = copy.deepcopy(model)
+        changed[0].add_s(1)
+        changed[1].add_s(-1)
+
+        self.assertEqual(instance_key(model=model), instance_key(model=changed))
+        self.assertEqual(instance_key(model=model), instance_key(model=TNRPModel.from_depots(model)))
+        self.assertNotEqual(instance_key(model=model), instance_key(model=create_model(n=20)))
+
+    def test_blended_pheromone(self):
+        """
+        Tests the saved pheromone is blended into the edges between depots with the same sign of supply
+        """
+        model = create_model(n=20)
+        index = BipartiteIndex.from_model(model=model)
+        with tempfile.TemporaryDirectory() as directory:
+            p = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+            # Nothing is saved yet
+            self.assertIs(p, warm_start_pher_matrix(directory=directory, model=model, p=p, index=index))
+
+            # Save pheromone of 1 on the first edge and 3 elsewhere
+            saved = np.full(index.shape(), 3, dtype=np.float32)
+            saved[0, 0] = 1
+            save_pheromone(directory=directory, model=model, p=saved, index=index)
+            blended = warm_start_pher_matrix(directory=directory, model=model, p=p, index=index, weight=0.5)
+
+            # The saved pheromone is scaled to a mean of 1 before it is blended
+            scale = 1 / saved.mean()
+            self.assertAlmostEqual(0.5 + 0.5 * scale, blended[0, 0], places=5)
+            self.assertAlmostEqual(0.5 + 1.5 * scale, blended[0, 1], places=5)
+
+            # A depot that is now in surplus keeps its initial pheromone
+            changed = TNRPModel.from_depots(model)
+            new_sur = int(index.def_names[0])
+            changed.s[new_sur] = 5
+            changed.s[int(index.sur_names[0])] -= 5
+            changed_index = BipartiteIndex.from_model(model=changed)
+            p = create_bipartite_pher_matrix(index=changed_index, p_min=1, p_max=1)
+            blended = warm_start_pher_matrix(directory=directory, model=changed, p=p, index=changed_index)
+            np.testing.assert_allclose(1, blended[changed_index.rows[new_sur]])
+
+    def test_AS_warm_start(self):
+        """
+        Tests AS saves its final pheromone and starts from it on the next run
+        """
+        model = create_model(n=30)
+        d = create_dist_matrix(model=model)
+        index = BipartiteIndex.from_model(model=model)
+        h = create_bipartite_heur_matrix(dist_matrix=d, index=index)
+
+        with tempfile.TemporaryDirectory() as directory:
+            p = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+            AS(model=copy.deepcopy(model), m=5, e=0.2, Q=100, d=d, p=p, h=h, n=20, max_journey_size=10,
+               warm_start_dir=directory)
+            p_start = create_bipartite_pher_matrix(index=index, p_min=1, p_max=1)
+            expected = warm_start_pher_matrix(directory=directory, model=model, p=p_start, index=index, weight=1)
+            # The saved pheromone is the final pheromone, scaled to a mean of 1
+            np.testing.assert_allclose(p / p.mean(), expected, rtol=1e-5)
+
+            fitnesses, path = AS(model=copy.deepcopy(model), m=5, e=0.2, Q=100, d=d, p=p_start, h=h, n=20,
+                                 max_journey_size=10, warm_start_dir=directory)
+            self.assertEqual(20, len(fitnesses))
+            self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
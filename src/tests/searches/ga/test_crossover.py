@@ -2,7 +2,13 @@
 Unit tests for the crossover method of the genetic algorithm
 """
 import unittest
+import copy
+import random
 from searches.ga.crossover import aware_crossover
+from searches.random_search import random_solution
+from searches.sa.neighbourhood import compress_neighbour
+from TNRP_model.supply_state import SupplyState
+from TNRP_model.tnrp_model import create_model
 from TNRP_model.depot import Depot
 from searches.ga.population import encode_solution, decode_solution
 from searches.utils import is_complete
@@ -114,3 +120,23 @@ class TestCrossoverClass(unittest.TestCase):
 
         self.assertEqual(res_child_1, encoded_parent_1)
         self.assertEqual(res_child_2, encoded_parent_2)
+
+    def test_children_are_compressed(self):
+        """
+        Tests the children of Solution parents are valid, compressed Solutions built on a given supply vector
+        """
+        random.seed(2)
+        model = create_model(n=40)
+        parent_1 = random_solution(model=copy.deepcopy(model), max_journey_size=10)
+        parent_2 = random_solution(model=copy.deepcopy(model), max_journey_size=10)
+        supply = SupplyState(model=model).initial
+
+        for _ in range(5):
+            child_1, child_2 = aware_crossover(parent_1=parent_1, parent_2=parent_2, model=model,
+                                               max_journey_size=10, crossover_rate=1, supply=supply)
+            for child in (child_1, child_2):
+                self.assertTrue(is_complete(path=child.to_dicts(), original_model_state=model))
+                self.assertEqual(compress_neighbour(path=child.to_dicts(), max_journey_size=10),
+                                 child.to_dicts())
+        # The supply vector is not changed
+        self.assertEqual(SupplyState(model=model).initial.tolist(), supply.tolist())
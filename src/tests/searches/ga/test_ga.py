@@ -1,11 +1,14 @@
 """
 Tests the GA 
 """
+import random
 import unittest
 from typing import List, Dict
 from TNRP_model.tnrp_model import create_model
 from searches.ga.ga import ga
-from searches.utils import is_complete
+from searches.ga.parallel import ParallelBreeder
+from searches.ga.population import gen_solutions
+from searches.utils import is_complete, fitness_batch, pack_solutions
 
 
 class TestGAClass(unittest.TestCase):
@@ -38,3 +41,61 @@ class TestGAClass(unittest.TestCase):
         # Check the path resolves the model
         self.assertTrue(is_complete(original_model_state=model,
                         path=path), "Path does not resolve the model")
+
+    def test_selection_methods(self):
+        """
+        Tests the GA finds valid paths with each vectorised selection method and an odd population size
+        """
+        model = create_model(n=30, alpha=2)
+
+        for selection in ['tournament', 'rank', 'sus']:
+            fitnesses, path = ga(mutation_rate=0.1, pop_size=15, t_size=3, n=50, model=model,
+                                 max_journey_size=20, crossover_rate=0.6, selection=selection)
+            self.assertEqual(len(fitnesses), 50)
+            self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
+
+    def test_parallel_children(self):
+        """
+        Tests the GA finds valid paths when the children are created in worker processes, and that a run is
+        reproducible with random.seed
+        """
+        model = create_model(n=30, alpha=2)
+
+        results = []
+        for _ in range(2):
+            random.seed(5)
+            fitnesses, path = ga(mutation_rate=0.1, pop_size=15, t_size=3, n=50, model=model,
+                                 max_journey_size=20, crossover_rate=0.6, workers=2)
+            self.assertEqual(len(fitnesses), 50)
+            self.assertTrue(is_complete(original_model_state=model, path=path), "Path does not resolve the model")
+            results.append((fitnesses, path))
+
+        self.assertEqual(results[0], results[1])
+
+    def test_parallel_evaluation_budget(self):
+        """
+        Tests the workers remove the extra child of an odd population before evaluating, and only evaluate
+        as many children as the budget of fitness evaluations allows
+        """
+        model = create_model(n=30, alpha=2)
+        parents = gen_solutions(pop_size=8, model=model, max_journey_size=20)
+
+        with ParallelBreeder(model=model, max_journey_size=20, crossover_rate=0.6, mutation_rate=0.1,
+                             workers=2) as breeder:
+            for num_children, num_evaluated in [(8, None), (7, 7), (7, 5), (8, 3), (7, 0)]:
+                children, fitnesses = breeder.breed(parents=parents, num_children=num_children,
+                                                    num_evaluated=num_evaluated)
+                self.assertEqual(num_children, len(children))
+                self.assertEqual(num_children if num_evaluated is None else num_evaluated, len(fitnesses))
+
+                # The fitnesses are of the first children
+                froms, tos, offsets = pack_solutions(solutions=children[:len(fitnesses)])
+                self.assertEqual(fitness_batch(froms=froms, tos=tos, model=model, offsets=offsets).tolist(),
+                                 fitnesses)
+                for child in children:
+                    self.assertTrue(is_complete(original_model_state=model, path=child.to_dicts()))
+
+        # An odd population has exactly n fitness evaluations when the last population is cut short
+        fitnesses, _ = ga(mutation_rate=0.1, pop_size=15, t_size=3, n=44, model=model,
+                          max_journey_size=20, crossover_rate=0.6, workers=2)
+        self.assertEqual(44, len(fitnesses))
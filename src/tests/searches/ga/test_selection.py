@@ -2,8 +2,10 @@
 Tests the evaluation method for the genetic algorithm
 """
 import unittest
+import numpy as np
 from TNRP_model.depot import Depot
-from searches.ga.selection import tournament
+from searches.ga.selection import tournament, tournament_indices, rank_indices, fitness_proportional_indices, \
+    select_indices, sus_indices
 
 
 class TestGAEvaluationClass(unittest.TestCase):
@@ -51,3 +53,36 @@ class TestGAEvaluationClass(unittest.TestCase):
         for _ in range(10):
             selected = tournament(pop=pop, t_size=2, model=model)
             self.assertTrue(selected == expected_j or selected == expected_j_2)
+
+        # The cached fitnesses are used instead of evaluating the entrants, and the population isn't shuffled
+        order = list(pop)
+        selected = tournament(pop=pop, t_size=3, model=model, fitnesses=[9, 6, 3])
+        self.assertEqual([(0, 3, 1), (0, 3, 1), (0, 3, 1)], selected)
+        self.assertEqual(order, pop)
+
+    def test_vectorised_selection(self):
+        """
+        Tests the vectorised selectors pick fitter members more often and return valid indices
+        """
+        rng = np.random.default_rng(0)
+        fitnesses = np.array([40.0, 10.0, 30.0, 20.0])
+
+        # A tournament of the whole population is always won by the best member
+        self.assertEqual([1] * 5, tournament_indices(fitnesses=fitnesses, k=5, t_size=4, rng=rng).tolist())
+        # The worst member never wins a tournament of two different members
+        winners = tournament_indices(fitnesses=fitnesses, k=1000, t_size=2, rng=rng)
+        self.assertNotIn(0, winners.tolist())
+
+        # Stochastic universal sampling picks each member its expected number of times, rounded up or down
+        counts = np.bincount(sus_indices(weights=[1, 2, 3, 2], k=16, rng=rng), minlength=4)
+        self.assertEqual([2, 4, 6, 4], counts.tolist())
+
+        for picked in (rank_indices(fitnesses=fitnesses, k=400, rng=rng),
+                       fitness_proportional_indices(fitnesses=fitnesses, k=400, rng=rng)):
+            counts = np.bincount(picked, minlength=4)
+            self.assertEqual(400, counts.sum())
+            # The members are picked in order of fitness
+            self.assertEqual([1, 3, 2, 0], np.argsort(-counts).tolist())
+
+        with self.assertRaises(ValueError):
+            select_indices(fitnesses=fitnesses, k=2, method='roulette', rng=rng)
@@ -0,0 +1,95 @@
+"""
+Tests the edge-indexed solution used by the SA algorithm
+"""
+import unittest
+import copy
+from searches.random_search import random_solution
+from searches.sa.edge_solution import EdgeSolution
+from searches.sa.neighbourhood import compress_neighbour, swap_journeys
+from searches.solution import Solution
+from searches.utils import fitness, is_complete
+from TNRP_model.tnrp_model import create_model
+
+
+class TestEdgeSolutionClass(unittest.TestCase):
+    """
+    Test suite for the EdgeSolution class
+    """
+
+    def setUp(self):
+        """Create a model and a random solution to it"""
+        self.model = create_model(n=30)
+        self.solution = random_solution(model=copy.deepcopy(self.model), max_journey_size=20)
+
+    def test_compresses_solution(self):
+        """
+        Tests the edge solution holds the compressed journeys of the solution
+        """
+        edge_solution = EdgeSolution(solution=self.solution, model=self.model, max_journey_size=20)
+        compressed = compress_neighbour(path=self.solution, max_journey_size=20)
+
+        self.assertEqual(compressed, edge_solution.to_solution())
+        self.assertEqual(len(compressed), len(edge_solution))
+        self.assertCountEqual(compressed.to_tuples(),
+                              [edge_solution.journey(slot) for slot in range(len(edge_solution))])
+        self.assertAlmostEqual(fitness(path=compressed, model=self.model), edge_solution.energy)
+
+    def test_swap_matches_neighbour(self):
+        """
+        Tests a swap made in place gives the same solution and energy as the compressed neighbour
+        """
+        edge_solution = EdgeSolution(solution=self.solution, model=self.model, max_journey_size=20)
+
+        for _ in range(50):
+            current = edge_solution.to_solution()
+            slot_1, slot_2 = edge_solution.pick_swap()
+            journey_1 = edge_solution.journey(slot_1)
+            journey_2 = edge_solution.journey(slot_2)
+
+            edge_solution.apply_swap(slot_1=slot_1, slot_2=slot_2)
+            edge_solution.commit()
+
+            # Perform the same swap on the list of journeys
+            j_1_idx = current.to_tuples().index(journey_1)
+            j_2_idx = current.to_tuples().index(journey_2)
+            neighbour = compress_neighbour(path=swap_journeys(solution=current, j_1_idx=j_1_idx,
+                                                              j_2_idx=j_2_idx), max_journey_size=20)
+
+            self.assertEqual(neighbour, edge_solution.to_solution())
+            self.assertAlmostEqual(fitness(path=neighbour, model=self.model), edge_solution.energy)
+
+    def test_undo_restores_solution(self):
+        """
+        Tests rejected moves are rolled back
+        """
+        edge_solution = EdgeSolution(solution=self.solution, model=self.model, max_journey_size=20)
+        original = edge_solution.to_solution()
+        energy = edge_solution.energy
+
+        for _ in range(50):
+            slot_1, slot_2 = edge_solution.pick_swap()
+            edge_solution.apply_swap(slot_1=slot_1, slot_2=slot_2)
+            edge_solution.undo()
+
+        self.assertEqual(original, edge_solution.to_solution())
+        self.assertEqual(len(original), len(edge_solution))
+        self.assertAlmostEqual(energy, edge_solution.energy)
+
+    def test_best_solution(self):
+        """
+        Tests the marked best solution is rebuilt after many more moves
+        """
+        edge_solution = EdgeSolution(solution=self.solution, model=self.model, max_journey_size=20)
+        best = None
+
+        for i in range(500):
+            slot_1, slot_2 = edge_solution.pick_swap()
+            edge_solution.apply_swap(slot_1=slot_1, slot_2=slot_2)
+            edge_solution.commit()
+            if i == 100:
+                edge_solution.mark_best()
+                best = edge_solution.to_solution()
+
+        self.assertIsInstance(edge_solution.best_solution(), Solution)
+        self.assertEqual(best, edge_solution.best_solution())
+        self.assertTrue(is_complete(path=edge_solution.best_solution(), original_model_state=self.model))
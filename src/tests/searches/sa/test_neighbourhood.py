@@ -1,8 +1,15 @@
 """
 Tests the generation of a neighbour
 """
-from searches.sa.neighbourhood import gen_neighbour, compress_neighbour
+import copy
+from searches.sa.neighbourhood import (gen_neighbour, compress_neighbour, edge_flows, flow_cost_delta,
+                                       pick_journeys, swap_changes, swap_journeys)
+from searches.random_search import random_solution
+from searches.utils import fitness
+from TNRP_model.tnrp_model import create_model
+from searches.solution import Solution
 import unittest
+import numpy as np
 from searches.ga.population import decode_solution
 
 
@@ -120,3 +127,61 @@ class TestNeighbourhoodClass(unittest.TestCase):
         result = compress_neighbour(path=decoded, max_journey_size=20)
 
         self.assertEqual(decode_solution(path=expected), result)
+
+    def test_neighbour_uses_candidates(self):
+        """
+        Tests that a neighbour only swaps to candidate deficit depots when it can
+        """
+        path = [
+            {'from': 0, 'to': 2, 's': 10},
+            {'from': 1, 'to': 3, 's': 10},
+            {'from': 4, 'to': 5, 's': 10}
+        ]
+        # Depot 0 can only move to 2 or 3, depot 1 to 3 or 2 and depot 4 only to 5
+        candidates = np.array([[2, 3], [3, 2], [-1, -1], [-1, -1], [5, 5]])
+
+        for _ in range(10):
+            result = gen_neighbour(path=path, candidates=candidates)
+            self.assertCountEqual([
+                {'from': 0, 'to': 3, 's': 10},
+                {'from': 1, 'to': 2, 's': 10},
+                {'from': 4, 'to': 5, 's': 10}
+            ], result)
+
+    def test_solution_compression_matches_path_compression(self):
+        """
+        Tests compressing a Solution gives the same journeys as compressing the list of journeys
+        """
+        path = [
+            {'from': 3, 'to': 2, 's': 6},
+            {'from': 1, 'to': 4, 's': 9},
+            {'from': 3, 'to': 2, 's': 7},
+            {'from': 1, 'to': 4, 's': 3},
+            {'from': 3, 'to': 2, 's': 8},
+            {'from': 1, 'to': 2, 's': 4}
+        ]
+        solution = Solution.from_dicts(path=path)
+
+        result = compress_neighbour(path=solution, max_journey_size=10)
+
+        self.assertIsInstance(result, Solution)
+        self.assertEqual(compress_neighbour(path=path, max_journey_size=10), result.to_dicts())
+
+    def test_swap_delta_matches_fitness(self):
+        """
+        Tests the change in energy calculated from the swapped edges matches the full fitness
+        """
+        model = create_model(n=30)
+        solution = compress_neighbour(path=random_solution(model=copy.deepcopy(model), max_journey_size=20),
+                                      max_journey_size=20)
+        flows = edge_flows(solution=solution)
+
+        for _ in range(50):
+            j_1_idx, j_2_idx = pick_journeys(solution=solution)
+            changes = swap_changes(solution=solution, j_1_idx=j_1_idx, j_2_idx=j_2_idx)
+            delta = flow_cost_delta(flows=flows, changes=changes, model=model, max_journey_size=20)
+
+            neighbour = compress_neighbour(path=swap_journeys(solution=solution, j_1_idx=j_1_idx,
+                                                              j_2_idx=j_2_idx), max_journey_size=20)
+            self.assertAlmostEqual(fitness(path=neighbour, model=model) -
+                                   fitness(path=solution, model=model), delta)
@@ -0,0 +1,77 @@
+"""
+Tests for the flow-matrix form of a solution
+"""
+import unittest
+import copy
+from TNRP_model.depot import Depot
+from TNRP_model.tnrp_model import create_model
+from searches.flow_matrix import FlowMatrix
+from searches.random_search import random_solution
+from searches.sa.neighbourhood import compress_neighbour
+from searches.solution import Solution
+from searches.utils import fitness
+
+
+class TestFlowMatrixClass(unittest.TestCase):
+    """
+    Tests the FlowMatrix class
+    """
+
+    def test_flows_summed_by_edge(self):
+        """
+        Tests journeys along the same edge are summed and ordered by from and then to depot
+        """
+        path = [(3, 2, 6), (1, 4, 9), (3, 2, 7), (1, 4, 3), (1, 2, 4)]
+        flow_matrix = FlowMatrix.from_solution(path=path)
+
+        self.assertEqual({(1, 2): 4, (1, 4): 12, (3, 2): 13}, flow_matrix.to_flows())
+        self.assertEqual([1, 1, 3], flow_matrix.froms.tolist())
+        self.assertEqual(3, len(flow_matrix))
+
+    def test_to_solution_is_compressed(self):
+        """
+        Tests the journeys of a flow matrix are the compressed journeys of the solution
+        """
+        path = [{'from': 3, 'to': 2, 's': 6}, {'from': 1, 'to': 4, 's': 9}, {'from': 3, 'to': 2, 's': 7},
+                {'from': 1, 'to': 4, 's': 3}, {'from': 1, 'to': 2, 's': 4}]
+        solution = FlowMatrix.from_solution(path=path).to_solution(max_journey_size=10)
+
+        self.assertEqual(compress_neighbour(path=copy.deepcopy(path), max_journey_size=10),
+                         solution.to_dicts())
+
+    def test_cost_and_feasibility(self):
+        """
+        Tests the cost is ceil(flow / max) * distance and feasibility is checked with the row and column sums
+        """
+        dep_0 = Depot(name=0, s=15, x=0, y=0)
+        dep_1 = Depot(name=1, s=-15, x=3, y=4)
+        dep_0.add_connection(dep_1)
+        model = {0: dep_0, 1: dep_1}
+
+        flow_matrix = FlowMatrix.from_solution(path=[(0, 1, 10), (0, 1, 5)])
+        # Two journeys of distance 5 with a maximum journey size of 10, but three with a maximum of 5
+        self.assertEqual(10, flow_matrix.cost(model=model, max_journey_size=10))
+        self.assertEqual(15, flow_matrix.cost(model=model, max_journey_size=5))
+        self.assertTrue(flow_matrix.is_feasible(model=model))
+        self.assertFalse(FlowMatrix.from_solution(path=[(0, 1, 10)]).is_feasible(model=model))
+
+        # The cost matches the fitness of a compressed random solution on an array-backed model
+        array_model = create_model(n=30)
+        solution = compress_neighbour(path=random_solution(model=copy.deepcopy(array_model),
+                                                           max_journey_size=20), max_journey_size=20)
+        flow_matrix = FlowMatrix.from_solution(path=solution)
+        self.assertAlmostEqual(fitness(path=solution, model=array_model),
+                               flow_matrix.cost(model=array_model, max_journey_size=20))
+        self.assertTrue(flow_matrix.is_feasible(model=array_model))
+
+    def test_equal_solutions_hash_the_same(self):
+        """
+        Tests solutions with the same flows in a different order are equal and deduplicated by a set
+        """
+        flow_1 = FlowMatrix.from_solution(path=Solution.from_tuples(path=[(0, 1, 5), (2, 3, 4), (0, 1, 5)]))
+        flow_2 = FlowMatrix.from_solution(path=[(2, 3, 4), (0, 1, 10)])
+        flow_3 = FlowMatrix.from_solution(path=[(2, 3, 4), (0, 1, 9)])
+
+        self.assertEqual(flow_1, flow_2)
+        self.assertNotEqual(flow_1, flow_3)
+        self.assertEqual(2, len({flow_1, flow_2, flow_3}))
@@ -3,8 +3,10 @@ Tests for the random search method
 """
 import unittest
 from typing import List, Dict
+import numpy as np
 from searches.random_search import random_search
-from TNRP_model.tnrp_model import create_model
+from searches.utils import is_complete
+from TNRP_model.tnrp_model import create_model, generate_model
 
 
 class TestRandomSolutionClass(unittest.TestCase):
@@ -48,3 +50,18 @@ class TestRandomSolutionClass(unittest.TestCase):
             for key, value in journey.items():
                 self.assertIsInstance(key, str)
                 self.assertIsInstance(value, int)
+
+    def test_random_search_uses_candidates(self):
+        """
+        Checks the random search only moves to candidate depots while any are unresolved
+        """
+        model = generate_model(n=100, rng=np.random.default_rng(0), k_nearest=5)
+
+        solution = random_search(model=model, max_journey_size=20,
+                                 candidates=model.neighbours)
+
+        # Check the solution is valid and most journeys are to candidate depots
+        self.assertTrue(is_complete(path=solution, original_model_state=generate_model(
+            n=100, rng=np.random.default_rng(0))))
+        in_candidates = [j['to'] in model.neighbours[j['from']] for j in solution]
+        self.assertGreater(sum(in_candidates), len(solution) / 2)
@@ -0,0 +1,90 @@
+"""
+Tests for the structure-of-arrays solution representation
+"""
+import unittest
+import copy
+from TNRP_model.depot import Depot
+from TNRP_model.tnrp_model import create_model
+from searches.random_search import random_solution
+from searches.solution import Solution, as_solution
+from searches.utils import fitness, is_complete
+
+
+class TestSolutionClass(unittest.TestCase):
+    """
+    Tests the Solution class and its conversions to and from the legacy formats
+    """
+    path = [{'from': 0, 'to': 1, 's': 2}, {'from': 3, 'to': 4, 's': 5}, {'from': 6, 'to': 7, 's': 8}]
+    chromosome = [(0, 1, 2), (3, 4, 5), (6, 7, 8)]
+
+    def test_append_grows_arrays(self):
+        """
+        Tests journeys can be appended past the initial capacity
+        """
+        solution = Solution(capacity=1)
+        for i in range(10):
+            solution.append(i, i + 1, i + 2)
+
+        self.assertEqual(10, len(solution))
+        self.assertEqual(list(range(10)), solution.froms.tolist())
+        self.assertEqual((9, 10, 11), solution[-1])
+
+    def test_legacy_conversions(self):
+        """
+        Tests a solution converts to and from the dictionary and tuple formats
+        """
+        solution = Solution.from_dicts(path=self.path)
+        self.assertEqual(self.chromosome, solution.to_tuples())
+        self.assertEqual(self.path, Solution.from_tuples(path=self.chromosome).to_dicts())
+
+        # Values are Python integers
+        for journey in solution.to_dicts():
+            for value in journey.values():
+                self.assertIsInstance(value, int)
+
+    def test_views_read_solution(self):
+        """
+        Tests the views read the solution's arrays rather than a copy of them
+        """
+        solution = Solution.from_tuples(path=self.chromosome)
+        dicts = solution.as_dicts()
+        tuples = solution.as_tuples()
+
+        solution.set_journey(0, 9, 10, 11)
+        self.assertEqual({'from': 9, 'to': 10, 's': 11}, dicts[0])
+        self.assertEqual((9, 10, 11), tuples[0])
+        self.assertEqual(3, len(dicts))
+
+        # Converting a view back gives the same solution
+        self.assertIs(solution, as_solution(path=dicts))
+
+    def test_copy_and_remove(self):
+        """
+        Tests a copy is independent and removing moves the last journey into the gap
+        """
+        solution = Solution.from_tuples(path=self.chromosome)
+        solution_copy = solution.copy()
+        solution_copy.remove(0)
+
+        self.assertEqual(self.chromosome, solution.to_tuples())
+        self.assertEqual([(6, 7, 8), (3, 4, 5)], solution_copy.to_tuples())
+
+    def test_utils_accept_solutions(self):
+        """
+        Tests the fitness and completion checks on a dictionary model and an array-backed model
+        """
+        dep_0 = Depot(name=0, s=5, x=0, y=0)
+        dep_1 = Depot(name=1, s=-5, x=3, y=4)
+        dep_0.add_connection(dep_1)
+        model = {0: dep_0, 1: dep_1}
+        solution = Solution.from_tuples(path=[(0, 1, 3), (0, 1, 2)])
+
+        self.assertEqual(10, fitness(path=solution, model=model))
+        self.assertTrue(is_complete(path=solution, original_model_state=model))
+
+        # A random solution to an array-backed model has the same fitness as its dictionary form
+        array_model = create_model(n=20)
+        solution = random_solution(model=copy.deepcopy(array_model), max_journey_size=20)
+        self.assertTrue(is_complete(path=solution, original_model_state=array_model))
+        self.assertAlmostEqual(fitness(path=solution.to_dicts(), model=array_model),
+                               fitness(path=solution, model=array_model))
@@ -4,7 +4,9 @@ Tests for the repeated functions throughout the project
 
 import unittest
 from TNRP_model.depot import Depot
-from searches.utils import fitness, is_resolved, apply_path, is_complete
+from searches.utils import fitness, is_resolved, apply_path, is_complete, fitness_batch, pack_solutions
+from searches.solution import Solution
+from TNRP_model.array_model import TNRPModel
 from TNRP_model.tnrp_model import create_model
 from searches.random_search import random_search
 import copy
@@ -120,3 +122,27 @@ class TestUtilsClass(unittest.TestCase):
         ]
 
         self.assertFalse(is_complete(path=path, original_model_state=model))
+
+    def test_fitness_batch(self):
+        """
+        Tests many solutions are scored at once from padded and ragged arrays
+        """
+        # Distances of 5 + 13 and 13 + 13 + 5, and an empty solution
+        solutions = [Solution.from_tuples(path=[(0, 1, 10), (0, 2, 10)]),
+                     Solution.from_tuples(path=[(2, 0, 5), (0, 2, 5), (1, 0, 5)]),
+                     Solution()]
+
+        froms, tos, offsets = pack_solutions(solutions=solutions)
+        self.assertEqual([0, 2, 5, 5], offsets.tolist())
+        ragged = fitness_batch(froms=froms, tos=tos, model=self.model, offsets=offsets)
+        self.assertEqual([18, 31, 0], ragged.tolist())
+
+        padded_froms = [[0, 0, -1], [2, 0, 1], [-1, -1, -1]]
+        padded_tos = [[1, 2, -1], [0, 2, 0], [-1, -1, -1]]
+        padded = fitness_batch(froms=padded_froms, tos=padded_tos, model=self.model)
+        self.assertEqual([18, 31, 0], padded.tolist())
+
+        # The array-backed model gives the same fitnesses
+        array_model = TNRPModel.from_depots(self.model)
+        self.assertEqual([18, 31, 0], fitness_batch(froms=froms, tos=tos, model=array_model,
+                                                    offsets=offsets).tolist())
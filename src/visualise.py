@@ -4,6 +4,8 @@ Allows for the visualisation of the experiments and the TNRP
 import matplotlib.pyplot as plt
 from typing import Dict, List
 from TNRP_model.depot import Depot
+from TNRP_model.array_model import TNRPModel
+from TNRP_model.instance_io import read_text_model
 
 
 def write_model(model: Dict[int, Depot], filename: str):
@@ -21,7 +23,7 @@ def write_model(model: Dict[int, Depot], filename: str):
             f.write(str(depot) + '\n')
 
 
-def read_model(filename: str) -> Dict[int, Depot]:
+def read_model(filename: str) -> TNRPModel:
     """
     Reads a TNRP from a text file
 
@@ -29,35 +31,9 @@ def read_model(filename: str) -> Dict[int, Depot]:
         filename - The name of the file located in ./modelExamples/<filename>.txt
 
     returns:
-        The TNRP model as a dictionary of depot_name: Depot Object
+        The TNRP model as a TNRPModel, which behaves as a dictionary of depot_name: Depot Object
     """
-    model: Dict[int, Depot] = {}
-    # Open the text file
-    with open(f'./modelExamples/{filename}.txt', 'r') as f:
-        # For each of the lines (depots)
-        for line in f:
-            # Split the line by spaces
-            parts = line.split(' ')
-            # Obtain the name of the depot
-            id = int(parts[1].strip(','))
-            # Obtain the coordinates of the depot
-            coords = parts[3]
-            x, y, _ = coords.split(',')
-            x = int(x.strip('('))
-            y = int(y.strip(')'))
-            # Obtain the initial supply value of the depot
-            s = int(parts[-1].strip())
-            # Create the initial depot object
-            dep = Depot(name=id, s=s, x=x, y=y)
-            # Add depot object to the TNRP model
-            model[id] = dep
-
-    # Connect all depots in the model
-    for i in range(len(model)):
-        for j in range(i, len(model)):
-            model[i].add_connection(model[j])
-
-    return model
+    return read_text_model(filepath=f'./modelExamples/{filename}.txt')
 
 
 def show_best(vals: List[int]):